@@ -1,13 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import timedelta
 from jose import JWTError, jwt
 from typing import Optional
 
 from config import settings
-from db.base import get_db
+from db.base import get_db, get_async_db
 from db.user import user_crud
 from db.user.user_crud import get_user_by_cpf
 from models.user.user import User
@@ -32,6 +33,34 @@ class TokenData(BaseModel):
     cpf: Optional[str] = None
 
 
+def _credentials_exception() -> HTTPException:
+    """Erro padrão para credenciais inválidas"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _get_token_cpf(token: str) -> str:
+    """
+    Extrai o CPF do usuário a partir do token JWT.
+    
+    Raises:
+        HTTPException: Se o token for inválido
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        cpf: str = payload.get("sub")
+        if cpf is None:
+            raise _credentials_exception()
+        token_data = TokenData(cpf=cpf)
+    except JWTError:
+        raise _credentials_exception()
+    
+    return token_data.cpf
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -49,24 +78,35 @@ def get_current_user(
     Raises:
         HTTPException: Se o token for inválido ou o usuário não for encontrado
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Não foi possível validar as credenciais",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    user = get_user_by_cpf(db, cpf=_get_token_cpf(token))
+    if user is None:
+        raise _credentials_exception()
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        cpf: str = payload.get("sub")
-        if cpf is None:
-            raise credentials_exception
-        token_data = TokenData(cpf=cpf)
-    except JWTError:
-        raise credentials_exception
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Obtém o usuário autenticado atual usando a sessão assíncrona.
+    
+    Usado pelas rotas assíncronas para não ocupar o threadpool na autenticação.
     
-    user = get_user_by_cpf(db, cpf=token_data.cpf)
+    Args:
+        token: Token JWT do cabeçalho Authorization
+        db: Sessão assíncrona do banco de dados
+        
+    Returns:
+        Objeto User atual
+        
+    Raises:
+        HTTPException: Se o token for inválido ou o usuário não for encontrado
+    """
+    user = await db.run_sync(get_user_by_cpf, _get_token_cpf(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from api.dependencies import get_async_read_db
+from schemas.comorbidity import ComorbidityResponse, ConditionBreakdownResponse
+from services.comorbidity_service import ComorbidityService
+from api.auth.auth import get_current_user_async
+from models.user.user import User
+
+router = APIRouter()
+
+
+@router.get("/comorbidities", response_model=List[ComorbidityResponse])
+async def get_comorbidities(
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Lista o dicionário de comorbidades.
+    
+    As comorbidades digitadas em texto livre são normalizadas (sem acentos e
+    sem diferenciar maiúsculas) e associadas às chaves deste dicionário.
+    
+    **Retorna:**
+    - Lista de comorbidades (chave e nome)
+    """
+    return ComorbidityService.get_comorbidities()
+
+
+@router.get("/comorbidities/{instrument}/breakdown", response_model=ConditionBreakdownResponse)
+async def get_condition_breakdown(
+    instrument: str,
+    conditions: Optional[List[str]] = Query(None, description="Chaves das condições (padrão: todas com dados)"),
+    period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
+    period_to: Optional[date] = Query(None, description="Filtro de data final"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Obtém as métricas de um instrumento estratificadas por condição de saúde.
+    
+    Para cada comorbidade, traz o número de pacientes e de avaliações, as
+    médias e a distribuição por classificação das avaliações dos pacientes
+    ativos que têm a condição.
+    
+    **Parâmetros de Path:**
+    - instrument: ivcf, factf ou physical_activity
+    
+    **Parâmetros de Query:**
+    - conditions: Chaves do dicionário (repetível, ex. conditions=diabetes&conditions=hipertensao)
+    - period_from: Filtro de data inicial
+    - period_to: Filtro de data final
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    
+    **Retorna:**
+    - Métricas por condição, ordenadas pelo número de avaliações
+    
+    **Raises:**
+    - 422: Instrumento, condição ou filtros inválidos
+    """
+    return await db.run_sync(
+        ComorbidityService.get_condition_breakdown,
+        instrument, conditions, period_from, period_to, region, health_unit_id, age_range
+    )
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
+from api.dependencies import get_async_read_db
+from schemas.dashboard_cube import DashboardCubeResponse
+from services.dashboard_cube_service import DashboardCubeService
+from api.auth.auth import get_current_user_async
+from models.user.user import User
+
+router = APIRouter()
+
+
+@router.get("/dashboard-cube", response_model=DashboardCubeResponse)
+async def get_dashboard_cube(
+    period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
+    period_to: Optional[date] = Query(None, description="Filtro de data final"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Obtém o cubo cidade > região > bairro > unidade de saúde dos três instrumentos.
+    
+    Cada nó traz, para IVCF, FACT-F e atividade física, o número de avaliações,
+    as médias e a distribuição por classificação. Todos os níveis vêm na mesma
+    resposta (pais antes dos filhos) e o cubo fica em cache por conjunto de
+    filtros, então o drill-down é feito sem novas consultas.
+    
+    **Parâmetros de Query:**
+    - period_from: Filtro de data inicial
+    - period_to: Filtro de data final
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    
+    **Retorna:**
+    - Nós do cubo (level: city, region, bairro, health_unit) com filtros aplicados
+    
+    **Raises:**
+    - 422: Filtros inválidos fornecidos
+    """
+    return await db.run_sync(
+        DashboardCubeService.get_dashboard_cube, period_from, period_to, region, health_unit_id, age_range
+    )
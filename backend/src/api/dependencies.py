@@ -0,0 +1,36 @@
+"""Dependencies shared by the API routers"""
+from fastapi import Depends, Request
+from db.base import read_session, async_read_session
+
+
+# Cookie/header that makes read dependencies use the primary (read-your-writes)
+READ_PRIMARY_COOKIE = "dataaging_read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+# Values accepted as true for the header/cookie (anything else is false)
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    Check if the client asked to read its own recent writes from the primary.
+
+    The header takes precedence over the cookie, so a client can opt out with
+    X-Read-Primary: 0 (or false) right after a write.
+    """
+    value = request.headers.get(READ_PRIMARY_HEADER)
+    if value is None:
+        value = request.cookies.get(READ_PRIMARY_COOKIE, "")
+    return value.strip().lower() in TRUE_VALUES
+
+
+def get_read_db(use_primary: bool = Depends(reads_from_primary)):
+    """Dependency to get a database session that reads from the replica"""
+    with read_session(use_primary) as db:
+        yield db
+
+
+async def get_async_read_db(use_primary: bool = Depends(reads_from_primary)):
+    """Dependency to get an async database session that reads from the replica"""
+    async with async_read_session(use_primary) as db:
+        yield db
@@ -0,0 +1,104 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+from typing import Optional
+from datetime import date
+from db.base import async_read_session
+from api.dependencies import reads_from_primary
+from services.export_service import ExportService, EXPORT_FORMATS
+from api.auth.auth import get_current_user_async
+from models.user.user import User
+
+router = APIRouter()
+
+
+def _export_response(request: Request, statement: Select, export_format: str, filename: str) -> StreamingResponse:
+    """Stream the export from its own read session, which lives as long as the response body"""
+    use_primary = reads_from_primary(request)
+
+    async def body():
+        async with async_read_session(use_primary) as db:
+            async for chunk in ExportService.stream_export(db, statement, export_format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+
+@router.get("/exports/patients")
+async def export_patients(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Formato do arquivo (csv, ndjson)"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Exporta os pacientes de todos os instrumentos, uma linha por CPF.
+
+    Cada linha traz os dados do paciente e a última avaliação IVCF, FACT-F e
+    de atividade física (colunas vazias quando não avaliado no instrumento).
+    O arquivo é transmitido em partes a partir de um cursor no servidor.
+
+    **Parâmetros de Query:**
+    - format: Formato do arquivo (csv, ndjson; padrão: csv)
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+
+    **Retorna:**
+    - Arquivo CSV ou NDJSON
+
+    **Raises:**
+    - 422: Filtros inválidos fornecidos
+    """
+    statement = ExportService.get_patients_export(region, health_unit_id, age_range)
+    return _export_response(request, statement, format, "pacientes")
+
+
+@router.get("/exports/{instrument}")
+async def export_evaluations(
+    request: Request,
+    instrument: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Formato do arquivo (csv, ndjson)"),
+    period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
+    period_to: Optional[date] = Query(None, description="Filtro de data final"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    classification: Optional[str] = Query(None, description="Filtro de classificação do instrumento"),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Exporta as avaliações de um instrumento, uma linha por avaliação.
+
+    O arquivo é transmitido em partes a partir de um cursor no servidor, então
+    o uso de memória não depende do número de avaliações exportadas.
+
+    **Parâmetros de Caminho:**
+    - instrument: Instrumento (ivcf, factf, physical-activity)
+
+    **Parâmetros de Query:**
+    - format: Formato do arquivo (csv, ndjson; padrão: csv)
+    - period_from: Filtro de data inicial
+    - period_to: Filtro de data final
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    - classification: Filtro de classificação (IVCF: Robusto, Em Risco, Frágil;
+      FACT-F: Sem Fadiga, Fadiga Leve, Fadiga Grave; atividade física: Baixo, Moderado, Alto, Crítico)
+
+    **Retorna:**
+    - Arquivo CSV ou NDJSON
+
+    **Raises:**
+    - 422: Instrumento ou filtros inválidos
+    """
+    statement = ExportService.get_evaluations_export(
+        instrument, period_from, period_to, region, health_unit_id, age_range, classification
+    )
+    return _export_response(request, statement, format, f"{instrument}_avaliacoes")
@@ -1,18 +1,18 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict
-from db.base import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
+from api.dependencies import get_async_read_db
 from services.factf.factf_dashboard_service import FACTFDashboardService
-from api.auth.auth import get_current_user
+from api.auth.auth import get_current_user_async
 from models.user.user import User
 
 router = APIRouter()
 
 
 @router.get("/factf-dashboard/summary")
-def get_factf_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_factf_summary(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém estatísticas resumidas do dashboard FACT-F.
@@ -43,14 +43,14 @@ def get_factf_summary(
     }
     ```
     """
-    return FACTFDashboardService.get_summary_stats(db)
+    return await db.run_sync(FACTFDashboardService.get_summary_stats)
 
 
 @router.get("/factf-dashboard/critical-patients")
-def get_critical_patients(
+async def get_critical_patients(
     min_score: float = Query(30.0, ge=0, le=52, description="Limite mínimo de pontuação de fadiga"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém pacientes com níveis críticos de fadiga.
@@ -80,7 +80,7 @@ def get_critical_patients(
     }
     ```
     """
-    critical_patients = FACTFDashboardService.get_critical_patients(db, min_score)
+    critical_patients = await db.run_sync(FACTFDashboardService.get_critical_patients, min_score)
     
     return {
         "critical_patients": critical_patients,
@@ -89,9 +89,9 @@ def get_critical_patients(
 
 
 @router.get("/factf-dashboard/fatigue-distribution")
-def get_fatigue_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_fatigue_distribution(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém distribuição de níveis de fadiga por condições de saúde.
@@ -113,17 +113,17 @@ def get_fatigue_distribution(
     }
     ```
     """
-    distribution = FACTFDashboardService.get_fatigue_distribution_by_condition(db)
+    distribution = await db.run_sync(FACTFDashboardService.get_fatigue_distribution_by_condition)
     
     return {
         "distribution": distribution
     }
 
 @router.get("/factf-dashboard/monthly-evolution")
-def get_monthly_evolution(
+async def get_monthly_evolution(
     months_back: int = Query(12, ge=1, le=24, description="Número de meses para retroceder"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém evolução mensal das pontuações FACT-F.
@@ -132,7 +132,9 @@ def get_monthly_evolution(
     - months_back: Número de meses para analisar (padrão: 12, máximo: 24)
     
     **Retorna:**
-    - Dados de evolução mensal para análise de tendências
+    - Um item por mês do calendário (do mais antigo ao atual) com médias,
+      quantidade de avaliações e percentis (p25, p50, p75) das pontuações;
+      meses sem avaliações vêm com quantidade zero e pontuações nulas
     
     **Exemplo de Resposta:**
     ```json
@@ -140,21 +142,27 @@ def get_monthly_evolution(
         "evolution": [
             {
                 "month": "Jan",
+                "year": 2025,
                 "average_total_score": 82.5,
                 "average_fatigue_score": 35.2,
-                "evaluations_count": 45
+                "evaluations_count": 45,
+                "total_score_percentiles": {"p25": 71.0, "p50": 83.0, "p75": 95.5},
+                "fatigue_score_percentiles": {"p25": 28.0, "p50": 36.0, "p75": 43.0}
             },
             {
-                "month": "Feb", 
-                "average_total_score": 84.1,
-                "average_fatigue_score": 36.8,
-                "evaluations_count": 52
+                "month": "Feb",
+                "year": 2025,
+                "average_total_score": null,
+                "average_fatigue_score": null,
+                "evaluations_count": 0,
+                "total_score_percentiles": {"p25": null, "p50": null, "p75": null},
+                "fatigue_score_percentiles": {"p25": null, "p50": null, "p75": null}
             }
         ]
     }
     ```
     """
-    evolution = FACTFDashboardService.get_monthly_evolution(db, months_back)
+    evolution = await db.run_sync(FACTFDashboardService.get_monthly_evolution, months_back)
     
     return {
         "evolution": evolution
@@ -162,9 +170,9 @@ def get_monthly_evolution(
 
 
 @router.get("/factf-dashboard/domain-distribution")
-def get_domain_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_domain_distribution(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém distribuição de pontuações médias por domínios para gráfico de radar.
@@ -205,14 +213,14 @@ def get_domain_distribution(
     }
     ```
     """
-    return FACTFDashboardService.get_domain_distribution(db)
+    return await db.run_sync(FACTFDashboardService.get_domain_distribution)
 
 
 @router.get("/factf-dashboard/patient-domain-distribution/{patient_id}")
-def get_patient_domain_distribution(
+async def get_patient_domain_distribution(
     patient_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
     Obtém pontuações de domínios individuais do paciente comparadas com a média regional.
@@ -261,19 +269,44 @@ def get_patient_domain_distribution(
     }
     ```
     """
-    return FACTFDashboardService.get_patient_domain_distribution(db, patient_id)
+    return await db.run_sync(FACTFDashboardService.get_patient_domain_distribution, patient_id)
 
 
 @router.get("/factf-dashboard/all-patients")
-def get_all_patients_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_all_patients_summary(
+    sort_by: str = Query("name", description="Ordenação (name, age, last_score, fatigue_score, evaluation_date)"),
+    order: str = Query("asc", description="Direção da ordenação (asc, desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor da resposta anterior)"),
+    limit: int = Query(50, ge=1, le=500, description="Número de pacientes por página"),
+    classification: Optional[str] = Query(None, description="Classificação de fadiga da última avaliação"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    bairro: Optional[str] = Query(None, description="Filtro por bairro"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    search: Optional[str] = Query(None, description="Busca pelo nome do paciente"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict:
     """
-    Obtém resumo de todos os pacientes com seus dados da última avaliação.
+    Obtém resumo dos pacientes ativos com seus dados da última avaliação.
+    
+    A lista é paginada por cursor: a resposta traz `next_cursor`, que deve ser
+    enviado em `cursor` para obter a próxima página (nulo na última página).
+    Ordenação e filtros são aplicados no banco, em uma única consulta.
+    
+    **Parâmetros de Query:**
+    - sort_by: name, age, last_score, fatigue_score ou evaluation_date (padrão: name)
+    - order: asc ou desc (pacientes sem avaliação ficam sempre no final)
+    - cursor: Cursor da próxima página
+    - limit: Pacientes por página (padrão: 50, máximo: 500)
+    - classification: Sem Fadiga, Fadiga Leve ou Fadiga Grave
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    - bairro: Filtro por bairro
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - search: Busca pelo nome do paciente
     
     **Retorna:**
-    - Lista de todos os pacientes com informações básicas e última avaliação
+    - Pacientes da página com informações básicas e última avaliação, total de
+      pacientes que atendem aos filtros e cursor da próxima página
     
     **Exemplo de Resposta:**
     ```json
@@ -284,46 +317,20 @@ def get_all_patients_summary(
                 "name": "Paciente #1",
                 "age": 66,
                 "last_score": 85.5,
+                "fatigue_score": 38.0,
                 "classification": "Fadiga Leve",
                 "evaluation_date": "2023-12-01"
             }
         ],
-        "total_count": 245
+        "total_count": 245,
+        "next_cursor": "WyJQYWNpZW50ZSAjMSIsIDFd"
     }
     ```
-    """
-    # This would use the existing patient service to get all patients
-    # with their latest evaluation data
-    from services.factf.factf_patient_service import FACTFPatientService
-    
-    patients = FACTFPatientService.get_all_factf_patients(db, limit=1000)
     
-    # Transform to summary format
-    patients_summary = []
-    for patient in patients:
-        # Get latest evaluation for each patient
-        from services.factf.factf_evaluation_service import FACTFEvaluationService
-        latest_eval = FACTFEvaluationService.get_latest_evaluation_by_patient(db, patient.id)
-        
-        patient_data = {
-            "id": patient.id,
-            "name": patient.nome_completo,
-            "age": patient.idade,
-            "last_score": None,
-            "classification": None,
-            "evaluation_date": None
-        }
-        
-        if latest_eval:
-            patient_data.update({
-                "last_score": float(latest_eval.pontuacao_total),
-                "classification": latest_eval.classificacao_fadiga,
-                "evaluation_date": latest_eval.data_avaliacao.isoformat()
-            })
-        
-        patients_summary.append(patient_data)
-    
-    return {
-        "patients": patients_summary,
-        "total_count": len(patients_summary)
-    }
\ No newline at end of file
+    **Raises:**
+    - 422: Ordenação, filtros ou cursor inválidos
+    """
+    return await db.run_sync(
+        FACTFDashboardService.get_all_patients_summary,
+        sort_by, order, cursor, limit, classification, age_range, bairro, health_unit_id, search
+    )
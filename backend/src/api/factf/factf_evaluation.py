@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.factf.factf_evaluation import (
     FACTFEvaluationCreate,
     FACTFEvaluationUpdate,
@@ -78,7 +79,7 @@ def list_patient_evaluations(
     patient_id: int,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=100, description="Número máximo de registros para retornar"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
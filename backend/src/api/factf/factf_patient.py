@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.factf.factf_patient import (
     FACTFPatientCreate,
     FACTFPatientUpdate,
@@ -58,7 +59,7 @@ def list_factf_patients(
     idade_min: Optional[int] = Query(None, ge=18, description="Filtro de idade mínima"),
     idade_max: Optional[int] = Query(None, le=120, description="Filtro de idade máxima"),
     classificacao_fadiga: Optional[str] = Query(None, description="Filtrar por classificação de fadiga"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -153,7 +154,7 @@ def delete_factf_patient(
 @router.get("/factf-patients/{patient_id}/evaluations")
 def get_patient_evaluations(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
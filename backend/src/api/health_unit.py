@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.health_unit import (
     HealthUnitCreate,
     HealthUnitUpdate,
@@ -44,7 +45,7 @@ def list_health_units(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=100, description="Número máximo de registros para retornar"),
     active_only: bool = Query(True, description="Filtrar apenas unidades ativas"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -85,7 +86,7 @@ def get_health_unit(
 @router.get("/health-units/region/{regiao}", response_model=List[HealthUnitResponse])
 def get_health_units_by_region(
     regiao: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -1,47 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
-from db.base import get_db
+from api.dependencies import get_async_read_db
 from schemas.ivcf.ivcf_dashboard import (
     DomainDistributionResponse,
     IVCFSummary,
     RegionAverageResponse,
     MonthlyEvolutionResponse,
     CriticalPatientsResponse,
-    FragileElderlyPercentageResponse
+    FragileElderlyPercentageResponse,
+    IVCFDashboardSnapshot
 )
 from services.ivcf.ivcf_dashboard_service import IVCFDashboardService
-from api.auth.auth import get_current_user
+from api.auth.auth import get_current_user_async
 from models.user.user import User
 
 router = APIRouter()
 
 
 @router.get("/ivcf-dashboard/ivcf-summary", response_model=IVCFSummary)
-def get_ivcf_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_ivcf_summary(
+    period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
+    period_to: Optional[date] = Query(None, description="Filtro de data final"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém estatísticas resumidas do IVCF.
     
+    **Parâmetros de Query:**
+    - period_from: Filtro de data inicial
+    - period_to: Filtro de data final
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    
     **Retorna:**
     - Dados resumidos incluindo total de idosos, percentuais, pontuação média e pacientes críticos
+    
+    **Raises:**
+    - 422: Filtros inválidos fornecidos
     """
-    return IVCFDashboardService.get_ivcf_summary(db)
+    return await db.run_sync(
+        IVCFDashboardService.get_ivcf_summary, period_from, period_to, region, health_unit_id, age_range
+    )
 
 
 @router.get("/ivcf-dashboard/ivcf-by-domain", response_model=DomainDistributionResponse)
-def get_domain_distribution(
+async def get_domain_distribution(
     period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
     period_to: Optional[date] = Query(None, description="Filtro de data final"),
     region: Optional[str] = Query(None, description="Filtro de região"),
     health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
     age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
     classification: Optional[str] = Query(None, description="Filtro de classificação (Robusto, Em Risco, Frágil)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém a distribuição por domínios para gráfico de aranha.
@@ -60,17 +78,17 @@ def get_domain_distribution(
     **Raises:**
     - 422: Filtros inválidos fornecidos
     """
-    return IVCFDashboardService.get_domain_distribution(
-        db, period_from, period_to, region, health_unit_id, age_range, classification
+    return await db.run_sync(
+        IVCFDashboardService.get_domain_distribution, period_from, period_to, region, health_unit_id, age_range, classification
     )
 
 
 @router.get("/ivcf-dashboard/ivcf-by-region", response_model=RegionAverageResponse)
-def get_region_averages(
+async def get_region_averages(
     period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
     period_to: Optional[date] = Query(None, description="Filtro de data final"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém pontuações médias por região.
@@ -82,15 +100,15 @@ def get_region_averages(
     **Retorna:**
     - Dados de médias por região com filtros aplicados
     """
-    return IVCFDashboardService.get_region_averages(db, period_from, period_to)
+    return await db.run_sync(IVCFDashboardService.get_region_averages, period_from, period_to)
 
 
 @router.get("/ivcf-dashboard/ivcf-evolution", response_model=MonthlyEvolutionResponse)
-def get_monthly_evolution(
+async def get_monthly_evolution(
     months_back: int = Query(6, ge=1, le=24, description="Número de meses para retroceder"),
     from_last_evaluation: bool = Query(False, description="Iniciar a partir da data da última avaliação"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém a evolução mensal dos últimos N meses.
@@ -105,14 +123,14 @@ def get_monthly_evolution(
     **Raises:**
     - 422: Valor inválido de months_back
     """
-    return IVCFDashboardService.get_monthly_evolution(db, months_back, from_last_evaluation)
+    return await db.run_sync(IVCFDashboardService.get_monthly_evolution, months_back, from_last_evaluation)
 
 
 @router.get("/ivcf-dashboard/critical-patients", response_model=CriticalPatientsResponse)
-def get_critical_patients(
+async def get_critical_patients(
     pontuacao_minima: int = Query(20, ge=0, le=40, description="Pontuação mínima para pacientes críticos"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém pacientes com pontuações críticas.
@@ -126,13 +144,13 @@ def get_critical_patients(
     **Raises:**
     - 422: Valor inválido de pontuacao_minima
     """
-    return IVCFDashboardService.get_critical_patients(db, pontuacao_minima)
+    return await db.run_sync(IVCFDashboardService.get_critical_patients, pontuacao_minima)
 
 
 @router.get("/ivcf-dashboard/all-patients", response_model=CriticalPatientsResponse)
-def get_all_patients(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_all_patients(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém todos os pacientes com suas avaliações.
@@ -140,12 +158,12 @@ def get_all_patients(
     **Retorna:**
     - Dados de todos os pacientes
     """
-    return IVCFDashboardService.get_all_patients(db)
+    return await db.run_sync(IVCFDashboardService.get_all_patients)
 
 
 @router.get("/ivcf-dashboard/curitiba-regions")
-def get_curitiba_regions(
-    current_user: User = Depends(get_current_user)
+async def get_curitiba_regions(
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém lista de regiões válidas de Curitiba.
@@ -158,14 +176,14 @@ def get_curitiba_regions(
 
 
 @router.get("/ivcf-dashboard/fragile-percentage", response_model=FragileElderlyPercentageResponse)
-def get_fragile_elderly_percentage(
+async def get_fragile_elderly_percentage(
     period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
     period_to: Optional[date] = Query(None, description="Filtro de data final"),
     region: Optional[str] = Query(None, description="Filtro de região"),
     health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
     age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Obtém percentual de idosos frágeis com filtros.
@@ -183,17 +201,60 @@ def get_fragile_elderly_percentage(
     **Raises:**
     - 422: Filtros inválidos fornecidos
     """
-    return IVCFDashboardService.get_fragile_elderly_percentage(
-        db, period_from, period_to, region, health_unit_id, age_range
+    return await db.run_sync(
+        IVCFDashboardService.get_fragile_elderly_percentage, period_from, period_to, region, health_unit_id, age_range
+    )
+
+
+@router.get("/ivcf-dashboard/snapshot", response_model=IVCFDashboardSnapshot)
+async def get_dashboard_snapshot(
+    period_from: Optional[date] = Query(None, description="Filtro de data inicial"),
+    period_to: Optional[date] = Query(None, description="Filtro de data final"),
+    region: Optional[str] = Query(None, description="Filtro de região"),
+    health_unit_id: Optional[int] = Query(None, description="Filtro de ID da unidade de saúde"),
+    age_range: Optional[str] = Query(None, description="Filtro de faixa etária (60-70, 71-80, 81+)"),
+    months_back: int = Query(6, ge=1, le=24, description="Número de meses da evolução mensal"),
+    from_last_evaluation: bool = Query(False, description="Evolução a partir da data da última avaliação"),
+    pontuacao_minima: int = Query(20, ge=0, le=40, description="Pontuação mínima para pacientes críticos"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Obtém todos os widgets do dashboard IVCF para o mesmo conjunto de filtros.
+    
+    Substitui as chamadas separadas a resumo, domínios, regiões, evolução mensal,
+    pacientes críticos e percentual de frágeis: o conjunto filtrado de avaliações
+    é montado uma única vez e todos os widgets são derivados dele.
+    
+    **Parâmetros de Query:**
+    - period_from: Filtro de data inicial
+    - period_to: Filtro de data final
+    - region: Filtro de região (deve ser uma região válida de Curitiba)
+    - health_unit_id: Filtro de ID da unidade de saúde
+    - age_range: Filtro de faixa etária (60-70, 71-80, 81+)
+    - months_back: Número de meses da evolução mensal (padrão: 6, intervalo: 1-24)
+    - from_last_evaluation: Evolução a partir da data da última avaliação (padrão: False)
+    - pontuacao_minima: Pontuação mínima para pacientes críticos (padrão: 20, intervalo: 0-40)
+    
+    **Retorna:**
+    - Resumo, domínios, médias por região, evolução mensal, pacientes críticos e percentual de frágeis
+    
+    **Raises:**
+    - 422: Filtros inválidos fornecidos
+    """
+    return await db.run_sync(
+        IVCFDashboardService.get_dashboard_snapshot,
+        period_from, period_to, region, health_unit_id, age_range,
+        months_back, from_last_evaluation, pontuacao_minima
     )
 
 
 @router.get("/ivcf-dashboard/validate-filters")
-def validate_filters(
+async def validate_filters(
     region: Optional[str] = Query(None, description="Região para validar"),
     age_range: Optional[str] = Query(None, description="Faixa etária para validar"),
     classification: Optional[str] = Query(None, description="Classificação para validar"),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Valida filtros do dashboard.
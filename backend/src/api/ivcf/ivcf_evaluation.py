@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.ivcf.ivcf_evaluation import (
     IVCFEvaluationCreate,
     IVCFEvaluationCreateSimple,
@@ -53,7 +54,7 @@ def list_ivcf_evaluations(
     period_from: Optional[date] = Query(None, description="Filtrar por data inicial"),
     period_to: Optional[date] = Query(None, description="Filtrar por data final"),
     classificacao: Optional[str] = Query(None, description="Filtrar por classificação"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
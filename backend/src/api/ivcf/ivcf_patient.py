@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.ivcf.ivcf_patient import (
     IVCFPatientCreate,
     IVCFPatientUpdate,
@@ -53,7 +54,7 @@ def list_ivcf_patients(
     unidade_saude_id: Optional[int] = Query(None, description="Filtrar por ID da unidade de saúde"),
     idade_min: Optional[int] = Query(None, ge=60, description="Filtro de idade mínima"),
     idade_max: Optional[int] = Query(None, le=120, description="Filtro de idade máxima"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -160,7 +161,7 @@ def get_patient_with_evaluations(
 @router.get("/ivcf-patients/region/{regiao}", response_model=List[IVCFPatientResponse])
 def get_patients_by_region(
     regiao: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -178,7 +179,7 @@ def get_patients_by_region(
 @router.get("/ivcf-patients/age-range/{age_range}", response_model=List[IVCFPatientResponse])
 def get_patients_by_age_range(
     age_range: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -206,7 +207,7 @@ def get_patients_by_age_range(
 @router.get("/ivcf-patients/stats/count")
 def get_patients_count(
     active_only: bool = Query(True, description="Contar apenas pacientes ativos"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
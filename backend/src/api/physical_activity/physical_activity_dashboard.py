@@ -1,73 +1,83 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List
-from db.base import get_db
-from services.physical_activity.physical_activity_dashboard_service import PhysicalActivityDashboardService
-from api.auth.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+from api.dependencies import get_async_read_db
+from services.physical_activity.physical_activity_dashboard_service import PhysicalActivityDashboardService, DEFAULT_AGE_BANDS
+from api.auth.auth import get_current_user_async
 from models.user.user import User
 
 router = APIRouter()
 
 
 @router.get("/summary")
-def get_dashboard_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_dashboard_summary(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict[str, Any]:
     """Obtém resumo geral do dashboard (total avaliado, % conformidade OMS, média de horas sedentárias)"""
-    return PhysicalActivityDashboardService.get_summary(db)
+    return await db.run_sync(PhysicalActivityDashboardService.get_summary)
 
 
 @router.get("/critical-patients")
-def get_critical_patients(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
-    """Obtém pacientes com risco sedentário crítico (>10 horas/dia)"""
-    return PhysicalActivityDashboardService.get_critical_patients(db)
+async def get_critical_patients(
+    limit: int = Query(100, ge=1, le=1000, description="Número de pacientes por página"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor da resposta anterior)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+) -> Dict[str, Any]:
+    """Obtém pacientes cuja última avaliação tem risco sedentário crítico (>10 horas/dia), paginados por cursor (next_cursor no corpo, nulo na última página)"""
+    return await db.run_sync(PhysicalActivityDashboardService.get_critical_patients, limit, cursor)
 
 
 @router.get("/activity-distribution")
-def get_activity_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_activity_distribution(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict[str, Any]:
     """Obtém distribuição por intensidade de atividade (leve, moderada, vigorosa)"""
-    return PhysicalActivityDashboardService.get_activity_distribution(db)
+    return await db.run_sync(PhysicalActivityDashboardService.get_activity_distribution)
 
 
 @router.get("/sedentary-by-age")
-def get_sedentary_by_age(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_sedentary_by_age(
+    age_bands: str = Query(DEFAULT_AGE_BANDS, description="Faixas etárias separadas por vírgula (ex.: 60-64,65-74,75+)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> List[Dict[str, Any]]:
-    """Obtém horas sedentárias por faixa etária (60-70, 71-80, 81+)"""
-    return PhysicalActivityDashboardService.get_sedentary_by_age(db)
+    """Obtém horas sedentárias da última avaliação por faixa etária (padrão: 60-70, 71-80, 81+)"""
+    return await db.run_sync(PhysicalActivityDashboardService.get_sedentary_by_age, age_bands)
 
 
 @router.get("/sedentary-trend")
-def get_sedentary_trend(
+async def get_sedentary_trend(
     months: int = Query(12, ge=1, le=24, description="Número de meses para análise de tendência"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    conditions: Optional[List[str]] = Query(None, description="Chaves das comorbidades de cada coorte (padrão: diabetes, hipertensao)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict[str, List[Dict[str, Any]]]:
-    """Obtém tendência sedentária ao longo do tempo para diabéticos e hipertensos"""
-    return PhysicalActivityDashboardService.get_sedentary_trend(db, months)
+    """Obtém tendência sedentária mensal por coorte de condição (padrão: diabéticos e hipertensos)"""
+    return await db.run_sync(PhysicalActivityDashboardService.get_sedentary_trend, months, conditions)
 
 
 @router.get("/who-compliance")
-def get_who_compliance(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_who_compliance(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict[str, Any]:
     """Obtém dados de conformidade OMS (conformes vs não conformes)"""
-    return PhysicalActivityDashboardService.get_who_compliance(db)
+    return await db.run_sync(PhysicalActivityDashboardService.get_who_compliance)
 
 
 @router.get("/all-patients")
-def get_all_patients_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
-    """Obtém resumo de todos os pacientes com sua última avaliação"""
-    return PhysicalActivityDashboardService.get_all_patients_summary(db)
\ No newline at end of file
+async def get_all_patients_summary(
+    sort_by: str = Query("last_evaluation_date", description="Ordenação (last_evaluation_date, sedentary_hours, name, age, registration_date)"),
+    order: str = Query("desc", description="Direção da ordenação (asc, desc)"),
+    limit: int = Query(100, ge=1, le=1000, description="Número de pacientes por página"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor da resposta anterior)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async)
+) -> Dict[str, Any]:
+    """Obtém resumo dos pacientes ativos com sua última avaliação, ordenado no banco e paginado por cursor (next_cursor no corpo, nulo na última página)"""
+    return await db.run_sync(
+        PhysicalActivityDashboardService.get_all_patients_summary, sort_by, order, limit, cursor
+    )
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from db.base import get_db
+from api.dependencies import get_read_db
 from services.physical_activity.physical_activity_evaluation_service import PhysicalActivityEvaluationService
 from schemas.physical_activity.physical_activity_evaluation import (
     PhysicalActivityEvaluationCreate,
@@ -43,7 +44,7 @@ def get_patient_evaluations(
     patient_id: int,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obtém todas as avaliações de um paciente"""
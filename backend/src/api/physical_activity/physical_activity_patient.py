@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 from db.base import get_db
+from api.dependencies import get_read_db
 from services.physical_activity.physical_activity_patient_service import PhysicalActivityPatientService
 from schemas.physical_activity.physical_activity_patient import (
     PhysicalActivityPatientCreate,
@@ -34,7 +35,7 @@ def get_physical_activity_patients(
     unidade_saude_id: Optional[int] = Query(None, description="Filtrar por unidade de saúde"),
     idade_min: Optional[int] = Query(None, ge=60, description="Idade mínima"),
     idade_max: Optional[int] = Query(None, le=120, description="Idade máxima"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obtém lista paginada de pacientes de atividade física"""
@@ -84,7 +85,7 @@ def delete_physical_activity_patient(
 @router.get("/{patient_id}/evaluations")
 def get_patient_evaluations(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obtém todas as avaliações de um paciente"""
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from typing import List, Union
 from db.base import get_db
+from api.dependencies import get_read_db
 from schemas.user import (
     UserCreateGestor,
     UserCreateTecnico,
@@ -42,7 +43,7 @@ def create_user(
 def list_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
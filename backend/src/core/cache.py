@@ -0,0 +1,45 @@
+"""
+Small in-process cache for expensive, read-only dashboard results.
+
+Entries expire after a fixed TTL and the oldest entry is dropped once the cache
+is full. Each worker process has its own copy, so a cached result can be up to
+TTL seconds behind the database (like a lagging read replica).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """Thread-safe mapping of key -> value with per-entry expiry"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 128):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it when missing or expired"""
+        if self.ttl_seconds <= 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        # Computed outside the lock: concurrent misses may compute twice, but never block each other
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,173 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events record every statement executed while a request is
+being served: query count, total DB time and how many times each statement
+fingerprint repeated (the usual sign of an N+1 loop).
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+
+logger = logging.getLogger("dataaging.sql")
+
+# Response headers added in debug mode
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+REPEATED_QUERIES_HEADER = "X-DB-Repeated-Queries"
+
+_NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|\$\d+|:\w+|\?")
+_PARAM_LIST_RE = re.compile(r"\(\s*\?(\s*,\s*\?)*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters match"""
+    statement = _STRING_RE.sub("?", statement)
+    statement = _PARAM_RE.sub("?", statement)
+    statement = _NUMBER_RE.sub("?", statement)
+    statement = _PARAM_LIST_RE.sub("(?)", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """SQL statements executed while serving a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, min_count: int = 2) -> List[Dict[str, Any]]:
+        """Statements executed at least `min_count` times, most repeated first"""
+        return [
+            {
+                "fingerprint": hashlib.sha1(statement.encode()).hexdigest()[:8],
+                "count": count,
+                "statement": statement
+            }
+            for statement, count in self.fingerprints.most_common()
+            if count >= min_count
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "query_count": self.count,
+            "db_time_ms": round(self.total_seconds * 1000, 3),
+            "repeated": self.repeated()
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode (SQL_QUERY_BUDGET) when a request runs too many queries"""
+
+    def __init__(self, path: str, stats: QueryStats, budget: int):
+        self.path = path
+        self.stats = stats
+        self.budget = budget
+        lines = [f"{path} executed {stats.count} queries (budget {budget})"]
+        for item in stats.repeated():
+            lines.append(f"  {item['count']}x {item['statement'][:200]}")
+        super().__init__("\n".join(lines))
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being served in this context (None outside requests)"""
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start = getattr(context, "_query_start_time", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    ASGI middleware that collects QueryStats for each HTTP request.
+
+    The stats are stored in ``request.state.sql_stats``. In debug mode they are
+    also returned as response headers, and requests that repeat a statement
+    SQL_REPEATED_QUERY_THRESHOLD times are logged as possible N+1 queries.
+    With SQL_QUERY_BUDGET set (tests), exceeding the budget raises
+    QueryBudgetExceeded instead of sending the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        scope.setdefault("state", {})["sql_stats"] = stats
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                self._check(scope, stats)
+                if settings.DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.extend(self._headers(stats))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+
+    @staticmethod
+    def _check(scope, stats: QueryStats) -> None:
+        path = scope.get("path", "")
+        budget = settings.SQL_QUERY_BUDGET
+        if budget is not None and stats.count > budget:
+            raise QueryBudgetExceeded(path, stats, budget)
+
+        repeated = stats.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD)
+        if repeated:
+            logger.warning(
+                "Possible N+1 on %s: %d queries, statement repeated %dx: %s",
+                path, stats.count, repeated[0]["count"], repeated[0]["statement"][:200]
+            )
+
+    @staticmethod
+    def _headers(stats: QueryStats) -> List:
+        repeated = ",".join(f"{item['fingerprint']}={item['count']}" for item in stats.repeated())
+        headers = [
+            (QUERY_COUNT_HEADER.encode(), str(stats.count).encode()),
+            (QUERY_TIME_HEADER.encode(), f"{stats.total_seconds * 1000:.3f}".encode()),
+        ]
+        if repeated:
+            headers.append((REPEATED_QUERIES_HEADER.encode(), repeated.encode()))
+        return headers
@@ -0,0 +1,262 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+Everything is kept in plain dicts behind a lock and rendered on scrape, so no
+client library or external collector is needed (`curl /metrics` works).
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import anyio.to_thread
+
+from db.pool import get_pool_stats
+
+
+# Upper bounds (in seconds) of the request latency histogram buckets
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Route label used for requests that did not match any route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+RouteKey = Tuple[str, str]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative histogram (not thread-safe by itself; guarded by the registry lock)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name: str, **labels) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=_format_value(bound))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {self.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_labels(**labels)} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Request counters, latency histograms and DB time per (method, route template)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.in_flight = 0
+            self.requests: Dict[Tuple[str, str, str], int] = {}
+            self.errors: Dict[RouteKey, int] = {}
+            self.latency: Dict[RouteKey, Histogram] = {}
+            self.db_seconds: Dict[RouteKey, float] = {}
+            self.db_queries: Dict[RouteKey, int] = {}
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db_seconds: float = 0.0,
+        db_queries: int = 0
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            if status >= 500:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram()
+            self.latency[key].observe(seconds)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + db_seconds
+            self.db_queries[key] = self.db_queries.get(key, 0) + db_queries
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_in_flight Requests currently being served",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Requests served by method, route template and status",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+            lines += [
+                "# HELP http_request_errors_total Requests that failed with a 5xx or an unhandled exception",
+                "# TYPE http_request_errors_total counter",
+            ]
+            for (method, route), count in sorted(self.errors.items()):
+                lines.append(f"http_request_errors_total{_labels(method=method, route=route)} {count}")
+
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route template",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines += histogram.render("http_request_duration_seconds", method=method, route=route)
+
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent executing SQL by route template",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {_format_value(seconds)}")
+
+            lines += [
+                "# HELP http_request_db_queries_total SQL statements executed by route template",
+                "# TYPE http_request_db_queries_total counter",
+            ]
+            for (method, route), count in sorted(self.db_queries.items()):
+                lines.append(f"http_request_db_queries_total{_labels(method=method, route=route)} {count}")
+        return lines
+
+
+registry = MetricsRegistry()
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, including the include_router prefix"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return UNMATCHED_ROUTE
+
+    # Depending on the FastAPI version the route may not carry its router prefix;
+    # the prefix is whatever leading part of the real path the template does not cover.
+    path_parts = scope["path"].split("/")
+    template_parts = template.split("/")[1:]
+    prefix = "/".join(path_parts[:len(path_parts) - len(template_parts)])
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding the registry (one lock acquisition per request edge)"""
+
+    def __init__(self, app, metrics: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.metrics = metrics or registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+        self.metrics.request_started()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            stats = scope.get("state", {}).get("sql_stats")
+            self.metrics.request_finished(
+                scope["method"],
+                _route_template(scope),
+                status,
+                time.perf_counter() - start,
+                db_seconds=stats.total_seconds if stats else 0.0,
+                db_queries=stats.count if stats else 0
+            )
+
+
+def _threadpool_lines() -> List[str]:
+    """Gauges for the worker threadpool running sync routes (must run on the event loop)"""
+    statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    return [
+        "# HELP threadpool_threads_busy Threadpool tokens in use (sync routes/dependencies running)",
+        "# TYPE threadpool_threads_busy gauge",
+        f"threadpool_threads_busy {statistics.borrowed_tokens}",
+        "# HELP threadpool_threads_total Threadpool capacity",
+        "# TYPE threadpool_threads_total gauge",
+        f"threadpool_threads_total {_format_value(statistics.total_tokens)}",
+        "# HELP threadpool_queue_depth Tasks waiting for a free threadpool thread",
+        "# TYPE threadpool_queue_depth gauge",
+        f"threadpool_queue_depth {statistics.tasks_waiting}",
+    ]
+
+
+def _pool_lines(engines: Dict[str, object]) -> List[str]:
+    """Connection pool gauges and checkout wait histograms per engine"""
+    lines = [
+        "# HELP db_pool_checked_out Connections currently checked out",
+        "# TYPE db_pool_checked_out gauge",
+    ]
+    waits = []
+    for name, engine in engines.items():
+        stats = get_pool_stats(engine)
+        if "checked_out" in stats:
+            lines.append(f"db_pool_checked_out{_labels(engine=name)} {stats['checked_out']}")
+        if "wait_time" in stats:
+            waits.append((name, stats["wait_time"]))
+
+    lines += [
+        "# HELP db_pool_wait_seconds Time spent waiting for a pooled connection",
+        "# TYPE db_pool_wait_seconds histogram",
+    ]
+    for name, wait in waits:
+        for bucket in wait["buckets"]:
+            le = bucket["le"] if bucket["le"] == "+Inf" else _format_value(bucket["le"])
+            lines.append(f"db_pool_wait_seconds_bucket{_labels(engine=name, le=le)} {bucket['count']}")
+        lines.append(f"db_pool_wait_seconds_sum{_labels(engine=name)} {wait['sum_seconds']}")
+        lines.append(f"db_pool_wait_seconds_count{_labels(engine=name)} {wait['count']}")
+    return lines
+
+
+def render_metrics(engines: Dict[str, object], metrics: Optional[MetricsRegistry] = None) -> str:
+    """Render every metric in the Prometheus text format"""
+    lines = (metrics or registry).render() + _threadpool_lines() + _pool_lines(engines)
+    return "\n".join(lines) + "\n"
@@ -1,12 +1,29 @@
-from .base import Base, engine, SessionLocal, get_db
+from .base import (
+    Base,
+    engine,
+    read_engine,
+    async_engine,
+    SessionLocal,
+    AsyncSessionLocal,
+    get_db,
+    get_async_db,
+    read_session,
+    async_read_session
+)
 from . import health_unit_crud
 from .ivcf import ivcf_patient_crud, ivcf_evaluation_crud, ivcf_dashboard_crud
 
 __all__ = [
     "Base", 
     "engine", 
+    "read_engine",
+    "async_engine",
     "SessionLocal", 
+    "AsyncSessionLocal",
     "get_db",
+    "get_async_db",
+    "read_session",
+    "async_read_session",
     "health_unit_crud", 
     "ivcf_patient_crud",
     "ivcf_evaluation_crud",
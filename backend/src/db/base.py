@@ -1,16 +1,117 @@
-from sqlalchemy import create_engine
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import create_engine, text, Delete, Insert, Update
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from config import settings
-from typing import Set
+from db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from pathlib import Path
+from typing import Any, Dict
 
-# Create database engine
+# Alembic scripts (see alembic.ini)
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# Async driver used for each sync database backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def _engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Build create_engine keyword arguments from the pool settings"""
+    if database_url.startswith("sqlite"):
+        return {}
+
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0 and database_url.startswith("postgresql"):
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            }
+
+    return options
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Convert a sync database URL into its asyncio driver equivalent"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend for async engine: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+# Create database engines (primary for writes, replica for reads)
 engine = create_engine(
-    settings.DATABASE_URL
+    settings.DATABASE_URL,
+    **_engine_options(settings.DATABASE_URL)
+)
+read_engine = engine
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        **_engine_options(settings.DATABASE_READ_URL)
+    )
+
+# Create async database engines (used by the read-heavy dashboard routes)
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **_engine_options(settings.DATABASE_URL, is_async=True)
 )
+async_read_engine = async_engine
+if settings.DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_READ_URL),
+        **_engine_options(settings.DATABASE_READ_URL, is_async=True)
+    )
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to the read replica and everything else to the primary.
+    
+    Once the session flushes a write, or when ``info["use_primary"]`` is set, all
+    following statements go to the primary so the session reads its own writes.
+    """
+    primary_bind = engine
+    replica_bind = read_engine
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["use_primary"] = True
+        if self.info.get("use_primary"):
+            return self.primary_bind
+        return self.replica_bind
+
 
-# Create session factory
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession bound to the async engines (used through AsyncSession)"""
+    primary_bind = async_engine.sync_engine
+    replica_bind = async_read_engine.sync_engine
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+)
 
 # Create base class for models
 Base = declarative_base()
@@ -25,15 +126,51 @@ def get_db():
         db.close()
 
 
-def _get_sqlite_columns(table_name: str) -> Set[str]:
-    """Return a set with existing column names for a SQLite table."""
-    if "sqlite" not in settings.DATABASE_URL:
-        return set()
-    with engine.connect() as conn:
-        result = conn.exec_driver_sql(f"PRAGMA table_info({table_name})")
-        rows = result.fetchall()
-        return {row[1] for row in rows}  # row[1] is the column name
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def read_session(use_primary: bool = False):
+    """Session that reads from the replica, or from the primary when use_primary is set"""
+    db = ReadSessionLocal()
+    db.info["use_primary"] = use_primary
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def async_read_session(use_primary: bool = False):
+    """Async session that reads from the replica, or from the primary when use_primary is set"""
+    async with AsyncReadSessionLocal() as db:
+        db.sync_session.info["use_primary"] = use_primary
+        yield db
+
+
+def advisory_lock(connection: Connection, name: str) -> None:
+    """
+    Take a transaction-scoped lock shared by every worker of the deployment.
+    
+    Startup tasks (migrations, seeding) run under it so only one worker does the
+    work while the others wait and then find it done. PostgreSQL only; SQLite
+    already serializes writers.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": zlib.crc32(name.encode())})
 
 
 def ensure_schema():
-    pass
\ No newline at end of file
+    """Upgrade the database schema to the latest migration (alembic upgrade head)"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(MIGRATIONS_DIR.parent.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    with engine.begin() as connection:
+        advisory_lock(connection, "dataaging.migrations")
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
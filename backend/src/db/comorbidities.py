@@ -0,0 +1,207 @@
+"""
+Comorbidity dictionary and patient-to-condition links.
+
+Comorbidities are typed as free text ("Hipertensão arterial sistêmica, Diabetes
+mellitus tipo 2"). The text is normalized (lowercase, no accents, punctuation
+as spaces) and matched against the terms of COMORBIDITIES; every match becomes
+a row in the instrument's <instrument>_patient_comorbidities table, so the
+dashboards filter and group by condition with joins instead of scanning text.
+
+Sources of the text per instrument:
+- IVCF: comorbidades of every evaluation of the patient
+- FACT-F: the patient's comorbidades
+- Physical Activity: the patient's comorbidades and diagnostico_principal
+
+The CRUD modules refresh a patient's links in the same transaction as the
+write. New dictionary entries and bulk loads that bypass the CRUD need a
+rebuild:
+
+    cd src && python -m db.comorbidities [--instrument ivcf|factf|physical_activity]
+"""
+import argparse
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.comorbidity import Comorbidity
+from models.ivcf.ivcf_patient import IVCFPatient
+from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from models.ivcf.ivcf_patient_comorbidity import IVCFPatientComorbidity
+from models.factf.factf_patient import FACTFPatient
+from models.factf.factf_patient_comorbidity import FACTFPatientComorbidity
+from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_patient_comorbidity import PhysicalActivityPatientComorbidity
+
+
+# key -> (display name, normalized terms that identify it)
+COMORBIDITIES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "hipertensao": ("Hipertensão", ("hipertensao", "hipertenso", "hipertensa", "pressao alta", "has")),
+    "diabetes": ("Diabetes", ("diabetes", "diabetico", "diabetica", "dm", "dm2")),
+    "artrite": ("Artrite", ("artrite", "artrite reumatoide")),
+    "artrose": ("Artrose", ("artrose", "osteoartrose", "osteoartrite")),
+    "osteoporose": ("Osteoporose", ("osteoporose",)),
+    "insuficiencia_cardiaca": ("Insuficiência cardíaca", ("insuficiencia cardiaca", "icc")),
+    "fibrilacao_atrial": ("Fibrilação atrial", ("fibrilacao atrial",)),
+    "dislipidemia": ("Dislipidemia", ("dislipidemia", "colesterol alto", "hipercolesterolemia")),
+    "hipotireoidismo": ("Hipotireoidismo", ("hipotireoidismo",)),
+    "doenca_renal_cronica": ("Doença renal crônica", ("doenca renal cronica", "insuficiencia renal cronica", "drc")),
+    "dpoc": ("DPOC", ("dpoc", "doenca pulmonar obstrutiva cronica", "enfisema")),
+    "depressao": ("Depressão", ("depressao",)),
+    "ansiedade": ("Ansiedade", ("ansiedade",)),
+    "insonia": ("Insônia", ("insonia",)),
+    "refluxo": ("Refluxo gastroesofágico", ("refluxo", "drge")),
+    "catarata": ("Catarata", ("catarata",)),
+    "glaucoma": ("Glaucoma", ("glaucoma",)),
+    "perda_auditiva": ("Perda auditiva", ("perda auditiva", "surdez", "hipoacusia")),
+    "obesidade": ("Obesidade", ("obesidade", "obeso", "obesa")),
+    "cancer": ("Câncer", ("cancer", "neoplasia", "tumor")),
+    "demencia": ("Demência", ("demencia", "alzheimer")),
+    "parkinson": ("Parkinson", ("parkinson",)),
+    "avc": ("AVC", ("avc", "acidente vascular cerebral", "derrame")),
+}
+
+
+class LinkSpec(NamedTuple):
+    """Where an instrument's comorbidity text lives and where its links go"""
+    link: Type
+    patient: Type
+    sources: Tuple  # Text columns matched against the dictionary
+
+
+COMORBIDITY_LINKS: Dict[str, LinkSpec] = {
+    "ivcf": LinkSpec(IVCFPatientComorbidity, IVCFPatient, (IVCFEvaluation.comorbidades,)),
+    "factf": LinkSpec(FACTFPatientComorbidity, FACTFPatient, (FACTFPatient.comorbidades,)),
+    "physical_activity": LinkSpec(
+        PhysicalActivityPatientComorbidity, PhysicalActivityPatient,
+        (PhysicalActivityPatient.comorbidades, PhysicalActivityPatient.diagnostico_principal)
+    ),
+}
+
+# Rows read and written per round trip by the rebuild
+REBUILD_BATCH_SIZE = 5000
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, strip accents and turn punctuation into single spaces"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def match_comorbidities(*texts: Optional[str]) -> Set[str]:
+    """Dictionary keys whose terms appear as whole words in any of the texts"""
+    padded = f" {' '.join(normalize_text(text) for text in texts)} "
+    return {
+        key for key, (_, terms) in COMORBIDITIES.items()
+        if any(f" {term} " in padded for term in terms)
+    }
+
+
+def _instrument(patient_model) -> str:
+    for instrument, spec in COMORBIDITY_LINKS.items():
+        if spec.patient is patient_model:
+            return instrument
+    raise ValueError(f"No comorbidity links for {patient_model.__name__}")
+
+
+def _source_rows(instrument: str):
+    """SELECT of (patient id, source texts...) for an instrument"""
+    spec = COMORBIDITY_LINKS[instrument]
+    if instrument == "ivcf":
+        return select(IVCFEvaluation.patient_id, *spec.sources)
+    return select(spec.patient.id, *spec.sources)
+
+
+def sync_comorbidity_dictionary(db: Session) -> Dict[str, int]:
+    """Make sure every COMORBIDITIES entry has a row; returns key -> id"""
+    ids = dict(db.execute(select(Comorbidity.chave, Comorbidity.id)).all())
+    missing = [{"chave": key, "nome": name} for key, (name, _) in COMORBIDITIES.items() if key not in ids]
+    if missing:
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        db.execute(dialect.insert(Comorbidity).values(missing).on_conflict_do_nothing(index_elements=["chave"]))
+        ids = dict(db.execute(select(Comorbidity.chave, Comorbidity.id)).all())
+    return ids
+
+
+def _links(rows: Iterable, ids: Dict[str, int]) -> List[dict]:
+    """Link rows for (patient id, texts...) rows, several rows per patient allowed"""
+    keys_by_patient: Dict[int, Set[str]] = {}
+    for patient_id, *texts in rows:
+        keys_by_patient.setdefault(patient_id, set()).update(match_comorbidities(*texts))
+    return [
+        {"patient_id": patient_id, "comorbidity_id": ids[key]}
+        for patient_id, keys in keys_by_patient.items()
+        for key in sorted(keys)
+    ]
+
+
+def refresh_patient_comorbidities(db: Session, patient_model, *patient_ids: int) -> None:
+    """Rebuild the links of the given patients from their current text (call after flushing the write)"""
+    instrument = _instrument(patient_model)
+    spec = COMORBIDITY_LINKS[instrument]
+    ids = sorted(set(patient_ids))
+    source = _source_rows(instrument)
+
+    rows = db.execute(source.where(source.selected_columns[0].in_(ids))).all()
+    links = _links(rows, sync_comorbidity_dictionary(db))
+    db.execute(delete(spec.link).where(spec.link.patient_id.in_(ids)))
+    if links:
+        db.execute(insert(spec.link), links)
+
+
+def remove_patient_comorbidities(db: Session, patient_model, patient_id: int) -> None:
+    """Delete a patient's links (before hard deleting the patient)"""
+    link = COMORBIDITY_LINKS[_instrument(patient_model)].link
+    db.execute(delete(link).where(link.patient_id == patient_id))
+
+
+def rebuild_patient_comorbidities(db: Session, instruments: Optional[Iterable[str]] = None) -> None:
+    """Recompute every link from the source text, in batches (does not commit)"""
+    ids = sync_comorbidity_dictionary(db)
+    for instrument in COMORBIDITY_LINKS if instruments is None else instruments:
+        spec = COMORBIDITY_LINKS[instrument]
+        db.execute(delete(spec.link))
+        source = _source_rows(instrument)
+        # Ordered by patient so an IVCF patient's evaluations land in the same batch
+        result = db.execute(
+            source.order_by(source.selected_columns[0]).execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        pending = []
+        for batch in result.partitions():
+            pending.extend(batch)
+            last_patient = pending[-1][0]
+            complete = [row for row in pending if row[0] != last_patient]
+            pending = [row for row in pending if row[0] == last_patient]
+            links = _links(complete, ids)
+            if links:
+                db.execute(insert(spec.link), links)
+        links = _links(pending, ids)
+        if links:
+            db.execute(insert(spec.link), links)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the patient comorbidity links from the free-text fields")
+    parser.add_argument("--instrument", choices=sorted(COMORBIDITY_LINKS), action="append",
+                        help="Instrument to rebuild (repeatable, default: all)")
+    args = parser.parse_args()
+
+    from db.base import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_patient_comorbidities(db, args.instrument)
+        db.commit()
+    finally:
+        db.close()
+
+    for instrument in args.instrument or COMORBIDITY_LINKS:
+        print(f"✓ {instrument}: comorbidity links rebuilt")
+
+
+if __name__ == "__main__":
+    main()
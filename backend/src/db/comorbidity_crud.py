@@ -0,0 +1,116 @@
+"""
+Condition-stratified aggregates of an instrument.
+
+Joins the instrument's patient comorbidity links to its evaluations and groups
+by condition, so any dictionary entry can be compared without scanning the
+free-text fields. Measures (averages and classes) are the same as the cube's.
+"""
+from sqlalchemy import case, distinct, func
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import date
+from models.comorbidity import Comorbidity
+from models.health_unit import HealthUnit
+from db.comorbidities import COMORBIDITY_LINKS
+from db.dashboard_cube_crud import CUBE_INSTRUMENTS
+from db.ivcf.ivcf_dashboard_crud import get_age_range_filter
+
+
+def _linked_evaluations(
+    query,
+    instrument: str,
+    conditions: Optional[Sequence[str]],
+    period_from: Optional[date],
+    period_to: Optional[date],
+    region: Optional[str],
+    health_unit_id: Optional[int],
+    age_range: Optional[str]
+):
+    """`query` over the links joined to their condition, active patient and evaluations, filtered"""
+    measures = CUBE_INSTRUMENTS[instrument]
+    link = COMORBIDITY_LINKS[instrument].link
+    patient, evaluation = measures.patient, measures.evaluation
+
+    query = query.select_from(link).join(
+        Comorbidity, link.comorbidity_id == Comorbidity.id
+    ).join(
+        patient, link.patient_id == patient.id
+    ).join(
+        evaluation, evaluation.patient_id == patient.id
+    ).filter(patient.ativo == True)
+
+    if conditions:
+        query = query.filter(Comorbidity.chave.in_(conditions))
+    if period_from:
+        query = query.filter(evaluation.data_avaliacao >= period_from)
+    if period_to:
+        query = query.filter(evaluation.data_avaliacao <= period_to)
+    if region:
+        query = query.join(HealthUnit, patient.unidade_saude_id == HealthUnit.id).filter(HealthUnit.regiao == region)
+    if health_unit_id:
+        query = query.filter(patient.unidade_saude_id == health_unit_id)
+    age_filter = get_age_range_filter(age_range, patient.idade)
+    if age_filter is not None:
+        query = query.filter(age_filter)
+    return query
+
+
+def get_condition_breakdown(
+    db: Session,
+    instrument: str,
+    conditions: Optional[Sequence[str]] = None,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Patients, evaluations, averages and classifications per condition (active patients only).
+
+    Also returns the number of distinct patients across all the conditions (a
+    patient with several conditions is counted once), from the same statement.
+    """
+    measures = CUBE_INSTRUMENTS[instrument]
+    patient, evaluation = measures.patient, measures.evaluation
+    classification = getattr(evaluation, measures.classification)
+    filters = (instrument, conditions, period_from, period_to, region, health_unit_id, age_range)
+
+    total_patients = _linked_evaluations(
+        db.query(func.count(distinct(patient.id))), *filters
+    ).correlate(None).scalar_subquery()
+
+    query = _linked_evaluations(db.query(
+        Comorbidity.chave,
+        Comorbidity.nome,
+        func.count(distinct(patient.id)).label("patient_count"),
+        func.count(evaluation.id).label("evaluation_count"),
+        *[func.avg(getattr(evaluation, column)).label(f"avg_{column}") for column in measures.averages],
+        *[
+            func.sum(case((classification == value, 1), else_=0)).label(key)
+            for key, value in measures.classes.items()
+        ],
+        total_patients.label("total_patients")
+    ), *filters)
+
+    rows = query.group_by(Comorbidity.chave, Comorbidity.nome).order_by(
+        func.count(evaluation.id).desc(), Comorbidity.chave
+    ).all()
+
+    breakdown = [
+        {
+            "condition": row.chave,
+            "name": row.nome,
+            "patient_count": row.patient_count,
+            "evaluation_count": row.evaluation_count,
+            "averages": {
+                column: round(float(row._mapping[f"avg_{column}"]), 2)
+                if row._mapping[f"avg_{column}"] is not None else None
+                for column in measures.averages
+            },
+            "classifications": {key: row._mapping[key] or 0 for key in measures.classes},
+        }
+        for row in rows
+    ]
+    # No row means no linked evaluation matched, so no patient either
+    return breakdown, rows[0].total_patients if rows else 0
@@ -0,0 +1,199 @@
+"""
+City / region / bairro / health unit cube of the three instruments.
+
+Every instrument is first reduced to one row of counts and sums per health
+unit; the hierarchy levels are then rolled up from those rows in the same
+statement (GROUP BY ROLLUP on PostgreSQL, a UNION ALL of the four groupings on
+SQLite). Averages are derived from the rolled-up sums, so every level is exact.
+Distinct patient counts can be summed too, since a patient belongs to a single
+health unit. The patient tables are separate per instrument, so the number of
+people across instruments is counted on CPFs, by a scalar subquery of the same
+statement.
+"""
+from sqlalchemy import case, distinct, func, literal, literal_column, null, select, tuple_, union, union_all
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+from datetime import date
+from models.health_unit import HealthUnit
+from models.ivcf.ivcf_patient import IVCFPatient
+from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from models.factf.factf_patient import FACTFPatient
+from models.factf.factf_evaluation import FACTFEvaluation
+from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+from db.ivcf.ivcf_dashboard_crud import get_age_range_filter
+
+
+# Hierarchy levels, from the top (depth 0) down
+CUBE_LEVELS = ("city", "region", "bairro", "health_unit")
+
+
+class CubeMeasures(NamedTuple):
+    """Measures of an instrument in the cube"""
+    patient: Type
+    evaluation: Type
+    averages: Tuple[str, ...]  # Evaluation columns averaged
+    classification: str  # Evaluation column split into `classes`
+    classes: Dict[str, str]  # Output key -> classification value
+
+
+CUBE_INSTRUMENTS: Dict[str, CubeMeasures] = {
+    "ivcf": CubeMeasures(
+        IVCFPatient, IVCFEvaluation, ("pontuacao_total",), "classificacao",
+        {"robust": "Robusto", "risk": "Em Risco", "fragile": "Frágil"}
+    ),
+    "factf": CubeMeasures(
+        FACTFPatient, FACTFEvaluation, ("pontuacao_total", "subescala_fadiga"), "classificacao_fadiga",
+        {"no_fatigue": "Sem Fadiga", "mild_fatigue": "Fadiga Leve", "severe_fatigue": "Fadiga Grave"}
+    ),
+    "physical_activity": CubeMeasures(
+        PhysicalActivityPatient, PhysicalActivityEvaluation, ("sedentary_hours_per_day",), "sedentary_risk_level",
+        {"low": "Baixo", "moderate": "Moderado", "high": "Alto", "critical": "Crítico"}
+    ),
+}
+
+
+def _measure_columns(instrument: str) -> List[str]:
+    measures = CUBE_INSTRUMENTS[instrument]
+    columns = [f"{instrument}_count", f"{instrument}_patients"]
+    for column in measures.averages:
+        columns += [f"{instrument}_{column}_sum", f"{instrument}_{column}_n"]
+    return columns + [f"{instrument}_{key}" for key in measures.classes]
+
+
+MEASURE_COLUMNS = [column for instrument in CUBE_INSTRUMENTS for column in _measure_columns(instrument)]
+
+
+def _evaluated(
+    query,
+    instrument: str,
+    period_from: Optional[date],
+    period_to: Optional[date],
+    region: Optional[str],
+    health_unit_id: Optional[int],
+    age_range: Optional[str]
+):
+    """`query` joined from the instrument's evaluations to their active patients, with the filters applied"""
+    measures = CUBE_INSTRUMENTS[instrument]
+    patient, evaluation = measures.patient, measures.evaluation
+
+    query = query.select_from(evaluation).join(
+        patient, evaluation.patient_id == patient.id
+    ).where(patient.ativo == True)
+
+    if period_from:
+        query = query.where(evaluation.data_avaliacao >= period_from)
+    if period_to:
+        query = query.where(evaluation.data_avaliacao <= period_to)
+    if region:
+        query = query.join(HealthUnit, patient.unidade_saude_id == HealthUnit.id).where(HealthUnit.regiao == region)
+    if health_unit_id:
+        query = query.where(patient.unidade_saude_id == health_unit_id)
+    age_filter = get_age_range_filter(age_range, patient.idade)
+    if age_filter is not None:
+        query = query.where(age_filter)
+
+    return query
+
+
+def _unit_totals(instrument: str, *filters):
+    """Counts and sums of one instrument per health unit (zeros in the other instruments' columns)"""
+    measures = CUBE_INSTRUMENTS[instrument]
+    patient, evaluation = measures.patient, measures.evaluation
+    classification = getattr(evaluation, measures.classification)
+
+    values = [func.count(evaluation.id), func.count(distinct(patient.id))]
+    for column in measures.averages:
+        values += [func.sum(getattr(evaluation, column)), func.count(getattr(evaluation, column))]
+    values += [func.sum(case((classification == value, 1), else_=0)) for value in measures.classes.values()]
+    own = dict(zip(_measure_columns(instrument), values))
+
+    query = select(
+        patient.unidade_saude_id.label("unidade_saude_id"),
+        *[own.get(column, literal_column("0")).label(column) for column in MEASURE_COLUMNS]
+    )
+    return _evaluated(query, instrument, *filters).group_by(patient.unidade_saude_id)
+
+
+def _people_count(*filters):
+    """Distinct CPFs evaluated in any instrument, as a scalar subquery"""
+    people = union(*[
+        _evaluated(select(CUBE_INSTRUMENTS[instrument].patient.cpf), instrument, *filters)
+        for instrument in CUBE_INSTRUMENTS
+    ]).subquery("people")
+    return select(func.count()).select_from(people).scalar_subquery()
+
+
+def _rollup(totals, dialect_name: str):
+    """Roll the per-unit totals up the hierarchy; one row per node with its depth"""
+    sums = [func.sum(totals.c[column]).label(column) for column in MEASURE_COLUMNS]
+    dimensions = [HealthUnit.regiao, HealthUnit.bairro, HealthUnit.id, HealthUnit.nome]
+
+    def grouped():
+        return select().select_from(totals).join(HealthUnit, totals.c.unidade_saude_id == HealthUnit.id)
+
+    if dialect_name == "postgresql":
+        depth = 3 - func.grouping(HealthUnit.regiao) - func.grouping(HealthUnit.bairro) - func.grouping(HealthUnit.id)
+        return grouped().add_columns(depth.label("depth"), *dimensions, *sums).group_by(
+            func.rollup(HealthUnit.regiao, HealthUnit.bairro, tuple_(HealthUnit.id, HealthUnit.nome))
+        )
+
+    levels = []
+    for depth in range(len(CUBE_LEVELS)):
+        keys = dimensions[:depth] if depth < 3 else dimensions
+        levels.append(grouped().add_columns(
+            literal(depth).label("depth"),
+            *keys,
+            *[null().label(column.key) for column in dimensions[len(keys):]],
+            *sums
+        ).group_by(*keys))
+    return union_all(*levels)
+
+
+def get_dashboard_cube(
+    db: Session,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Every node of the city > region > bairro > health unit hierarchy, parents
+    before children, and the number of distinct people (CPFs) evaluated in any
+    instrument.
+    """
+    filters = (period_from, period_to, region, health_unit_id, age_range)
+    totals = union_all(*[_unit_totals(instrument, *filters) for instrument in CUBE_INSTRUMENTS]).subquery("unit_totals")
+
+    cube = _rollup(totals, db.get_bind().dialect.name).subquery("cube")
+    rows = db.execute(
+        select(cube, _people_count(*filters).label("people_count")).order_by(
+            cube.c.depth, cube.c.regiao, cube.c.bairro, cube.c.nome
+        )
+    ).all()
+
+    nodes = []
+    for row in rows:
+        node = {
+            "level": CUBE_LEVELS[row.depth],
+            "regiao": row.regiao,
+            "bairro": row.bairro,
+            "unidade_saude_id": row.id,
+            "unidade_saude": row.nome,
+        }
+        for instrument, measures in CUBE_INSTRUMENTS.items():
+            node[instrument] = {
+                "evaluation_count": row._mapping[f"{instrument}_count"] or 0,
+                "patient_count": row._mapping[f"{instrument}_patients"] or 0,
+                "averages": {
+                    column: (
+                        round(float(row._mapping[f"{instrument}_{column}_sum"]) / row._mapping[f"{instrument}_{column}_n"], 2)
+                        if row._mapping[f"{instrument}_{column}_n"] else None
+                    )
+                    for column in measures.averages
+                },
+                "classifications": {key: row._mapping[f"{instrument}_{key}"] or 0 for key in measures.classes},
+            }
+        nodes.append(node)
+    return nodes, rows[0].people_count if rows else 0
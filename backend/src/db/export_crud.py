@@ -0,0 +1,168 @@
+"""
+SELECT statements behind the bulk exports (see services/export_service.py).
+
+The statements are executed with server-side cursors and streamed, so they only
+build the query; rows are ordered by primary key to keep the scan cheap.
+"""
+from sqlalchemy import and_, func, select, union
+from sqlalchemy.sql import Select
+from typing import Dict, NamedTuple, Optional, Tuple, Type
+from datetime import date
+from models.health_unit import HealthUnit
+from models.ivcf.ivcf_patient import IVCFPatient
+from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from models.factf.factf_patient import FACTFPatient
+from models.factf.factf_evaluation import FACTFEvaluation
+from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+from db.ivcf.ivcf_dashboard_crud import IVCF_DOMAINS, get_age_range_filter
+from db.latest_evaluations import latest_evaluation_id
+
+
+class ExportSpec(NamedTuple):
+    """Tables and evaluation columns exported for an instrument"""
+    patient: Type
+    evaluation: Type
+    classification: str  # Column filtered by the `classification` parameter
+    classifications: Tuple[str, ...]
+    columns: Tuple[str, ...]
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "ivcf": ExportSpec(
+        IVCFPatient,
+        IVCFEvaluation,
+        "classificacao",
+        ("Robusto", "Em Risco", "Frágil"),
+        ("pontuacao_total", "classificacao", *[field for _, field in IVCF_DOMAINS], "comorbidades")
+    ),
+    "factf": ExportSpec(
+        FACTFPatient,
+        FACTFEvaluation,
+        "classificacao_fadiga",
+        ("Sem Fadiga", "Fadiga Leve", "Fadiga Grave"),
+        ("pontuacao_total", "pontuacao_fadiga", "subescala_fadiga", "classificacao_fadiga", "bem_estar_fisico",
+         "bem_estar_social", "bem_estar_emocional", "bem_estar_funcional")
+    ),
+    "physical-activity": ExportSpec(
+        PhysicalActivityPatient,
+        PhysicalActivityEvaluation,
+        "sedentary_risk_level",
+        ("Baixo", "Moderado", "Alto", "Crítico"),
+        ("sedentary_hours_per_day", "screen_time_hours_per_day", "total_weekly_moderate_minutes",
+         "total_weekly_vigorous_minutes", "who_compliance", "sedentary_risk_level")
+    ),
+}
+
+
+def get_evaluations_export(
+    instrument: str,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None,
+    classification: Optional[str] = None
+) -> Select:
+    """One row per evaluation of the active patients, with patient and health unit data"""
+    spec = EXPORTS[instrument]
+    patient, evaluation = spec.patient, spec.evaluation
+
+    statement = select(
+        evaluation.id.label("avaliacao_id"),
+        patient.id.label("paciente_id"),
+        patient.nome_completo,
+        patient.cpf,
+        patient.idade,
+        patient.bairro,
+        HealthUnit.id.label("unidade_saude_id"),
+        HealthUnit.nome.label("unidade_saude"),
+        HealthUnit.regiao,
+        evaluation.data_avaliacao,
+        *[getattr(evaluation, column) for column in spec.columns]
+    ).join(
+        patient, evaluation.patient_id == patient.id
+    ).join(
+        HealthUnit, patient.unidade_saude_id == HealthUnit.id
+    ).where(patient.ativo == True)
+
+    if period_from:
+        statement = statement.where(evaluation.data_avaliacao >= period_from)
+    if period_to:
+        statement = statement.where(evaluation.data_avaliacao <= period_to)
+    if region:
+        statement = statement.where(HealthUnit.regiao == region)
+    if health_unit_id:
+        statement = statement.where(patient.unidade_saude_id == health_unit_id)
+    age_filter = get_age_range_filter(age_range, patient.idade)
+    if age_filter is not None:
+        statement = statement.where(age_filter)
+    if classification:
+        statement = statement.where(getattr(evaluation, spec.classification) == classification)
+
+    return statement.order_by(evaluation.id)
+
+
+def get_patients_export(
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None
+) -> Select:
+    """
+    One row per person (CPF) active in any instrument, with the latest evaluation of each.
+
+    Patient data comes from the first instrument that has the person (IVCF,
+    FACT-F, Physical Activity); instrument columns are empty when the person
+    was never evaluated there.
+    """
+    people = union(*[
+        select(spec.patient.cpf).where(spec.patient.ativo == True) for spec in EXPORTS.values()
+    ]).subquery("people")
+
+    patients = {}
+    evaluations = {}
+    statement = select(people.c.cpf).select_from(people)
+    for instrument, spec in EXPORTS.items():
+        patient, evaluation = spec.patient, spec.evaluation
+        statement = statement.outerjoin(patient, and_(patient.cpf == people.c.cpf, patient.ativo == True))
+        if hasattr(patient, "latest_evaluation_id"):
+            pointer = patient.latest_evaluation_id
+        else:
+            pointer = latest_evaluation_id(patient, evaluation)
+        statement = statement.outerjoin(evaluation, evaluation.id == pointer)
+        patients[instrument], evaluations[instrument] = patient, evaluation
+
+    def first(column: str):
+        return func.coalesce(*[getattr(patient, column) for patient in patients.values()])
+
+    unit_id = first("unidade_saude_id")
+    age = first("idade")
+    statement = statement.outerjoin(HealthUnit, HealthUnit.id == unit_id).add_columns(
+        first("nome_completo").label("nome_completo"),
+        age.label("idade"),
+        first("bairro").label("bairro"),
+        unit_id.label("unidade_saude_id"),
+        HealthUnit.nome.label("unidade_saude"),
+        HealthUnit.regiao,
+        evaluations["ivcf"].data_avaliacao.label("ivcf_data_avaliacao"),
+        evaluations["ivcf"].pontuacao_total.label("ivcf_pontuacao_total"),
+        evaluations["ivcf"].classificacao.label("ivcf_classificacao"),
+        evaluations["factf"].data_avaliacao.label("factf_data_avaliacao"),
+        evaluations["factf"].pontuacao_total.label("factf_pontuacao_total"),
+        evaluations["factf"].subescala_fadiga.label("factf_subescala_fadiga"),
+        evaluations["factf"].classificacao_fadiga.label("factf_classificacao_fadiga"),
+        evaluations["physical-activity"].data_avaliacao.label("atividade_fisica_data_avaliacao"),
+        evaluations["physical-activity"].sedentary_hours_per_day.label("atividade_fisica_sedentary_hours_per_day"),
+        evaluations["physical-activity"].sedentary_risk_level.label("atividade_fisica_sedentary_risk_level"),
+        evaluations["physical-activity"].who_compliance.label("atividade_fisica_who_compliance")
+    )
+
+    if region:
+        statement = statement.where(HealthUnit.regiao == region)
+    if health_unit_id:
+        statement = statement.where(unit_id == health_unit_id)
+    age_filter = get_age_range_filter(age_range, age)
+    if age_filter is not None:
+        statement = statement.where(age_filter)
+
+    return statement.order_by(people.c.cpf)
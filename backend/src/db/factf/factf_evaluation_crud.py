@@ -1,15 +1,19 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, func
-from typing import List, Optional
-from datetime import date, datetime
+from sqlalchemy import Integer, and_, or_, case, cast, desc, func, select
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta
 from models.factf.factf_evaluation import FACTFEvaluation
 from models.factf.factf_patient import FACTFPatient
+from db.latest_evaluations import refresh_latest_evaluation
+from db.sql_functions import month_start
 
 
 def create_factf_evaluation(db: Session, evaluation_data: dict) -> FACTFEvaluation:
     """Create a new FACT-F evaluation"""
     db_evaluation = FACTFEvaluation(**evaluation_data)
     db.add(db_evaluation)
+    db.flush()
+    refresh_latest_evaluation(db, FACTFEvaluation, db_evaluation.patient_id)
     db.commit()
     db.refresh(db_evaluation)
     return db_evaluation
@@ -36,8 +40,11 @@ def update_factf_evaluation(db: Session, evaluation_id: int, evaluation_data: di
     """Update a FACT-F evaluation"""
     db_evaluation = db.query(FACTFEvaluation).filter(FACTFEvaluation.id == evaluation_id).first()
     if db_evaluation:
+        previous_patient_id = db_evaluation.patient_id
         for key, value in evaluation_data.items():
             setattr(db_evaluation, key, value)
+        db.flush()
+        refresh_latest_evaluation(db, FACTFEvaluation, previous_patient_id, db_evaluation.patient_id)
         db.commit()
         db.refresh(db_evaluation)
     return db_evaluation
@@ -48,27 +55,22 @@ def delete_factf_evaluation(db: Session, evaluation_id: int) -> bool:
     db_evaluation = db.query(FACTFEvaluation).filter(FACTFEvaluation.id == evaluation_id).first()
     if db_evaluation:
         db.delete(db_evaluation)
+        db.flush()
+        refresh_latest_evaluation(db, FACTFEvaluation, db_evaluation.patient_id)
         db.commit()
         return True
     return False
 
 
 def get_latest_evaluation_by_patient(db: Session, patient_id: int) -> Optional[FACTFEvaluation]:
-    """Get the latest evaluation for a patient"""
-    return db.query(FACTFEvaluation).filter(
-        FACTFEvaluation.patient_id == patient_id
-    ).order_by(desc(FACTFEvaluation.data_avaliacao)).first()
+    """Get the latest evaluation for a patient (through the patient's latest_evaluation_id)"""
+    return db.query(FACTFEvaluation).join(
+        FACTFPatient, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
+    ).filter(FACTFPatient.id == patient_id).first()
 
 
 def get_critical_patients(db: Session, min_fatigue_score: float = 30.0) -> List[dict]:
-    """Get patients with critical fatigue levels"""
-    # Subquery to get latest evaluation for each patient
-    latest_eval_subquery = db.query(
-        FACTFEvaluation.patient_id,
-        func.max(FACTFEvaluation.data_avaliacao).label('latest_date')
-    ).group_by(FACTFEvaluation.patient_id).subquery()
-    
-    # Main query for critical patients
+    """Get patients whose latest evaluation has a critical fatigue level"""
     query = db.query(
         FACTFPatient.id,
         FACTFPatient.nome_completo,
@@ -79,14 +81,7 @@ def get_critical_patients(db: Session, min_fatigue_score: float = 30.0) -> List[
         FACTFEvaluation.classificacao_fadiga,
         FACTFEvaluation.data_avaliacao
     ).join(
-        latest_eval_subquery,
-        FACTFPatient.id == latest_eval_subquery.c.patient_id
-    ).join(
-        FACTFEvaluation,
-        and_(
-            FACTFEvaluation.patient_id == FACTFPatient.id,
-            FACTFEvaluation.data_avaliacao == latest_eval_subquery.c.latest_date
-        )
+        FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
     ).filter(
         and_(
             FACTFPatient.ativo == True,
@@ -121,6 +116,77 @@ def get_evaluations_by_date_range(
     ).order_by(desc(FACTFEvaluation.data_avaliacao)).offset(skip).limit(limit).all()
 
 
+def _percentile_columns(source, columns: Tuple[str, ...], percentiles: Tuple[int, ...], ranked: bool) -> list:
+    """
+    Continuous percentiles (same interpolation as percentile_cont) of `columns`
+    per month of `source`.
+
+    PostgreSQL aggregates them with percentile_cont ... WITHIN GROUP. SQLite has
+    no ordered-set aggregates: there `source` is `ranked`, carrying
+    <column>_rank (1-based position in the month) and month_count window
+    columns, and the two values around each position are picked with
+    conditional aggregates.
+    """
+    if not ranked:
+        return [
+            func.percentile_cont(percentile / 100).within_group(source.c[column]).label(f"{column}_p{percentile}")
+            for column in columns for percentile in percentiles
+        ]
+
+    result = []
+    for column in columns:
+        value, rank = source.c[column], source.c[f"{column}_rank"]
+        for percentile in percentiles:
+            # 0-based position of the percentile in the month, split into whole and fractional part
+            position = (source.c.month_count - 1) * (percentile / 100)
+            lower_rank = cast(position, Integer) + 1
+            fraction = func.max(position - (lower_rank - 1))
+            lower = func.max(case((rank == lower_rank, value)))
+            upper = func.coalesce(func.max(case((rank == lower_rank + 1, value))), lower)
+            result.append((lower + fraction * (upper - lower)).label(f"{column}_p{percentile}"))
+    return result
+
+
+def get_monthly_score_stats(
+    db: Session,
+    start_month: date,
+    percentiles: Tuple[int, ...] = (25, 50, 75)
+) -> List[dict]:
+    """
+    Evaluation count, averages and percentiles of the total and fatigue scores
+    per calendar month since `start_month` (active patients, months with data only).
+    """
+    columns = ("pontuacao_total", "subescala_fadiga")
+    ranked = db.get_bind().dialect.name != "postgresql"
+    month = month_start(FACTFEvaluation.data_avaliacao)
+    ranks = [
+        func.row_number().over(partition_by=month, order_by=getattr(FACTFEvaluation, column)).label(f"{column}_rank")
+        for column in columns
+    ] + [func.count().over(partition_by=month).label("month_count")]
+    source = select(
+        month.label("month"),
+        *[getattr(FACTFEvaluation, column) for column in columns],
+        *(ranks if ranked else [])
+    ).join(
+        FACTFPatient, FACTFEvaluation.patient_id == FACTFPatient.id
+    ).where(
+        and_(
+            FACTFPatient.ativo == True,
+            FACTFEvaluation.data_avaliacao >= start_month
+        )
+    ).subquery("monthly_scores")
+
+    results = db.query(
+        source.c.month,
+        func.count().label('evaluations_count'),
+        func.avg(source.c.pontuacao_total).label('average_total_score'),
+        func.avg(source.c.subescala_fadiga).label('average_fatigue_score'),
+        *_percentile_columns(source, columns, percentiles, ranked)
+    ).group_by(source.c.month).order_by(source.c.month).all()
+
+    return [dict(row._mapping) for row in results]
+
+
 def get_evaluations_by_classification(
     db: Session, 
     classificacao: str,
@@ -161,11 +227,70 @@ def get_domain_averages(db: Session, start_date: Optional[date] = None, end_date
     }
 
 
+def get_summary_stats(
+    db: Session,
+    today: date,
+    window_days: int = 30,
+    critical_fatigue_score: float = 30.0
+) -> dict:
+    """
+    Everything the dashboard summary needs in one statement.
+
+    Patient counts come from scalar subqueries (active patients, and active
+    patients whose latest evaluation is critical); averages and the evaluation
+    counts of the last `window_days` [today - window_days, today] and of the
+    window before it [today - 2 * window_days, today - window_days) are
+    aggregated in the same scan of the evaluations.
+    """
+    recent_start = today - timedelta(days=window_days)
+    previous_start = today - timedelta(days=2 * window_days)
+
+    total_patients = db.query(func.count(FACTFPatient.id)).filter(
+        FACTFPatient.ativo == True
+    ).scalar_subquery()
+    critical_patients = db.query(func.count(FACTFPatient.id)).join(
+        FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
+    ).filter(
+        and_(
+            FACTFPatient.ativo == True,
+            FACTFEvaluation.subescala_fadiga <= critical_fatigue_score
+        )
+    ).scalar_subquery()
+
+    result = db.query(
+        total_patients.label('total_patients'),
+        critical_patients.label('critical_patients'),
+        func.avg(FACTFEvaluation.bem_estar_fisico).label('avg_fisico'),
+        func.avg(FACTFEvaluation.bem_estar_social).label('avg_social'),
+        func.avg(FACTFEvaluation.bem_estar_emocional).label('avg_emocional'),
+        func.avg(FACTFEvaluation.bem_estar_funcional).label('avg_funcional'),
+        func.avg(FACTFEvaluation.subescala_fadiga).label('avg_fadiga'),
+        func.avg(FACTFEvaluation.pontuacao_total).label('avg_total'),
+        func.count(case((
+            and_(FACTFEvaluation.data_avaliacao >= recent_start, FACTFEvaluation.data_avaliacao <= today), 1
+        ))).label('recent_evaluations'),
+        func.count(case((
+            and_(FACTFEvaluation.data_avaliacao >= previous_start, FACTFEvaluation.data_avaliacao < recent_start), 1
+        ))).label('previous_evaluations')
+    ).select_from(FACTFEvaluation).one()
+
+    return {
+        'total_patients': result.total_patients or 0,
+        'critical_patients': result.critical_patients or 0,
+        'recent_evaluations': result.recent_evaluations or 0,
+        'previous_evaluations': result.previous_evaluations or 0,
+        'bem_estar_fisico': float(result.avg_fisico or 0),
+        'bem_estar_social': float(result.avg_social or 0),
+        'bem_estar_emocional': float(result.avg_emocional or 0),
+        'bem_estar_funcional': float(result.avg_funcional or 0),
+        'subescala_fadiga': float(result.avg_fadiga or 0),
+        'pontuacao_total': float(result.avg_total or 0)
+    }
+
+
 def get_patient_latest_domain_scores(db: Session, patient_id: int) -> Optional[dict]:
     """Get the latest domain scores for a specific patient"""
-    latest_evaluation = db.query(FACTFEvaluation).filter(
-        FACTFEvaluation.patient_id == patient_id
-    ).order_by(desc(FACTFEvaluation.data_avaliacao)).first()
+    latest_evaluation = get_latest_evaluation_by_patient(db, patient_id)
     
     if not latest_evaluation:
         return None
@@ -1,14 +1,20 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional
+from sqlalchemy import or_, desc, func, select
+from typing import List, Optional, Tuple
+from datetime import date
 from models.factf.factf_patient import FACTFPatient
 from models.factf.factf_evaluation import FACTFEvaluation
+from db.comorbidities import refresh_patient_comorbidities
+from db.ivcf.ivcf_dashboard_crud import get_age_range_filter
+from db.pagination import nulls_last, paginate
 
 
 def create_factf_patient(db: Session, patient_data: dict) -> FACTFPatient:
     """Create a new FACT-F patient"""
     db_patient = FACTFPatient(**patient_data)
     db.add(db_patient)
+    db.flush()
+    refresh_patient_comorbidities(db, FACTFPatient, db_patient.id)
     db.commit()
     db.refresh(db_patient)
     return db_patient
@@ -55,10 +61,9 @@ def get_factf_patients(
     
     # Filter by fatigue classification from latest evaluation
     if classificacao_fadiga:
-        subquery = db.query(FACTFEvaluation.patient_id).filter(
-            FACTFEvaluation.classificacao_fadiga == classificacao_fadiga
-        ).subquery()
-        query = query.filter(FACTFPatient.id.in_(subquery))
+        query = query.join(
+            FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
+        ).filter(FACTFEvaluation.classificacao_fadiga == classificacao_fadiga)
     
     return query.offset(skip).limit(limit).all()
 
@@ -69,6 +74,8 @@ def update_factf_patient(db: Session, patient_id: int, patient_data: dict) -> Op
     if db_patient:
         for key, value in patient_data.items():
             setattr(db_patient, key, value)
+        db.flush()
+        refresh_patient_comorbidities(db, FACTFPatient, patient_id)
         db.commit()
         db.refresh(db_patient)
     return db_patient
@@ -101,13 +108,6 @@ def count_factf_patients(db: Session, active_only: bool = True) -> int:
 
 def get_patients_with_latest_evaluation(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
     """Get patients with their latest evaluation data"""
-    # Subquery to get latest evaluation for each patient
-    latest_eval_subquery = db.query(
-        FACTFEvaluation.patient_id,
-        FACTFEvaluation.data_avaliacao.label('latest_date')
-    ).group_by(FACTFEvaluation.patient_id).subquery()
-    
-    # Main query joining patients with their latest evaluation
     query = db.query(
         FACTFPatient,
         FACTFEvaluation.pontuacao_total,
@@ -115,14 +115,79 @@ def get_patients_with_latest_evaluation(db: Session, skip: int = 0, limit: int =
         FACTFEvaluation.classificacao_fadiga,
         FACTFEvaluation.data_avaliacao
     ).outerjoin(
-        latest_eval_subquery,
-        FACTFPatient.id == latest_eval_subquery.c.patient_id
-    ).outerjoin(
-        FACTFEvaluation,
-        and_(
-            FACTFEvaluation.patient_id == FACTFPatient.id,
-            FACTFEvaluation.data_avaliacao == latest_eval_subquery.c.latest_date
-        )
+        FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
     ).filter(FACTFPatient.ativo == True)
     
-    return query.offset(skip).limit(limit).all()
\ No newline at end of file
+    return query.offset(skip).limit(limit).all()
+
+# Sort options of the patient summary -> (column, placeholder for patients without evaluations)
+SUMMARY_SORTS = {
+    "name": (FACTFPatient.nome_completo, None),
+    "age": (FACTFPatient.idade, None),
+    "last_score": (FACTFEvaluation.pontuacao_total, 0.0),
+    "fatigue_score": (FACTFEvaluation.subescala_fadiga, 0.0),
+    "evaluation_date": (FACTFEvaluation.data_avaliacao, date.min),
+}
+
+
+def get_patients_summary_page(
+    db: Session,
+    sort_by: str = "name",
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    classificacao_fadiga: Optional[str] = None,
+    age_range: Optional[str] = None,
+    bairro: Optional[str] = None,
+    unidade_saude_id: Optional[int] = None,
+    search: Optional[str] = None
+) -> Tuple[list, Optional[str], int]:
+    """
+    One page of active patients with their latest evaluation (through
+    latest_evaluation_id), sorted and filtered in the database.
+
+    Returns (rows, next cursor, total matching patients). The total comes from
+    a scalar subquery of the same statement; only a cursor past the last page
+    needs a separate count. Raises ValueError for an invalid cursor.
+    """
+    conditions = [FACTFPatient.ativo == True]
+    if classificacao_fadiga:
+        conditions.append(FACTFEvaluation.classificacao_fadiga == classificacao_fadiga)
+    age_filter = get_age_range_filter(age_range, FACTFPatient.idade)
+    if age_filter is not None:
+        conditions.append(age_filter)
+    if bairro:
+        conditions.append(FACTFPatient.bairro.ilike(f"%{bairro}%"))
+    if unidade_saude_id:
+        conditions.append(FACTFPatient.unidade_saude_id == unidade_saude_id)
+    if search:
+        conditions.append(FACTFPatient.nome_completo.ilike(f"%{search}%"))
+
+    total = select(func.count(FACTFPatient.id)).outerjoin(
+        FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
+    ).where(*conditions).correlate(None).scalar_subquery()
+
+    query = db.query(
+        FACTFPatient.id,
+        FACTFPatient.nome_completo,
+        FACTFPatient.idade,
+        FACTFEvaluation.pontuacao_total,
+        FACTFEvaluation.subescala_fadiga,
+        FACTFEvaluation.classificacao_fadiga,
+        FACTFEvaluation.data_avaliacao,
+        total.label("total_count")
+    ).outerjoin(
+        FACTFEvaluation, FACTFPatient.latest_evaluation_id == FACTFEvaluation.id
+    ).filter(*conditions)
+
+    column, placeholder = SUMMARY_SORTS[sort_by]
+    keys = nulls_last(column, descending, placeholder) if placeholder is not None else [(column, descending)]
+    rows, next_cursor = paginate(query, keys + [(FACTFPatient.id, descending)], cursor, limit)
+
+    if rows:
+        total_count = rows[0].total_count
+    elif cursor:
+        total_count = db.execute(select(total)).scalar()
+    else:
+        total_count = 0
+    return rows, next_cursor, total_count
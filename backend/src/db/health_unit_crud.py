@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List, Optional
 from models.health_unit import HealthUnit
+from db.monthly_rollups import add_health_unit_to_rollups, remove_health_unit_from_rollups
 
 
 def create_health_unit(db: Session, health_unit_data: dict) -> HealthUnit:
@@ -47,10 +48,19 @@ def update_health_unit(db: Session, health_unit_id: int, health_unit_data: dict)
     if not db_health_unit:
         return None
     
+    # The region is part of the monthly rollup key
+    region_changed = health_unit_data.get("regiao") not in (None, db_health_unit.regiao)
+    if region_changed:
+        remove_health_unit_from_rollups(db, health_unit_id)
+    
     for key, value in health_unit_data.items():
         if value is not None:
             setattr(db_health_unit, key, value)
     
+    if region_changed:
+        db.flush()
+        add_health_unit_to_rollups(db, health_unit_id)
+    
     db.commit()
     db.refresh(db_health_unit)
     return db_health_unit
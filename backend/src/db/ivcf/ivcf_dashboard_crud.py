@@ -1,19 +1,72 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, case, func, desc
 from typing import Dict, Any, Optional
 from datetime import date, datetime, timedelta
 from models.ivcf.ivcf_evaluation import IVCFEvaluation
 from models.ivcf.ivcf_patient import IVCFPatient
 from models.health_unit import HealthUnit
+from db.sql_functions import year_month
 
 
-def get_ivcf_summary(db: Session) -> Dict[str, Any]:
-    """Get IVCF summary statistics"""
-    
-    # Get total evaluations count
-    total_evaluations = db.query(IVCFEvaluation).join(
+# (label, column) of the eight IVCF-20 domains, in chart order
+IVCF_DOMAINS = [
+    ("Idade", "dominio_idade"),
+    ("Comorbidades", "dominio_comorbidades"),
+    ("Comunicação", "dominio_comunicacao"),
+    ("Mobilidade", "dominio_mobilidade"),
+    ("Humor", "dominio_humor"),
+    ("Cognição", "dominio_cognicao"),
+    ("AVD", "dominio_avd"),
+    ("Autopercepção", "dominio_autopercepcao")
+]
+
+
+# Short (pt-BR) month names by 'MM'
+MONTH_NAMES = {
+    "01": "Jan", "02": "Fev", "03": "Mar", "04": "Abr",
+    "05": "Mai", "06": "Jun", "07": "Jul", "08": "Ago",
+    "09": "Set", "10": "Out", "11": "Nov", "12": "Dez"
+}
+
+
+def shift_months(day: date, months: int) -> date:
+    """First day of the month `months` months before `day`"""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_ivcf_summary(
+    db: Session,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None
+) -> Dict[str, Any]:
+    """Get IVCF summary statistics (single query with conditional aggregates)"""
+    
+    is_fragile = IVCFEvaluation.classificacao == "Frágil"
+    query = db.query(
+        func.count(IVCFEvaluation.id).label('total'),
+        func.sum(case((is_fragile, 1), else_=0)).label('fragile'),
+        func.sum(case((IVCFEvaluation.classificacao == "Em Risco", 1), else_=0)).label('risk'),
+        func.sum(case((IVCFEvaluation.classificacao == "Robusto", 1), else_=0)).label('robust'),
+        func.avg(IVCFEvaluation.pontuacao_total).label('average_score'),
+        # Critical patients: Frágil with score >= 20
+        func.sum(case((and_(is_fragile, IVCFEvaluation.pontuacao_total >= 20), 1), else_=0)).label('critical')
+    ).select_from(IVCFEvaluation).join(
         IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).filter(IVCFPatient.ativo == True).count()
+    )
+    
+    # The health unit is only needed for the region filter
+    if region:
+        query = query.join(HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id)
+    
+    row = apply_dashboard_filters(
+        query, period_from, period_to, region, health_unit_id, age_range
+    ).one()
+    
+    total_evaluations = row.total
     
     if total_evaluations == 0:
         return {
@@ -25,60 +78,13 @@ def get_ivcf_summary(db: Session) -> Dict[str, Any]:
             "critical_patients": 0
         }
     
-    # Get classification counts
-    classification_counts = db.query(
-        IVCFEvaluation.classificacao,
-        func.count(IVCFEvaluation.id).label('count')
-    ).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).filter(
-        IVCFPatient.ativo == True
-    ).group_by(IVCFEvaluation.classificacao).all()
-    
-    # Calculate percentages
-    fragile_count = 0
-    risk_count = 0
-    robust_count = 0
-    
-    for classification, count in classification_counts:
-        if classification == "Frágil":
-            fragile_count = count
-        elif classification == "Em Risco":
-            risk_count = count
-        elif classification == "Robusto":
-            robust_count = count
-    
-    fragile_percentage = round((fragile_count / total_evaluations) * 100, 1)
-    risk_percentage = round((risk_count / total_evaluations) * 100, 1)
-    robust_percentage = round((robust_count / total_evaluations) * 100, 1)
-    
-    # Get average score
-    avg_score_result = db.query(
-        func.avg(IVCFEvaluation.pontuacao_total).label('average_score')
-    ).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).filter(IVCFPatient.ativo == True).first()
-    
-    average_score = round(avg_score_result.average_score or 0, 1)
-    
-    # Get critical patients count (Frágil with score >= 20)
-    critical_patients = db.query(IVCFEvaluation).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).filter(
-        and_(
-            IVCFPatient.ativo == True,
-            IVCFEvaluation.classificacao == "Frágil",
-            IVCFEvaluation.pontuacao_total >= 20
-        )
-    ).count()
-    
     return {
         "total_elderly": total_evaluations,
-        "fragile_percentage": fragile_percentage,
-        "risk_percentage": risk_percentage,
-        "robust_percentage": robust_percentage,
-        "average_score": average_score,
-        "critical_patients": critical_patients
+        "fragile_percentage": round((row.fragile / total_evaluations) * 100, 1),
+        "risk_percentage": round((row.risk / total_evaluations) * 100, 1),
+        "robust_percentage": round((row.robust / total_evaluations) * 100, 1),
+        "average_score": round(float(row.average_score or 0), 1),
+        "critical_patients": row.critical
     }
 
 
@@ -116,24 +122,32 @@ def get_dashboard_filters_applied(
     return filters
 
 
-def get_total_patients_with_filters(
-    db: Session,
+def get_age_range_filter(age_range: Optional[str], age_column=IVCFPatient.idade):
+    """SQL condition for an age range (60-70, 71-80, 81+); None when not filtering"""
+    if age_range == "60-70":
+        return and_(age_column >= 60, age_column <= 70)
+    elif age_range == "71-80":
+        return and_(age_column >= 71, age_column <= 80)
+    elif age_range == "81+":
+        return age_column >= 81
+    return None
+
+
+def apply_dashboard_filters(
+    query,
     period_from: Optional[date] = None,
     period_to: Optional[date] = None,
     region: Optional[str] = None,
     health_unit_id: Optional[int] = None,
     age_range: Optional[str] = None,
     classification: Optional[str] = None
-) -> int:
-    """Get total patients count with applied filters"""
-    
-    query = db.query(IVCFEvaluation).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).join(
-        HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
-    ).filter(IVCFPatient.ativo == True)
+):
+    """
+    Apply the dashboard filter set to a query over IVCFEvaluation joined to
+    IVCFPatient and HealthUnit (active patients only).
+    """
+    query = query.filter(IVCFPatient.ativo == True)
     
-    # Apply filters
     if period_from:
         query = query.filter(IVCFEvaluation.data_avaliacao >= period_from)
     
@@ -146,17 +160,36 @@ def get_total_patients_with_filters(
     if health_unit_id:
         query = query.filter(IVCFPatient.unidade_saude_id == health_unit_id)
     
-    if age_range:
-        if age_range == "60-70":
-            query = query.filter(and_(IVCFPatient.idade >= 60, IVCFPatient.idade <= 70))
-        elif age_range == "71-80":
-            query = query.filter(and_(IVCFPatient.idade >= 71, IVCFPatient.idade <= 80))
-        elif age_range == "81+":
-            query = query.filter(IVCFPatient.idade >= 81)
+    age_filter = get_age_range_filter(age_range)
+    if age_filter is not None:
+        query = query.filter(age_filter)
     
     if classification:
         query = query.filter(IVCFEvaluation.classificacao == classification)
     
+    return query
+
+
+def get_total_patients_with_filters(
+    db: Session,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None,
+    classification: Optional[str] = None
+) -> int:
+    """Get total patients count with applied filters"""
+    
+    query = db.query(IVCFEvaluation).join(
+        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
+    ).join(
+        HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
+    )
+    query = apply_dashboard_filters(
+        query, period_from, period_to, region, health_unit_id, age_range, classification
+    )
+    
     return query.count()
 
 
@@ -231,70 +264,286 @@ def get_fragile_elderly_percentage(
     health_unit_id: Optional[int] = None,
     age_range: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Get percentage of fragile elderly with filters"""
-    
-    # Base query for total elderly
-    total_query = db.query(IVCFEvaluation).join(
+    """
+    Get percentage of fragile elderly with filters.
+    
+    A single filtered scan grouped by region counts every classification;
+    the overall totals are the sum of the region subtotals.
+    """
+    
+    query = db.query(
+        HealthUnit.regiao.label('region'),
+        func.count(IVCFEvaluation.id).label('total'),
+        func.sum(case((IVCFEvaluation.classificacao == "Robusto", 1), else_=0)).label('robust'),
+        func.sum(case((IVCFEvaluation.classificacao == "Em Risco", 1), else_=0)).label('risk'),
+        func.sum(case((IVCFEvaluation.classificacao == "Frágil", 1), else_=0)).label('fragile')
+    ).select_from(IVCFEvaluation).join(
         IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
     ).join(
         HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
-    ).filter(IVCFPatient.ativo == True)
+    )
+    query = apply_dashboard_filters(
+        query, period_from, period_to, region, health_unit_id, age_range
+    ).group_by(HealthUnit.regiao).order_by(HealthUnit.regiao)
+    
+    breakdown = {"robust": 0, "risk": 0, "fragile": 0}
+    regions = []
+    
+    for row in query.all():
+        breakdown["robust"] += row.robust
+        breakdown["risk"] += row.risk
+        breakdown["fragile"] += row.fragile
+        regions.append({
+            "region": row.region,
+            "total_patients": row.total,
+            "fragile_patients": row.fragile,
+            "fragile_percentage": round((row.fragile / row.total) * 100, 1),
+            "breakdown": {"robust": row.robust, "risk": row.risk, "fragile": row.fragile}
+        })
+    
+    total_elderly = sum(item["total_patients"] for item in regions)
+    fragile_elderly = breakdown["fragile"]
     
-    # Base query for fragile elderly
-    fragile_query = db.query(IVCFEvaluation).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-    ).join(
-        HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
+    # Calculate percentage
+    if total_elderly == 0:
+        fragile_percentage = 0.0
+    else:
+        fragile_percentage = round((fragile_elderly / total_elderly) * 100, 1)
+    
+    return {
+        "total_elderly": total_elderly,
+        "fragile_elderly": fragile_elderly,
+        "fragile_percentage": fragile_percentage,
+        "breakdown": breakdown,
+        "regions": regions
+    }
+
+
+def get_dashboard_snapshot(
+    db: Session,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    region: Optional[str] = None,
+    health_unit_id: Optional[int] = None,
+    age_range: Optional[str] = None,
+    months_back: int = 6,
+    from_last_evaluation: bool = False,
+    pontuacao_minima: int = 20
+) -> Dict[str, Any]:
+    """
+    Get every IVCF dashboard widget for one filter set.
+    
+    The filtered evaluations (joined to patient and health unit once) are a
+    CTE. One aggregate over it, grouped by (region, bairro, month,
+    classification), yields a few hundred rows from which the summary, domain
+    distribution, region averages, monthly evolution and fragile percentage
+    are derived; a second, index-friendly query over the same CTE lists the
+    critical patients.
+    """
+    
+    filtered = apply_dashboard_filters(
+        db.query(
+            IVCFEvaluation.patient_id,
+            IVCFEvaluation.data_avaliacao,
+            IVCFEvaluation.pontuacao_total,
+            IVCFEvaluation.classificacao,
+            IVCFEvaluation.comorbidades,
+            *[getattr(IVCFEvaluation, domain_field) for _, domain_field in IVCF_DOMAINS],
+            IVCFPatient.nome_completo,
+            IVCFPatient.idade,
+            IVCFPatient.bairro,
+            HealthUnit.nome.label('unidade_saude'),
+            HealthUnit.regiao,
+            HealthUnit.bairro.label('unidade_bairro')
+        ).select_from(IVCFEvaluation).join(
+            IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
+        ).join(
+            HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
+        ),
+        period_from, period_to, region, health_unit_id, age_range
+    ).cte("filtered_evaluations")
+    
+    month = year_month(filtered.c.data_avaliacao)
+    is_critical = and_(filtered.c.classificacao == "Frágil", filtered.c.pontuacao_total >= 20)
+    aggregates = [
+        filtered.c.regiao,
+        filtered.c.unidade_bairro,
+        month.label('month'),
+        filtered.c.classificacao,
+        func.count().label('total'),
+        func.sum(filtered.c.pontuacao_total).label('score_sum'),
+        func.sum(case((is_critical, 1), else_=0)).label('critical')
+    ]
+    for _, domain_field in IVCF_DOMAINS:
+        column = filtered.c[domain_field]
+        aggregates += [
+            func.sum(column).label(f"{domain_field}_sum"),
+            func.min(column).label(f"{domain_field}_min"),
+            func.max(column).label(f"{domain_field}_max")
+        ]
+    
+    groups = db.query(*aggregates).group_by(
+        filtered.c.regiao, filtered.c.unidade_bairro, month, filtered.c.classificacao
+    ).all()
+    
+    critical_patients = db.query(
+        filtered.c.patient_id,
+        filtered.c.nome_completo,
+        filtered.c.idade,
+        filtered.c.bairro,
+        filtered.c.unidade_saude,
+        filtered.c.pontuacao_total,
+        filtered.c.classificacao,
+        filtered.c.comorbidades,
+        filtered.c.data_avaliacao.label('data_ultima_avaliacao')
     ).filter(
         and_(
-            IVCFPatient.ativo == True,
-            IVCFEvaluation.classificacao == "Frágil"
+            filtered.c.classificacao == "Frágil",
+            filtered.c.pontuacao_total >= pontuacao_minima
         )
-    )
-    
-    # Apply filters to both queries
-    if period_from:
-        total_query = total_query.filter(IVCFEvaluation.data_avaliacao >= period_from)
-        fragile_query = fragile_query.filter(IVCFEvaluation.data_avaliacao >= period_from)
+    ).order_by(desc(filtered.c.pontuacao_total))
     
-    if period_to:
-        total_query = total_query.filter(IVCFEvaluation.data_avaliacao <= period_to)
-        fragile_query = fragile_query.filter(IVCFEvaluation.data_avaliacao <= period_to)
-    
-    if region:
-        total_query = total_query.filter(HealthUnit.regiao == region)
-        fragile_query = fragile_query.filter(HealthUnit.regiao == region)
-    
-    if health_unit_id:
-        total_query = total_query.filter(IVCFPatient.unidade_saude_id == health_unit_id)
-        fragile_query = fragile_query.filter(IVCFPatient.unidade_saude_id == health_unit_id)
+    return {
+        **_snapshot_widgets(groups, months_back, from_last_evaluation),
+        "critical_patients": [dict(row._mapping) for row in critical_patients.all()]
+    }
+
+
+_CLASSIFICATION_KEYS = {"Robusto": "robust", "Em Risco": "risk", "Frágil": "fragile"}
+
+
+def _snapshot_widgets(groups, months_back: int, from_last_evaluation: bool) -> Dict[str, Any]:
+    """Fold the (region, bairro, month, classification) groups into the dashboard widgets"""
+    
+    def empty_counts() -> Dict[str, int]:
+        return {"robust": 0, "risk": 0, "fragile": 0}
+    
+    total = score_sum = critical = 0
+    counts = empty_counts()
+    domain_sums = {domain_field: 0 for _, domain_field in IVCF_DOMAINS}
+    domain_mins: Dict[str, int] = {}
+    domain_maxs: Dict[str, int] = {}
+    neighbourhoods: Dict[tuple, Dict[str, Any]] = {}
+    regions: Dict[str, Dict[str, int]] = {}
+    months: Dict[str, Dict[str, int]] = {}
+    
+    domain_keys = [
+        (domain_field, f"{domain_field}_sum", f"{domain_field}_min", f"{domain_field}_max")
+        for _, domain_field in IVCF_DOMAINS
+    ]
     
-    if age_range:
-        if age_range == "60-70":
-            age_filter = and_(IVCFPatient.idade >= 60, IVCFPatient.idade <= 70)
-        elif age_range == "71-80":
-            age_filter = and_(IVCFPatient.idade >= 71, IVCFPatient.idade <= 80)
-        elif age_range == "81+":
-            age_filter = IVCFPatient.idade >= 81
-        else:
-            age_filter = None
+    for group in groups:
+        row = group._mapping
+        key = _CLASSIFICATION_KEYS.get(group.classificacao)
+        total += group.total
+        score_sum += group.score_sum
+        critical += group.critical
+        if key:
+            counts[key] += group.total
+        
+        for domain_field, sum_key, min_key, max_key in domain_keys:
+            domain_sums[domain_field] += row[sum_key]
+            group_min, group_max = row[min_key], row[max_key]
+            if domain_field not in domain_mins:
+                domain_mins[domain_field], domain_maxs[domain_field] = group_min, group_max
+            else:
+                domain_mins[domain_field] = min(domain_mins[domain_field], group_min)
+                domain_maxs[domain_field] = max(domain_maxs[domain_field], group_max)
         
-        if age_filter is not None:
-            total_query = total_query.filter(age_filter)
-            fragile_query = fragile_query.filter(age_filter)
+        neighbourhood_key = (group.regiao, group.unidade_bairro)
+        if neighbourhood_key not in neighbourhoods:
+            neighbourhoods[neighbourhood_key] = {"total": 0, "score_sum": 0, **empty_counts()}
+        if group.regiao not in regions:
+            regions[group.regiao] = {"total": 0, **empty_counts()}
+        if group.month not in months:
+            months[group.month] = {"total": 0, **empty_counts()}
+        neighbourhood = neighbourhoods[neighbourhood_key]
+        for bucket in (neighbourhood, regions[group.regiao], months[group.month]):
+            bucket["total"] += group.total
+            if key:
+                bucket[key] += group.total
+        neighbourhood["score_sum"] += group.score_sum
+    
+    def percentage(part: int, whole: int) -> float:
+        return round((part / whole) * 100, 1) if whole else 0.0
+    
+    summary = {
+        "total_elderly": total,
+        "fragile_percentage": percentage(counts["fragile"], total),
+        "risk_percentage": percentage(counts["risk"], total),
+        "robust_percentage": percentage(counts["robust"], total),
+        "average_score": round(score_sum / total, 1) if total else 0.0,
+        "critical_patients": critical
+    }
     
-    # Get counts
-    total_elderly = total_query.count()
-    fragile_elderly = fragile_query.count()
+    domains = [
+        {
+            "domain": domain_name,
+            "average_score": round(domain_sums[domain_field] / total, 1),
+            "min_score": domain_mins[domain_field],
+            "max_score": domain_maxs[domain_field],
+            "patient_count": total
+        }
+        for domain_name, domain_field in IVCF_DOMAINS
+    ] if total else []
+    
+    region_averages = [
+        {
+            "regiao": regiao,
+            "bairro": bairro,
+            "average_score": data["score_sum"] / data["total"],
+            "patient_count": data["total"],
+            "fragile_count": data["fragile"],
+            "risk_count": data["risk"],
+            "robust_count": data["robust"]
+        }
+        for (regiao, bairro), data in sorted(neighbourhoods.items())
+    ]
     
-    # Calculate percentage
-    if total_elderly == 0:
-        fragile_percentage = 0.0
+    # Same window as get_monthly_evolution, counted from today or from the latest month with data
+    if from_last_evaluation:
+        if months:
+            latest = max(months)
+            start_month = shift_months(date(int(latest[:4]), int(latest[5:7]), 1), months_back - 1)
+        else:
+            start_month = date.today()
     else:
-        fragile_percentage = round((fragile_elderly / total_elderly) * 100, 1)
+        start_month = shift_months(date.today(), months_back)
+    start_key = start_month.strftime("%Y-%m")
+    evolution = [
+        {
+            "month": MONTH_NAMES.get(month_key[5:7], month_key[5:7]),
+            "year": int(month_key[:4]),
+            "robust": data["robust"],
+            "risk": data["risk"],
+            "fragile": data["fragile"],
+            "total": data["total"]
+        }
+        for month_key, data in sorted(months.items())
+        if month_key >= start_key
+    ]
+    
+    fragile_percentage = {
+        "total_elderly": total,
+        "fragile_elderly": counts["fragile"],
+        "fragile_percentage": percentage(counts["fragile"], total),
+        "breakdown": counts,
+        "regions": [
+            {
+                "region": regiao,
+                "total_patients": data["total"],
+                "fragile_patients": data["fragile"],
+                "fragile_percentage": percentage(data["fragile"], data["total"]),
+                "breakdown": {"robust": data["robust"], "risk": data["risk"], "fragile": data["fragile"]}
+            }
+            for regiao, data in sorted(regions.items())
+        ]
+    }
     
     return {
-        "total_elderly": total_elderly,
-        "fragile_elderly": fragile_elderly,
+        "summary": summary,
+        "domains": domains,
+        "region_averages": region_averages,
+        "evolution": evolution,
         "fragile_percentage": fragile_percentage
     }
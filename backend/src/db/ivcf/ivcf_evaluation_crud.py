@@ -3,14 +3,21 @@ from sqlalchemy import and_, func, desc, case
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime
 from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from models.ivcf.ivcf_monthly_rollup import IVCFMonthlyRollup
 from models.ivcf.ivcf_patient import IVCFPatient
 from models.health_unit import HealthUnit
+from db.ivcf.ivcf_dashboard_crud import IVCF_DOMAINS, MONTH_NAMES, apply_dashboard_filters, shift_months
+from db.comorbidities import refresh_patient_comorbidities
+from db.monthly_rollups import add_to_rollups, remove_from_rollups
 
 
 def create_ivcf_evaluation(db: Session, evaluation_data: dict) -> IVCFEvaluation:
     """Create a new IVCF evaluation"""
     db_evaluation = IVCFEvaluation(**evaluation_data)
     db.add(db_evaluation)
+    db.flush()
+    add_to_rollups(db, IVCFEvaluation, IVCFEvaluation.id == db_evaluation.id)
+    refresh_patient_comorbidities(db, IVCFPatient, db_evaluation.patient_id)
     db.commit()
     db.refresh(db_evaluation)
     return db_evaluation
@@ -112,77 +119,42 @@ def get_domain_distribution(
     age_range: Optional[str] = None,
     classification: Optional[str] = None
 ) -> List[Dict[str, Any]]:
-    """Get domain distribution with filters"""
-    
-    # Base query with joins
-    query = db.query(IVCFEvaluation).join(
+    """Get domain distribution with filters (avg/min/max of every domain in a single query)"""
+    
+    aggregates = [func.count(IVCFEvaluation.id).label("patient_count")]
+    for _, domain_field in IVCF_DOMAINS:
+        column = getattr(IVCFEvaluation, domain_field)
+        aggregates += [
+            func.avg(column).label(f"{domain_field}_avg"),
+            func.min(column).label(f"{domain_field}_min"),
+            func.max(column).label(f"{domain_field}_max")
+        ]
+    
+    query = db.query(*aggregates).select_from(IVCFEvaluation).join(
         IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
     ).join(
         HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id
-    ).filter(
-        IVCFPatient.ativo == True
+    )
+    query = apply_dashboard_filters(
+        query, period_from, period_to, region, health_unit_id, age_range, classification
     )
     
-    # Apply filters
-    if period_from:
-        query = query.filter(IVCFEvaluation.data_avaliacao >= period_from)
-    
-    if period_to:
-        query = query.filter(IVCFEvaluation.data_avaliacao <= period_to)
-    
-    if region:
-        query = query.filter(HealthUnit.regiao == region)
-    
-    if health_unit_id:
-        query = query.filter(IVCFPatient.unidade_saude_id == health_unit_id)
-    
-    if age_range:
-        if age_range == "60-70":
-            query = query.filter(and_(IVCFPatient.idade >= 60, IVCFPatient.idade <= 70))
-        elif age_range == "71-80":
-            query = query.filter(and_(IVCFPatient.idade >= 71, IVCFPatient.idade <= 80))
-        elif age_range == "81+":
-            query = query.filter(IVCFPatient.idade >= 81)
-    
-    if classification:
-        query = query.filter(IVCFEvaluation.classificacao == classification)
-    
-    # Get all evaluations matching filters
-    evaluations = query.all()
+    row = query.one()
+    patient_count = row.patient_count
     
-    if not evaluations:
+    if not patient_count:
         return []
     
-    # Calculate domain averages
-    domains = [
-        ("Idade", "dominio_idade"),
-        ("Comorbidades", "dominio_comorbidades"),
-        ("Comunicação", "dominio_comunicacao"),
-        ("Mobilidade", "dominio_mobilidade"),
-        ("Humor", "dominio_humor"),
-        ("Cognição", "dominio_cognicao"),
-        ("AVD", "dominio_avd"),
-        ("Autopercepção", "dominio_autopercepcao")
-    ]
-    
-    result = []
-    patient_count = len(evaluations)
-    
-    for domain_name, domain_field in domains:
-        scores = [getattr(eval, domain_field) for eval in evaluations]
-        avg_score = round(sum(scores) / len(scores), 1)
-        min_score = min(scores)
-        max_score = max(scores)
-        
-        result.append({
+    return [
+        {
             "domain": domain_name,
-            "average_score": avg_score,
-            "min_score": min_score,
-            "max_score": max_score,
+            "average_score": round(float(getattr(row, f"{domain_field}_avg")), 1),
+            "min_score": getattr(row, f"{domain_field}_min"),
+            "max_score": getattr(row, f"{domain_field}_max"),
             "patient_count": patient_count
-        })
-    
-    return result
+        }
+        for domain_name, domain_field in IVCF_DOMAINS
+    ]
 
 
 def get_region_averages(
@@ -231,78 +203,50 @@ def get_monthly_evolution(
     months_back: int = 6,
     from_last_evaluation: bool = False
 ) -> List[Dict[str, Any]]:
-    """Get monthly evolution for the last N months"""
+    """Get monthly evolution for the last N months (read from the monthly rollup)"""
     
     if from_last_evaluation:
-        # Get the date of the most recent evaluation across all patients
-        latest_evaluation = db.query(IVCFEvaluation).join(
-            IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
-        ).filter(
-            IVCFPatient.ativo == True
-        ).order_by(desc(IVCFEvaluation.data_avaliacao)).first()
+        # Month of the most recent evaluation across all active patients
+        latest_month = db.query(func.max(IVCFMonthlyRollup.month)).filter(
+            IVCFMonthlyRollup.evaluation_count > 0
+        ).scalar()
         
-        if not latest_evaluation:
+        if not latest_month:
             return []
         
         # Start from the month of the latest evaluation and go back N months
-        start_date = latest_evaluation.data_avaliacao.replace(day=1)
-        for _ in range(months_back - 1):  # -1 because we include the current month
-            if start_date.month == 1:
-                start_date = start_date.replace(year=start_date.year - 1, month=12)
-            else:
-                start_date = start_date.replace(month=start_date.month - 1)
+        start_date = shift_months(latest_month, months_back - 1)  # -1 because we include the current month
     else:
         # Calculate start date from today (original behavior)
-        start_date = date.today().replace(day=1)
-        for _ in range(months_back):
-            if start_date.month == 1:
-                start_date = start_date.replace(year=start_date.year - 1, month=12)
-            else:
-                start_date = start_date.replace(month=start_date.month - 1)
-    
-    month_year_expr = func.to_char(IVCFEvaluation.data_avaliacao, 'YYYY-MM')
+        start_date = shift_months(date.today(), months_back)
     
     query = db.query(
-        month_year_expr.label('month_year'),
-        func.sum(case((IVCFEvaluation.classificacao == "Robusto", 1), else_=0)).label('robust'),
-        func.sum(case((IVCFEvaluation.classificacao == "Em Risco", 1), else_=0)).label('risk'),
-        func.sum(case((IVCFEvaluation.classificacao == "Frágil", 1), else_=0)).label('fragile'),
-        func.count(IVCFEvaluation.id).label('total')
-    ).join(
-        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
+        IVCFMonthlyRollup.month,
+        func.sum(case((IVCFMonthlyRollup.classificacao == "Robusto", IVCFMonthlyRollup.evaluation_count), else_=0)).label('robust'),
+        func.sum(case((IVCFMonthlyRollup.classificacao == "Em Risco", IVCFMonthlyRollup.evaluation_count), else_=0)).label('risk'),
+        func.sum(case((IVCFMonthlyRollup.classificacao == "Frágil", IVCFMonthlyRollup.evaluation_count), else_=0)).label('fragile'),
+        func.sum(IVCFMonthlyRollup.evaluation_count).label('total')
     ).filter(
-        and_(
-            IVCFPatient.ativo == True,
-            IVCFEvaluation.data_avaliacao >= start_date
-        )
+        IVCFMonthlyRollup.month >= start_date
     ).group_by(
-        month_year_expr
+        IVCFMonthlyRollup.month
+    ).having(
+        func.sum(IVCFMonthlyRollup.evaluation_count) > 0
     ).order_by(
-        month_year_expr
+        IVCFMonthlyRollup.month
     )
     
-    results = []
-    month_names = {
-        "01": "Jan", "02": "Fev", "03": "Mar", "04": "Abr",
-        "05": "Mai", "06": "Jun", "07": "Jul", "08": "Ago",
-        "09": "Set", "10": "Out", "11": "Nov", "12": "Dez"
-    }
-    
-    for row in query.all():
-        # Extract year and month from 'YYYY-MM' format
-        month_year = row.month_year  # Format: 'YYYY-MM'
-        year_str, month_str = month_year.split('-')
-        
-        results.append({
-            "month": month_names.get(month_str, month_str),
-            "year": int(year_str),
+    return [
+        {
+            "month": MONTH_NAMES[f"{row.month.month:02d}"],
+            "year": row.month.year,
             "robust": row.robust or 0,
             "risk": row.risk or 0,
             "fragile": row.fragile or 0,
             "total": row.total or 0
-        })
-    
-    return results
+        }
+        for row in query.all()
+    ]
 
 
 def update_ivcf_evaluation(db: Session, evaluation_id: int, evaluation_data: dict) -> Optional[IVCFEvaluation]:
@@ -312,9 +256,14 @@ def update_ivcf_evaluation(db: Session, evaluation_id: int, evaluation_data: dic
     if not db_evaluation:
         return None
     
+    previous_patient_id = db_evaluation.patient_id
+    remove_from_rollups(db, IVCFEvaluation, IVCFEvaluation.id == evaluation_id)
     for key, value in evaluation_data.items():
         if value is not None:
             setattr(db_evaluation, key, value)
+    db.flush()
+    add_to_rollups(db, IVCFEvaluation, IVCFEvaluation.id == evaluation_id)
+    refresh_patient_comorbidities(db, IVCFPatient, previous_patient_id, db_evaluation.patient_id)
     
     db.commit()
     db.refresh(db_evaluation)
@@ -328,6 +277,9 @@ def delete_ivcf_evaluation(db: Session, evaluation_id: int) -> bool:
     if not db_evaluation:
         return False
     
+    remove_from_rollups(db, IVCFEvaluation, IVCFEvaluation.id == evaluation_id)
     db.delete(db_evaluation)
+    db.flush()
+    refresh_patient_comorbidities(db, IVCFPatient, db_evaluation.patient_id)
     db.commit()
     return True
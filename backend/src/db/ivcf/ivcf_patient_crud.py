@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from typing import List, Optional
 from models.ivcf.ivcf_patient import IVCFPatient
+from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from db.comorbidities import remove_patient_comorbidities
+from db.monthly_rollups import add_to_rollups, remove_from_rollups
 
 
 def create_ivcf_patient(db: Session, patient_data: dict) -> IVCFPatient:
@@ -90,9 +93,13 @@ def update_ivcf_patient(db: Session, patient_id: int, patient_data: dict) -> Opt
     if not db_patient:
         return None
     
+    # Age, health unit and status are part of the monthly rollup key
+    remove_from_rollups(db, IVCFEvaluation, IVCFEvaluation.patient_id == patient_id)
     for key, value in patient_data.items():
         if value is not None:
             setattr(db_patient, key, value)
+    db.flush()
+    add_to_rollups(db, IVCFEvaluation, IVCFEvaluation.patient_id == patient_id)
     
     db.commit()
     db.refresh(db_patient)
@@ -106,6 +113,7 @@ def delete_ivcf_patient(db: Session, patient_id: int) -> bool:
     if not db_patient:
         return False
     
+    remove_from_rollups(db, IVCFEvaluation, IVCFEvaluation.patient_id == patient_id)
     db_patient.ativo = False
     db.commit()
     return True
@@ -118,6 +126,8 @@ def hard_delete_ivcf_patient(db: Session, patient_id: int) -> bool:
     if not db_patient:
         return False
     
+    remove_from_rollups(db, IVCFEvaluation, IVCFEvaluation.patient_id == patient_id)
+    remove_patient_comorbidities(db, IVCFPatient, patient_id)
     db.delete(db_patient)
     db.commit()
     return True
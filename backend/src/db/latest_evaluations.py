@@ -0,0 +1,94 @@
+"""
+Pointer from each FACT-F and Physical Activity patient to their latest evaluation.
+
+Both instruments allow many evaluations per patient, and the dashboards mostly
+want the current status. `latest_evaluation_id` on the patient table lets those
+queries join one evaluation per patient by primary key instead of sorting or
+grouping every patient's history. The latest evaluation is the one with the
+most recent data_avaliacao; ties go to the highest id.
+
+The CRUD modules refresh the pointer in the same transaction as every
+evaluation write. Rebuild it after bulk loads that bypass the CRUD:
+
+    cd src && python -m db.latest_evaluations [--instrument factf|physical_activity]
+"""
+import argparse
+from typing import Dict, Iterable, Optional, Tuple, Type
+from sqlalchemy import desc, select, update
+from sqlalchemy.orm import Session
+from models.factf.factf_patient import FACTFPatient
+from models.factf.factf_evaluation import FACTFEvaluation
+from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+
+
+# instrument -> (patient model, evaluation model)
+LATEST_EVALUATIONS: Dict[str, Tuple[Type, Type]] = {
+    "factf": (FACTFPatient, FACTFEvaluation),
+    "physical_activity": (PhysicalActivityPatient, PhysicalActivityEvaluation),
+}
+
+
+def latest_evaluation_id(patient, evaluation):
+    """Correlated subquery selecting the id of the patient's latest evaluation"""
+    return select(evaluation.id).where(
+        evaluation.patient_id == patient.id
+    ).order_by(
+        desc(evaluation.data_avaliacao), desc(evaluation.id)
+    ).limit(1).correlate(patient).scalar_subquery()
+
+
+def _update_pointers(db: Session, instrument: str, *criteria) -> None:
+    patient, evaluation = LATEST_EVALUATIONS[instrument]
+    db.execute(
+        update(patient).where(*criteria).values(
+            latest_evaluation_id=latest_evaluation_id(patient, evaluation)
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def refresh_latest_evaluation(db: Session, evaluation_model, *patient_ids: int) -> None:
+    """
+    Point the given patients at their latest evaluation (call after flushing the write).
+
+    The patient rows are locked first, so concurrent writes for the same patient
+    run one after the other and the last one sees every committed evaluation.
+    """
+    for instrument, (patient, evaluation) in LATEST_EVALUATIONS.items():
+        if evaluation is evaluation_model:
+            break
+    else:
+        raise ValueError(f"No latest evaluation pointer for {evaluation_model.__name__}")
+
+    ids = sorted(set(patient_ids))
+    db.execute(select(patient.id).where(patient.id.in_(ids)).with_for_update())
+    _update_pointers(db, instrument, patient.id.in_(ids))
+
+
+def rebuild_latest_evaluations(db: Session, instruments: Optional[Iterable[str]] = None) -> None:
+    """Recompute every patient's pointer from the evaluation tables (does not commit)"""
+    for instrument in LATEST_EVALUATIONS if instruments is None else instruments:
+        _update_pointers(db, instrument)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the latest evaluation pointers of the patient tables")
+    parser.add_argument("--instrument", choices=sorted(LATEST_EVALUATIONS), action="append",
+                        help="Instrument to rebuild (repeatable, default: all)")
+    args = parser.parse_args()
+
+    from db.base import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_latest_evaluations(db, args.instrument)
+        db.commit()
+    finally:
+        db.close()
+
+    for instrument in args.instrument or LATEST_EVALUATIONS:
+        print(f"✓ {instrument}: latest evaluation pointers rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""baseline schema
+
+Schema as previously created by Base.metadata.create_all. Tables that already
+exist are skipped, so databases bootstrapped with create_all can be upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(existing, name, *columns):
+    if name in existing:
+        return False
+    op.create_table(name, *columns)
+    return True
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if _create_table(
+        existing,
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("nome_completo", sa.String(), nullable=False),
+        sa.Column("cpf", sa.String(), nullable=False),
+        sa.Column("telefone", sa.String(), nullable=True),
+        sa.Column("sexo", sa.String(), nullable=True),
+        sa.Column("data_nascimento", sa.Date(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("recovery_hashed_password", sa.String(), nullable=True),
+        sa.Column("profile_type", sa.Enum("GESTOR", "TECNICO", name="profiletype"), nullable=False),
+        sa.Column("cep", sa.String(), nullable=True),
+        sa.Column("logradouro", sa.String(), nullable=True),
+        sa.Column("numero", sa.String(), nullable=True),
+        sa.Column("complemento", sa.String(), nullable=True),
+        sa.Column("bairro", sa.String(), nullable=True),
+        sa.Column("municipio", sa.String(), nullable=True),
+        sa.Column("uf", sa.String(), nullable=True),
+        sa.Column("matricula", sa.String(), nullable=True),
+        sa.Column("registro_profissional", sa.String(), nullable=True),
+        sa.Column("especialidade", sa.String(), nullable=True),
+        sa.Column("unidade_lotacao_id", sa.Integer(), nullable=True),
+    ):
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_cpf", "users", ["cpf"], unique=True)
+        op.create_index("ix_users_matricula", "users", ["matricula"], unique=True)
+
+    if _create_table(
+        existing,
+        "health_units",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("nome", sa.String(200), nullable=False),
+        sa.Column("bairro", sa.String(100), nullable=False),
+        sa.Column("regiao", sa.String(50), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+    ):
+        op.create_index("ix_health_units_id", "health_units", ["id"])
+
+    if _create_table(
+        existing,
+        "ivcf_patients",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("nome_completo", sa.String(200), nullable=False),
+        sa.Column("cpf", sa.String(14), nullable=False),
+        sa.Column("idade", sa.Integer(), nullable=False),
+        sa.Column("telefone", sa.String(20), nullable=True),
+        sa.Column("bairro", sa.String(100), nullable=False),
+        sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), nullable=False),
+        sa.Column("data_cadastro", sa.Date(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+    ):
+        op.create_index("ix_ivcf_patients_id", "ivcf_patients", ["id"])
+        op.create_index("ix_ivcf_patients_cpf", "ivcf_patients", ["cpf"], unique=True)
+
+    if _create_table(
+        existing,
+        "ivcf_evaluations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("patient_id", sa.Integer(), sa.ForeignKey("ivcf_patients.id"), nullable=False),
+        sa.Column("data_avaliacao", sa.Date(), nullable=False),
+        sa.Column("pontuacao_total", sa.Integer(), nullable=False),
+        sa.Column("classificacao", sa.String(20), nullable=False),
+        sa.Column("dominio_idade", sa.Integer(), nullable=False),
+        sa.Column("dominio_comorbidades", sa.Integer(), nullable=False),
+        sa.Column("dominio_comunicacao", sa.Integer(), nullable=False),
+        sa.Column("dominio_mobilidade", sa.Integer(), nullable=False),
+        sa.Column("dominio_humor", sa.Integer(), nullable=False),
+        sa.Column("dominio_cognicao", sa.Integer(), nullable=False),
+        sa.Column("dominio_avd", sa.Integer(), nullable=False),
+        sa.Column("dominio_autopercepcao", sa.Integer(), nullable=False),
+        sa.Column("comorbidades", sa.Text(), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        sa.CheckConstraint("pontuacao_total >= 0 AND pontuacao_total <= 40", name="check_pontuacao_total"),
+        sa.CheckConstraint("dominio_idade >= 0 AND dominio_idade <= 5", name="check_dominio_idade"),
+        sa.CheckConstraint("dominio_comorbidades >= 0 AND dominio_comorbidades <= 5", name="check_dominio_comorbidades"),
+        sa.CheckConstraint("dominio_comunicacao >= 0 AND dominio_comunicacao <= 5", name="check_dominio_comunicacao"),
+        sa.CheckConstraint("dominio_mobilidade >= 0 AND dominio_mobilidade <= 5", name="check_dominio_mobilidade"),
+        sa.CheckConstraint("dominio_humor >= 0 AND dominio_humor <= 5", name="check_dominio_humor"),
+        sa.CheckConstraint("dominio_cognicao >= 0 AND dominio_cognicao <= 5", name="check_dominio_cognicao"),
+        sa.CheckConstraint("dominio_avd >= 0 AND dominio_avd <= 5", name="check_dominio_avd"),
+        sa.CheckConstraint("dominio_autopercepcao >= 0 AND dominio_autopercepcao <= 5", name="check_dominio_autopercepcao"),
+        sa.CheckConstraint("classificacao IN ('Robusto', 'Em Risco', 'Frágil')", name="check_classificacao"),
+    ):
+        op.create_index("ix_ivcf_evaluations_id", "ivcf_evaluations", ["id"])
+
+    if _create_table(
+        existing,
+        "factf_patients",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("nome_completo", sa.String(200), nullable=False),
+        sa.Column("cpf", sa.String(14), nullable=False),
+        sa.Column("idade", sa.Integer(), nullable=False),
+        sa.Column("telefone", sa.String(20), nullable=True),
+        sa.Column("email", sa.String(100), nullable=True),
+        sa.Column("bairro", sa.String(100), nullable=False),
+        sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), nullable=False),
+        sa.Column("diagnostico_principal", sa.String(200), nullable=True),
+        sa.Column("comorbidades", sa.Text(), nullable=True),
+        sa.Column("tratamento_atual", sa.Text(), nullable=True),
+        sa.Column("data_cadastro", sa.Date(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+    ):
+        op.create_index("ix_factf_patients_id", "factf_patients", ["id"])
+        op.create_index("ix_factf_patients_cpf", "factf_patients", ["cpf"], unique=True)
+
+    if _create_table(
+        existing,
+        "factf_evaluations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("patient_id", sa.Integer(), sa.ForeignKey("factf_patients.id"), nullable=False),
+        sa.Column("data_avaliacao", sa.Date(), nullable=False),
+        sa.Column("pontuacao_total", sa.Float(), nullable=False),
+        sa.Column("pontuacao_fadiga", sa.Float(), nullable=False),
+        sa.Column("classificacao_fadiga", sa.String(20), nullable=False),
+        sa.Column("bem_estar_fisico", sa.Float(), nullable=False),
+        sa.Column("bem_estar_social", sa.Float(), nullable=False),
+        sa.Column("bem_estar_emocional", sa.Float(), nullable=False),
+        sa.Column("bem_estar_funcional", sa.Float(), nullable=False),
+        sa.Column("subescala_fadiga", sa.Float(), nullable=False),
+        sa.Column("respostas_detalhadas", sa.Text(), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        sa.Column("profissional_responsavel", sa.String(200), nullable=True),
+        sa.CheckConstraint("pontuacao_total >= 0 AND pontuacao_total <= 136", name="check_pontuacao_total_factf"),
+        sa.CheckConstraint("pontuacao_fadiga >= 0 AND pontuacao_fadiga <= 52", name="check_pontuacao_fadiga"),
+        sa.CheckConstraint("bem_estar_fisico >= 0 AND bem_estar_fisico <= 28", name="check_bem_estar_fisico"),
+        sa.CheckConstraint("bem_estar_social >= 0 AND bem_estar_social <= 28", name="check_bem_estar_social"),
+        sa.CheckConstraint("bem_estar_emocional >= 0 AND bem_estar_emocional <= 24", name="check_bem_estar_emocional"),
+        sa.CheckConstraint("bem_estar_funcional >= 0 AND bem_estar_funcional <= 28", name="check_bem_estar_funcional"),
+        sa.CheckConstraint("subescala_fadiga >= 0 AND subescala_fadiga <= 52", name="check_subescala_fadiga"),
+        sa.CheckConstraint(
+            "classificacao_fadiga IN ('Sem Fadiga', 'Fadiga Leve', 'Fadiga Grave')",
+            name="check_classificacao_fadiga"
+        ),
+    ):
+        op.create_index("ix_factf_evaluations_id", "factf_evaluations", ["id"])
+
+    if _create_table(
+        existing,
+        "physical_activity_patients",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("nome_completo", sa.String(255), nullable=False),
+        sa.Column("cpf", sa.String(11), nullable=False),
+        sa.Column("idade", sa.Integer(), nullable=False),
+        sa.Column("telefone", sa.String(20), nullable=True),
+        sa.Column("email", sa.String(255), nullable=True),
+        sa.Column("bairro", sa.String(100), nullable=False),
+        sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), nullable=False),
+        sa.Column("diagnostico_principal", sa.String(255), nullable=True),
+        sa.Column("comorbidades", sa.Text(), nullable=True),
+        sa.Column("medicamentos_atuais", sa.Text(), nullable=True),
+        sa.Column("data_cadastro", sa.Date(), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+    ):
+        op.create_index("ix_physical_activity_patients_id", "physical_activity_patients", ["id"])
+        op.create_index("ix_physical_activity_patients_cpf", "physical_activity_patients", ["cpf"], unique=True)
+
+    if _create_table(
+        existing,
+        "physical_activity_evaluations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("patient_id", sa.Integer(), sa.ForeignKey("physical_activity_patients.id"), nullable=False),
+        sa.Column("data_avaliacao", sa.Date(), nullable=False),
+        sa.Column("light_activity_minutes_per_day", sa.Integer(), nullable=False),
+        sa.Column("light_activity_days_per_week", sa.Integer(), nullable=False),
+        sa.Column("moderate_activity_minutes_per_day", sa.Integer(), nullable=False),
+        sa.Column("moderate_activity_days_per_week", sa.Integer(), nullable=False),
+        sa.Column("vigorous_activity_minutes_per_day", sa.Integer(), nullable=False),
+        sa.Column("vigorous_activity_days_per_week", sa.Integer(), nullable=False),
+        sa.Column("sedentary_hours_per_day", sa.Float(), nullable=False),
+        sa.Column("screen_time_hours_per_day", sa.Float(), nullable=False),
+        sa.Column("total_weekly_moderate_minutes", sa.Integer(), nullable=False),
+        sa.Column("total_weekly_vigorous_minutes", sa.Integer(), nullable=False),
+        sa.Column("who_compliance", sa.Boolean(), nullable=False),
+        sa.Column("sedentary_risk_level", sa.String(20), nullable=False),
+        sa.Column("respostas_detalhadas", sa.JSON(), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        sa.Column("profissional_responsavel", sa.String(255), nullable=True),
+    ):
+        op.create_index("ix_physical_activity_evaluations_id", "physical_activity_evaluations", ["id"])
+        op.create_index("ix_physical_activity_evaluations_data_avaliacao", "physical_activity_evaluations", ["data_avaliacao"])
+        op.create_index("ix_physical_activity_evaluations_who_compliance", "physical_activity_evaluations", ["who_compliance"])
+        op.create_index(
+            "ix_physical_activity_evaluations_sedentary_risk_level",
+            "physical_activity_evaluations",
+            ["sedentary_risk_level"]
+        )
+
+
+def downgrade():
+    op.drop_table("physical_activity_evaluations")
+    op.drop_table("physical_activity_patients")
+    op.drop_table("factf_evaluations")
+    op.drop_table("factf_patients")
+    op.drop_table("ivcf_evaluations")
+    op.drop_table("ivcf_patients")
+    op.drop_table("health_units")
+    op.drop_table("users")
+    sa.Enum(name="profiletype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,69 @@
+"""dashboard filter indexes
+
+Composite indexes for the latest-evaluation-per-patient lookups and the
+date/classification filters used by the dashboards, plus partial indexes on
+the active rows of the patient tables. Indexes already created by create_all
+(the models declare them too) are left alone.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+EVALUATION_TABLES = ("ivcf_evaluations", "factf_evaluations", "physical_activity_evaluations")
+PATIENT_TABLES = ("ivcf_patients", "factf_patients", "physical_activity_patients")
+
+
+def upgrade():
+    for table in EVALUATION_TABLES:
+        op.create_index(
+            f"ix_{table}_patient_date",
+            table,
+            ["patient_id", sa.text("data_avaliacao DESC")],
+            if_not_exists=True
+        )
+
+    op.create_index(
+        "ix_ivcf_evaluations_classificacao",
+        "ivcf_evaluations",
+        ["classificacao", "data_avaliacao"],
+        if_not_exists=True
+    )
+    op.create_index("ix_factf_evaluations_data_avaliacao", "factf_evaluations", ["data_avaliacao"], if_not_exists=True)
+    op.create_index(
+        "ix_factf_evaluations_classificacao_fadiga",
+        "factf_evaluations",
+        ["classificacao_fadiga", "data_avaliacao"],
+        if_not_exists=True
+    )
+
+    for table in PATIENT_TABLES:
+        op.create_index(
+            f"ix_{table}_active_unit",
+            table,
+            ["unidade_saude_id", "idade"],
+            postgresql_where=sa.text("ativo"),
+            sqlite_where=sa.text("ativo = 1"),
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    for table in PATIENT_TABLES:
+        op.drop_index(f"ix_{table}_active_unit", table_name=table)
+
+    op.drop_index("ix_factf_evaluations_classificacao_fadiga", table_name="factf_evaluations")
+    op.drop_index("ix_factf_evaluations_data_avaliacao", table_name="factf_evaluations")
+    op.drop_index("ix_ivcf_evaluations_classificacao", table_name="ivcf_evaluations")
+
+    for table in EVALUATION_TABLES:
+        op.drop_index(f"ix_{table}_patient_date", table_name=table)
@@ -0,0 +1,97 @@
+"""monthly rollup tables
+
+Per-instrument monthly aggregates read by the evolution charts and kept in sync
+by the CRUD modules (see db/monthly_rollups.py). The new tables are filled from
+the existing evaluations; later bulk loads that bypass the CRUD can be recounted
+with the backfill command: python -m db.monthly_rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+# rollup table -> (evaluation table, patient table, classification column)
+INSTRUMENTS = {
+    "ivcf_monthly_rollups": ("ivcf_evaluations", "ivcf_patients", "classificacao"),
+    "factf_monthly_rollups": ("factf_evaluations", "factf_patients", "classificacao_fadiga"),
+    "physical_activity_monthly_rollups": ("physical_activity_evaluations", "physical_activity_patients", "sedentary_risk_level"),
+}
+
+ROLLUP_TABLES = {
+    "ivcf_monthly_rollups": [sa.Column("pontuacao_total_sum", sa.Integer(), nullable=False)],
+    "factf_monthly_rollups": [
+        sa.Column("pontuacao_total_sum", sa.Float(), nullable=False),
+        sa.Column("subescala_fadiga_sum", sa.Float(), nullable=False),
+    ],
+    "physical_activity_monthly_rollups": [sa.Column("sedentary_hours_per_day_sum", sa.Float(), nullable=False)],
+}
+
+# Counts the active patients' evaluations per (month, unit, region, age bucket, classification).
+# Written out here rather than imported from db.monthly_rollups so the revision does not
+# change when the application code does.
+BACKFILL = """
+INSERT INTO {rollup} (month, unidade_saude_id, regiao, age_bucket, classificacao, evaluation_count, {sum_columns})
+SELECT month, unidade_saude_id, regiao, age_bucket, classificacao, COUNT(id), {sums}
+FROM (
+    SELECT {month} AS month, p.unidade_saude_id, u.regiao,
+           CASE WHEN p.idade <= 59 THEN '<60' WHEN p.idade <= 70 THEN '60-70' WHEN p.idade <= 80 THEN '71-80' ELSE '81+' END
+               AS age_bucket,
+           e.{classification} AS classificacao, e.id, {columns}
+    FROM {evaluations} e
+    JOIN {patients} p ON e.patient_id = p.id
+    JOIN health_units u ON p.unidade_saude_id = u.id
+    WHERE p.ativo = {true}
+) AS src
+GROUP BY month, unidade_saude_id, regiao, age_bucket, classificacao
+"""
+
+
+def _backfill(bind, rollup):
+    evaluations, patients, classification = INSTRUMENTS[rollup]
+    columns = [column.name[:-len("_sum")] for column in ROLLUP_TABLES[rollup]]
+    sqlite = bind.dialect.name == "sqlite"
+    op.execute(BACKFILL.format(
+        rollup=rollup,
+        sum_columns=", ".join(f"{column}_sum" for column in columns),
+        sums=", ".join(f"SUM({column})" for column in columns),
+        month="date(e.data_avaliacao, 'start of month')" if sqlite else "CAST(date_trunc('month', e.data_avaliacao) AS DATE)",
+        classification=classification,
+        columns=", ".join(f"e.{column}" for column in columns),
+        evaluations=evaluations,
+        patients=patients,
+        true="1" if sqlite else "true",
+    ))
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+
+    for table, sums in ROLLUP_TABLES.items():
+        if table in existing:
+            continue
+        op.create_table(
+            table,
+            sa.Column("month", sa.Date(), primary_key=True),
+            sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), primary_key=True),
+            sa.Column("regiao", sa.String(50), primary_key=True),
+            sa.Column("age_bucket", sa.String(10), primary_key=True),
+            sa.Column("classificacao", sa.String(20), primary_key=True),
+            sa.Column("evaluation_count", sa.Integer(), nullable=False),
+            *sums
+        )
+        _backfill(bind, table)
+
+
+def downgrade():
+    for table in ROLLUP_TABLES:
+        op.drop_table(table)
@@ -0,0 +1,52 @@
+"""latest evaluation pointer
+
+Adds latest_evaluation_id to the FACT-F and Physical Activity patient tables
+(see db/latest_evaluations.py) and points every patient at their current
+latest evaluation.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+# patient table -> evaluation table
+PATIENT_TABLES = {
+    "factf_patients": "factf_evaluations",
+    "physical_activity_patients": "physical_activity_evaluations",
+}
+
+
+def _backfill(patient_table, evaluation_table):
+    """Point every patient at their latest evaluation (most recent date, then highest id)"""
+    patients = sa.table(patient_table, sa.column("id"), sa.column("latest_evaluation_id"))
+    evaluations = sa.table(evaluation_table, sa.column("id"), sa.column("patient_id"), sa.column("data_avaliacao"))
+    latest = sa.select(evaluations.c.id).where(
+        evaluations.c.patient_id == patients.c.id
+    ).order_by(
+        evaluations.c.data_avaliacao.desc(), evaluations.c.id.desc()
+    ).limit(1).scalar_subquery()
+    op.execute(patients.update().values(latest_evaluation_id=latest))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for table, evaluation_table in PATIENT_TABLES.items():
+        if "latest_evaluation_id" in {column["name"] for column in inspector.get_columns(table)}:
+            continue
+        op.add_column(table, sa.Column("latest_evaluation_id", sa.Integer(), nullable=True))
+        _backfill(table, evaluation_table)
+
+
+def downgrade():
+    for table in PATIENT_TABLES:
+        op.drop_column(table, "latest_evaluation_id")
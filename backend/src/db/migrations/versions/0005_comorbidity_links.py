@@ -0,0 +1,143 @@
+"""comorbidity dictionary and patient links
+
+Adds the comorbidities dictionary and one patient-to-comorbidity link table per
+instrument (see db/comorbidities.py), then fills them from the existing
+free-text fields. The dictionary and the text matching are copied here as they
+were at this revision, so the backfill does not follow later changes to
+db/comorbidities.py. Later bulk loads that bypass the CRUD can be relinked with
+the backfill command: python -m db.comorbidities
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+# link table -> (patient table, table holding the text, its patient id column, text columns)
+LINK_TABLES = {
+    "ivcf_patient_comorbidities": ("ivcf_patients", "ivcf_evaluations", "patient_id", ("comorbidades",)),
+    "factf_patient_comorbidities": ("factf_patients", "factf_patients", "id", ("comorbidades",)),
+    "physical_activity_patient_comorbidities": (
+        "physical_activity_patients", "physical_activity_patients", "id", ("comorbidades", "diagnostico_principal")
+    ),
+}
+
+# key -> (display name, normalized terms that identify it)
+COMORBIDITIES = {
+    "hipertensao": ("Hipertensão", ("hipertensao", "hipertenso", "hipertensa", "pressao alta", "has")),
+    "diabetes": ("Diabetes", ("diabetes", "diabetico", "diabetica", "dm", "dm2")),
+    "artrite": ("Artrite", ("artrite", "artrite reumatoide")),
+    "artrose": ("Artrose", ("artrose", "osteoartrose", "osteoartrite")),
+    "osteoporose": ("Osteoporose", ("osteoporose",)),
+    "insuficiencia_cardiaca": ("Insuficiência cardíaca", ("insuficiencia cardiaca", "icc")),
+    "fibrilacao_atrial": ("Fibrilação atrial", ("fibrilacao atrial",)),
+    "dislipidemia": ("Dislipidemia", ("dislipidemia", "colesterol alto", "hipercolesterolemia")),
+    "hipotireoidismo": ("Hipotireoidismo", ("hipotireoidismo",)),
+    "doenca_renal_cronica": ("Doença renal crônica", ("doenca renal cronica", "insuficiencia renal cronica", "drc")),
+    "dpoc": ("DPOC", ("dpoc", "doenca pulmonar obstrutiva cronica", "enfisema")),
+    "depressao": ("Depressão", ("depressao",)),
+    "ansiedade": ("Ansiedade", ("ansiedade",)),
+    "insonia": ("Insônia", ("insonia",)),
+    "refluxo": ("Refluxo gastroesofágico", ("refluxo", "drge")),
+    "catarata": ("Catarata", ("catarata",)),
+    "glaucoma": ("Glaucoma", ("glaucoma",)),
+    "perda_auditiva": ("Perda auditiva", ("perda auditiva", "surdez", "hipoacusia")),
+    "obesidade": ("Obesidade", ("obesidade", "obeso", "obesa")),
+    "cancer": ("Câncer", ("cancer", "neoplasia", "tumor")),
+    "demencia": ("Demência", ("demencia", "alzheimer")),
+    "parkinson": ("Parkinson", ("parkinson",)),
+    "avc": ("AVC", ("avc", "acidente vascular cerebral", "derrame")),
+}
+
+BATCH_SIZE = 5000
+
+
+def _normalize(text):
+    """Lowercase, strip accents and turn punctuation into single spaces"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def _match(*texts):
+    """Dictionary keys whose terms appear as whole words in any of the texts"""
+    padded = f" {' '.join(_normalize(text) for text in texts)} "
+    return {key for key, (_, terms) in COMORBIDITIES.items() if any(f" {term} " in padded for term in terms)}
+
+
+def _fill_dictionary(bind):
+    """Insert the missing COMORBIDITIES entries; returns chave -> id"""
+    comorbidities = sa.table("comorbidities", sa.column("id"), sa.column("chave"), sa.column("nome"))
+    existing = {chave for (chave,) in bind.execute(sa.select(comorbidities.c.chave))}
+    missing = [{"chave": key, "nome": name} for key, (name, _) in COMORBIDITIES.items() if key not in existing]
+    if missing:
+        op.bulk_insert(comorbidities, missing)
+    return dict(bind.execute(sa.select(comorbidities.c.chave, comorbidities.c.id)).all())
+
+
+def _backfill(bind, link_table, ids):
+    """Link every patient to the dictionary entries found in their text"""
+    _, source_table, patient_column, text_columns = LINK_TABLES[link_table]
+    source = sa.table(source_table, sa.column(patient_column), *[sa.column(column) for column in text_columns])
+    links = sa.table(link_table, sa.column("patient_id"), sa.column("comorbidity_id"))
+
+    keys_by_patient = {}
+    for patient_id, *texts in bind.execute(sa.select(*source.c)):
+        keys_by_patient.setdefault(patient_id, set()).update(_match(*texts))
+
+    rows = [
+        {"patient_id": patient_id, "comorbidity_id": ids[key]}
+        for patient_id, keys in sorted(keys_by_patient.items())
+        for key in sorted(keys)
+    ]
+    for start in range(0, len(rows), BATCH_SIZE):
+        op.bulk_insert(links, rows[start:start + BATCH_SIZE])
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+
+    if "comorbidities" not in existing:
+        op.create_table(
+            "comorbidities",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("chave", sa.String(50), nullable=False, unique=True),
+            sa.Column("nome", sa.String(100), nullable=False),
+        )
+        op.create_index("ix_comorbidities_id", "comorbidities", ["id"])
+
+    created = []
+    for table, (patient_table, *_) in LINK_TABLES.items():
+        if table in existing:
+            continue
+        created.append(table)
+        op.create_table(
+            table,
+            sa.Column("patient_id", sa.Integer(), sa.ForeignKey(f"{patient_table}.id"), primary_key=True),
+            sa.Column("comorbidity_id", sa.Integer(), sa.ForeignKey("comorbidities.id"), primary_key=True),
+        )
+        op.create_index(f"ix_{table}_comorbidity", table, ["comorbidity_id", "patient_id"])
+
+    if created:
+        ids = _fill_dictionary(bind)
+        for table in created:
+            _backfill(bind, table, ids)
+
+
+def downgrade():
+    for table in LINK_TABLES:
+        op.drop_table(table)
+    op.drop_table("comorbidities")
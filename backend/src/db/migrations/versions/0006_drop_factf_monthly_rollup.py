@@ -0,0 +1,55 @@
+"""drop the FACT-F monthly rollup
+
+The FACT-F evolution chart reports score percentiles, which cannot be derived
+from the rollup's counts and sums, so it reads the evaluations and the rollup
+created by 0003 was never queried. Downgrading recreates and refills it.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_table("factf_monthly_rollups")
+
+
+def downgrade():
+    op.create_table(
+        "factf_monthly_rollups",
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), primary_key=True),
+        sa.Column("regiao", sa.String(50), primary_key=True),
+        sa.Column("age_bucket", sa.String(10), primary_key=True),
+        sa.Column("classificacao", sa.String(20), primary_key=True),
+        sa.Column("evaluation_count", sa.Integer(), nullable=False),
+        sa.Column("pontuacao_total_sum", sa.Float(), nullable=False),
+        sa.Column("subescala_fadiga_sum", sa.Float(), nullable=False),
+    )
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    month = "date(e.data_avaliacao, 'start of month')" if sqlite else "CAST(date_trunc('month', e.data_avaliacao) AS DATE)"
+    op.execute(f"""
+        INSERT INTO factf_monthly_rollups (month, unidade_saude_id, regiao, age_bucket, classificacao,
+                                           evaluation_count, pontuacao_total_sum, subescala_fadiga_sum)
+        SELECT month, unidade_saude_id, regiao, age_bucket, classificacao,
+               COUNT(id), SUM(pontuacao_total), SUM(subescala_fadiga)
+        FROM (
+            SELECT {month} AS month, p.unidade_saude_id, u.regiao,
+                   CASE WHEN p.idade <= 59 THEN '<60' WHEN p.idade <= 70 THEN '60-70' WHEN p.idade <= 80 THEN '71-80' ELSE '81+' END
+                       AS age_bucket,
+                   e.classificacao_fadiga AS classificacao, e.id, e.pontuacao_total, e.subescala_fadiga
+            FROM factf_evaluations e
+            JOIN factf_patients p ON e.patient_id = p.id
+            JOIN health_units u ON p.unidade_saude_id = u.id
+            WHERE p.ativo = {1 if sqlite else "true"}
+        ) AS src
+        GROUP BY month, unidade_saude_id, regiao, age_bucket, classificacao
+    """)
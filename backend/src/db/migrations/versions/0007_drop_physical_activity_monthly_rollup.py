@@ -0,0 +1,54 @@
+"""drop the physical activity monthly rollup
+
+The physical activity sedentary trend groups by condition cohort, which is not
+a rollup dimension, and nothing else read the rollup created by 0003, so it
+only cost a write on every evaluation, patient and health unit change.
+Downgrading recreates and refills it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_table("physical_activity_monthly_rollups")
+
+
+def downgrade():
+    op.create_table(
+        "physical_activity_monthly_rollups",
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("unidade_saude_id", sa.Integer(), sa.ForeignKey("health_units.id"), primary_key=True),
+        sa.Column("regiao", sa.String(50), primary_key=True),
+        sa.Column("age_bucket", sa.String(10), primary_key=True),
+        sa.Column("classificacao", sa.String(20), primary_key=True),
+        sa.Column("evaluation_count", sa.Integer(), nullable=False),
+        sa.Column("sedentary_hours_per_day_sum", sa.Float(), nullable=False),
+    )
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    month = "date(e.data_avaliacao, 'start of month')" if sqlite else "CAST(date_trunc('month', e.data_avaliacao) AS DATE)"
+    op.execute(f"""
+        INSERT INTO physical_activity_monthly_rollups (month, unidade_saude_id, regiao, age_bucket, classificacao,
+                                                       evaluation_count, sedentary_hours_per_day_sum)
+        SELECT month, unidade_saude_id, regiao, age_bucket, classificacao, COUNT(id), SUM(sedentary_hours_per_day)
+        FROM (
+            SELECT {month} AS month, p.unidade_saude_id, u.regiao,
+                   CASE WHEN p.idade <= 59 THEN '<60' WHEN p.idade <= 70 THEN '60-70' WHEN p.idade <= 80 THEN '71-80' ELSE '81+' END
+                       AS age_bucket,
+                   e.sedentary_risk_level AS classificacao, e.id, e.sedentary_hours_per_day
+            FROM physical_activity_evaluations e
+            JOIN physical_activity_patients p ON e.patient_id = p.id
+            JOIN health_units u ON p.unidade_saude_id = u.id
+            WHERE p.ativo = {1 if sqlite else "true"}
+        ) AS src
+        GROUP BY month, unidade_saude_id, regiao, age_bucket, classificacao
+    """)
@@ -0,0 +1,165 @@
+"""
+Monthly rollup tables behind the evolution charts.
+
+IVCF has a table keyed by (month, health unit, region, age bucket,
+classification) with the evaluation count and score sums of the active
+patients. The CRUD modules keep it in sync inside the same transaction as the
+write: contributions are removed before a row changes and added back after the
+change is flushed, so an update is just "remove old, add new". FACT-F has no
+rollup: its evolution chart needs score percentiles, which cannot be derived
+from counts and sums, so it is computed from the evaluations. Physical activity
+has none either: its sedentary trend groups by condition cohort, which is not a
+rollup dimension.
+
+Deltas are applied with INSERT ... SELECT ... ON CONFLICT DO UPDATE, so the
+database does the arithmetic and concurrent writers never lose an increment.
+
+Backfill (after bulk loads or restores that bypass the CRUD):
+
+    cd src && python -m db.monthly_rollups [--instrument ivcf]
+"""
+import argparse
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Type
+from sqlalchemy import and_, case, delete, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from db.sql_functions import month_start
+from models.health_unit import HealthUnit
+from models.ivcf.ivcf_patient import IVCFPatient
+from models.ivcf.ivcf_evaluation import IVCFEvaluation
+from models.ivcf.ivcf_monthly_rollup import IVCFMonthlyRollup
+
+
+# Age buckets stored in the rollups (label, min age, max age)
+AGE_BUCKETS = (
+    ("<60", None, 59),
+    ("60-70", 60, 70),
+    ("71-80", 71, 80),
+    ("81+", 81, None),
+)
+
+KEY_COLUMNS = ("month", "unidade_saude_id", "regiao", "age_bucket", "classificacao")
+
+
+class RollupSpec(NamedTuple):
+    """How an evaluation table is rolled up"""
+    rollup: Type
+    patient: Type
+    classification: str  # Evaluation column stored as the rollup classificacao
+    sums: Tuple[str, ...]  # Evaluation columns summed into <column>_sum
+
+
+ROLLUPS: Dict[str, RollupSpec] = {
+    "ivcf": RollupSpec(IVCFMonthlyRollup, IVCFPatient, "classificacao", ("pontuacao_total",)),
+}
+
+EVALUATION_MODELS = {
+    "ivcf": IVCFEvaluation,
+}
+
+
+def age_bucket(age_column):
+    """SQL expression mapping an age column to its AGE_BUCKETS label"""
+    return case(
+        *[(age_column <= max_age, label) for label, _, max_age in AGE_BUCKETS[:-1]],
+        else_=AGE_BUCKETS[-1][0]
+    )
+
+
+def _instrument(evaluation_model) -> str:
+    for instrument, model in EVALUATION_MODELS.items():
+        if model is evaluation_model:
+            return instrument
+    raise ValueError(f"No monthly rollup for {evaluation_model.__name__}")
+
+
+def _apply(db: Session, instrument: str, sign: int, *criteria) -> None:
+    """Add (sign=1) or remove (sign=-1) the matching evaluations from the rollup"""
+    spec = ROLLUPS[instrument]
+    evaluation = EVALUATION_MODELS[instrument]
+    patient = spec.patient
+    # Key expressions are computed in a subquery so the GROUP BY only names columns
+    rows = select(
+        month_start(evaluation.data_avaliacao).label("month"),
+        patient.unidade_saude_id,
+        HealthUnit.regiao,
+        age_bucket(patient.idade).label("age_bucket"),
+        getattr(evaluation, spec.classification).label("classificacao"),
+        evaluation.id,
+        *[getattr(evaluation, column) for column in spec.sums]
+    ).select_from(evaluation).join(
+        patient, evaluation.patient_id == patient.id
+    ).join(
+        HealthUnit, patient.unidade_saude_id == HealthUnit.id
+    ).where(
+        and_(patient.ativo == True, *criteria)
+    ).subquery()
+
+    keys = [rows.c[column] for column in KEY_COLUMNS]
+    aggregates = [func.count(rows.c.id) * literal(sign)]
+    aggregates += [func.sum(rows.c[column]) * literal(sign) for column in spec.sums]
+    source = select(*keys, *aggregates).group_by(*keys)
+
+    value_columns = ["evaluation_count"] + [f"{column}_sum" for column in spec.sums]
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(spec.rollup).from_select(list(KEY_COLUMNS) + value_columns, source)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={
+            column: getattr(spec.rollup, column) + getattr(statement.excluded, column)
+            for column in value_columns
+        }
+    )
+    db.execute(statement)
+
+
+def add_to_rollups(db: Session, evaluation_model, *criteria) -> None:
+    """Count the evaluations matching `criteria` in their monthly rollup (call after flushing them)"""
+    _apply(db, _instrument(evaluation_model), 1, *criteria)
+
+
+def remove_from_rollups(db: Session, evaluation_model, *criteria) -> None:
+    """Take the evaluations matching `criteria` out of their monthly rollup (call before changing them)"""
+    _apply(db, _instrument(evaluation_model), -1, *criteria)
+
+
+def remove_health_unit_from_rollups(db: Session, health_unit_id: int) -> None:
+    """Take every evaluation of a health unit's patients out of the rollups (before changing its region)"""
+    for instrument, spec in ROLLUPS.items():
+        _apply(db, instrument, -1, spec.patient.unidade_saude_id == health_unit_id)
+
+
+def add_health_unit_to_rollups(db: Session, health_unit_id: int) -> None:
+    """Count every evaluation of a health unit's patients in the rollups again"""
+    for instrument, spec in ROLLUPS.items():
+        _apply(db, instrument, 1, spec.patient.unidade_saude_id == health_unit_id)
+
+
+def rebuild_monthly_rollups(db: Session, instruments: Optional[Iterable[str]] = None) -> None:
+    """Recompute the rollups from the evaluation tables (does not commit)"""
+    for instrument in ROLLUPS if instruments is None else instruments:
+        db.execute(delete(ROLLUPS[instrument].rollup))
+        _apply(db, instrument, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the monthly rollup tables from the evaluations")
+    parser.add_argument("--instrument", choices=sorted(ROLLUPS), action="append",
+                        help="Instrument to rebuild (repeatable, default: all)")
+    args = parser.parse_args()
+
+    from db.base import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_monthly_rollups(db, args.instrument)
+        db.commit()
+    finally:
+        db.close()
+
+    for instrument in args.instrument or ROLLUPS:
+        print(f"✓ {instrument}: monthly rollups rebuilt")
+
+
+if __name__ == "__main__":
+    main()
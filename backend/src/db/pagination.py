@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination.
+
+A page is ordered by a list of sort keys that ends with a unique column (the
+id), and the cursor carries the sort key values of the last row returned. The
+next page continues with the rows strictly after those values, so pages do not
+skip or repeat rows when data changes between requests, and deep pages cost
+the same as the first one (no OFFSET).
+
+Nullable columns are sorted with `nulls_last`, which turns them into two keys
+(a "missing" flag and the coalesced value) so the comparison never sees NULL.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Query
+
+# (expression, descending)
+SortKey = Tuple[Any, bool]
+
+def nulls_last(column, descending: bool, placeholder) -> List[SortKey]:
+    """Sort keys for a nullable column: rows with a value first, in either direction"""
+    return [
+        (case((column.is_(None), 1), else_=0), False),
+        (func.coalesce(column, placeholder), descending),
+    ]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key values of a row"""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    """Sort key values of a cursor; raises ValueError if it does not fit `keys`"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("cursor does not match the sort order")
+
+    decoded = []
+    for value, (expression, _) in zip(values, keys):
+        python_type = expression.type.python_type
+        if value is not None and python_type in (date, datetime):
+            value = python_type.fromisoformat(value) if isinstance(value, str) else None
+        elif value is not None and python_type is float and isinstance(value, int):
+            value = float(value)
+        if value is None or type(value) is not python_type:
+            raise ValueError("cursor does not match the sort order")
+        decoded.append(value)
+    return decoded
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Rows strictly after `values` in the order of `keys`"""
+    conditions = []
+    for index, (expression, descending) in enumerate(keys):
+        previous = [key == value for (key, _), value in zip(keys[:index], values[:index])]
+        step = expression < values[index] if descending else expression > values[index]
+        conditions.append(and_(*previous, step))
+    return or_(*conditions)
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[SortKey],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of `query` in the order of `keys` (the last key must be unique).
+
+    Returns the rows and the cursor of the next page (None on the last page).
+    Raises ValueError for an invalid cursor.
+    """
+    labels = [f"sort_key_{index}" for index in range(len(keys))]
+    query = query.add_columns(*[expression.label(label) for (expression, _), label in zip(keys, labels)])
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+
+    rows = query.order_by(
+        *[expression.desc() if descending else expression.asc() for expression, descending in keys]
+    ).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor([getattr(rows[limit - 1], label) for label in labels])
@@ -1,14 +1,24 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
-from typing import List, Optional
-from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, desc, func
+from typing import List, Optional, Sequence, Tuple
+from datetime import date, datetime
 from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_patient_comorbidity import PhysicalActivityPatientComorbidity
+from models.comorbidity import Comorbidity
+from models.health_unit import HealthUnit
+from db.latest_evaluations import refresh_latest_evaluation
+from db.pagination import paginate
+from db.ivcf.ivcf_dashboard_crud import shift_months
+from db.sql_functions import month_start
 
 
 def create_physical_activity_evaluation(db: Session, evaluation_data: dict) -> PhysicalActivityEvaluation:
     """Create a new Physical Activity evaluation"""
     db_evaluation = PhysicalActivityEvaluation(**evaluation_data)
     db.add(db_evaluation)
+    db.flush()
+    refresh_latest_evaluation(db, PhysicalActivityEvaluation, db_evaluation.patient_id)
     db.commit()
     db.refresh(db_evaluation)
     return db_evaluation
@@ -32,10 +42,10 @@ def get_physical_activity_evaluations_by_patient(
 
 
 def get_latest_evaluation_by_patient(db: Session, patient_id: int) -> Optional[PhysicalActivityEvaluation]:
-    """Get the most recent evaluation for a patient"""
-    return db.query(PhysicalActivityEvaluation).filter(
-        PhysicalActivityEvaluation.patient_id == patient_id
-    ).order_by(desc(PhysicalActivityEvaluation.data_avaliacao)).first()
+    """Get the most recent evaluation for a patient (through the patient's latest_evaluation_id)"""
+    return db.query(PhysicalActivityEvaluation).join(
+        PhysicalActivityPatient, PhysicalActivityPatient.latest_evaluation_id == PhysicalActivityEvaluation.id
+    ).filter(PhysicalActivityPatient.id == patient_id).first()
 
 
 def update_physical_activity_evaluation(
@@ -51,9 +61,12 @@ def update_physical_activity_evaluation(
     if not db_evaluation:
         return None
     
+    previous_patient_id = db_evaluation.patient_id
     for key, value in evaluation_data.items():
         if value is not None:
             setattr(db_evaluation, key, value)
+    db.flush()
+    refresh_latest_evaluation(db, PhysicalActivityEvaluation, previous_patient_id, db_evaluation.patient_id)
     
     db.commit()
     db.refresh(db_evaluation)
@@ -70,6 +83,8 @@ def delete_physical_activity_evaluation(db: Session, evaluation_id: int) -> bool
         return False
     
     db.delete(db_evaluation)
+    db.flush()
+    refresh_latest_evaluation(db, PhysicalActivityEvaluation, db_evaluation.patient_id)
     db.commit()
     return True
 
@@ -104,11 +119,44 @@ def get_evaluations_by_sedentary_risk(db: Session, risk_level: str) -> List[Phys
     ).all()
 
 
-def get_critical_sedentary_patients(db: Session) -> List[PhysicalActivityEvaluation]:
-    """Get patients with critical sedentary risk (>10 hours/day)"""
-    return db.query(PhysicalActivityEvaluation).filter(
-        PhysicalActivityEvaluation.sedentary_risk_level == "Crítico"
-    ).all()
+def get_critical_sedentary_patients(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """
+    Active patients whose latest evaluation has critical sedentary risk
+    (>10 hours/day), most sedentary first, one page at a time.
+
+    Patient, latest evaluation (through latest_evaluation_id) and health unit
+    come from one joined query. Returns (rows, next cursor); raises ValueError
+    for an invalid cursor.
+    """
+    query = db.query(
+        PhysicalActivityPatient.id.label('patient_id'),
+        PhysicalActivityPatient.nome_completo,
+        PhysicalActivityPatient.cpf,
+        PhysicalActivityPatient.idade,
+        PhysicalActivityPatient.bairro,
+        PhysicalActivityEvaluation.sedentary_hours_per_day,
+        PhysicalActivityEvaluation.data_avaliacao,
+        PhysicalActivityEvaluation.who_compliance,
+        HealthUnit.nome.label('health_unit')
+    ).join(
+        PhysicalActivityEvaluation, PhysicalActivityPatient.latest_evaluation_id == PhysicalActivityEvaluation.id
+    ).outerjoin(
+        HealthUnit, PhysicalActivityPatient.unidade_saude_id == HealthUnit.id
+    ).filter(
+        and_(
+            PhysicalActivityPatient.ativo == True,
+            PhysicalActivityEvaluation.sedentary_risk_level == "Crítico"
+        )
+    )
+
+    return paginate(query, [
+        (PhysicalActivityEvaluation.sedentary_hours_per_day, True),
+        (PhysicalActivityPatient.id, False)
+    ], cursor, limit)
 
 
 def count_evaluations_by_patient(db: Session, patient_id: int) -> int:
@@ -119,17 +167,15 @@ def count_evaluations_by_patient(db: Session, patient_id: int) -> int:
 
 
 def get_monthly_evaluation_counts(db: Session, months: int = 12) -> List[dict]:
-    """Get evaluation counts by month for the last N months"""
-    start_date = date.today() - timedelta(days=months * 30)
+    """Get evaluation counts per calendar month, from `months` months ago up to the current month"""
+    month = month_start(PhysicalActivityEvaluation.data_avaliacao)
     
     results = db.query(
-        func.date_trunc('month', PhysicalActivityEvaluation.data_avaliacao).label('month'),
+        month.label('month'),
         func.count(PhysicalActivityEvaluation.id).label('count')
     ).filter(
-        PhysicalActivityEvaluation.data_avaliacao >= start_date
-    ).group_by(
-        func.date_trunc('month', PhysicalActivityEvaluation.data_avaliacao)
-    ).order_by('month').all()
+        PhysicalActivityEvaluation.data_avaliacao >= shift_months(date.today(), months)
+    ).group_by(month).order_by(month).all()
     
     return [{'month': result.month, 'count': result.count} for result in results]
 
@@ -162,4 +208,68 @@ def get_who_compliance_stats(db: Session) -> dict:
         'total_evaluations': total,
         'compliant_count': compliant,
         'compliance_percentage': round((compliant / total * 100) if total > 0 else 0, 1)
-    }
\ No newline at end of file
+    }
+
+
+def get_latest_sedentary_by_age_bands(
+    db: Session,
+    age_bands: Sequence[Tuple[str, Optional[int], Optional[int]]]
+) -> List[dict]:
+    """
+    Active patients, evaluated patients and average sedentary hours of the
+    latest evaluation per age band, in one grouped query.
+
+    `age_bands` are (label, min age, max age) with inclusive, non-overlapping
+    bounds (None = open). Bands without patients are not returned.
+    """
+    whens = []
+    for label, min_age, max_age in age_bands:
+        bounds = []
+        if min_age is not None:
+            bounds.append(PhysicalActivityPatient.idade >= min_age)
+        if max_age is not None:
+            bounds.append(PhysicalActivityPatient.idade <= max_age)
+        whens.append((and_(*bounds), label))
+    band = case(*whens).label('age_range')
+
+    results = db.query(
+        band,
+        func.count(PhysicalActivityPatient.id).label('patient_count'),
+        func.count(PhysicalActivityEvaluation.id).label('evaluated_count'),
+        func.avg(PhysicalActivityEvaluation.sedentary_hours_per_day).label('average_sedentary_hours')
+    ).outerjoin(
+        PhysicalActivityEvaluation, PhysicalActivityPatient.latest_evaluation_id == PhysicalActivityEvaluation.id
+    ).filter(
+        and_(PhysicalActivityPatient.ativo == True, band.isnot(None))
+    ).group_by(band).all()
+
+    return [dict(row._mapping) for row in results]
+
+
+def get_monthly_sedentary_by_condition(db: Session, conditions: Sequence[str], start_date: date) -> List[dict]:
+    """
+    Average sedentary hours per (comorbidity dictionary key, first day of the month)
+    since `start_date`, for active patients, in one query through the comorbidity links.
+    A patient with several of the conditions counts in each of their cohorts.
+    """
+    month = month_start(PhysicalActivityEvaluation.data_avaliacao)
+    results = db.query(
+        Comorbidity.chave.label('condition'),
+        month.label('month'),
+        func.avg(PhysicalActivityEvaluation.sedentary_hours_per_day).label('avg_sedentary'),
+        func.count(PhysicalActivityEvaluation.id).label('evaluation_count')
+    ).select_from(PhysicalActivityPatientComorbidity).join(
+        Comorbidity, PhysicalActivityPatientComorbidity.comorbidity_id == Comorbidity.id
+    ).join(
+        PhysicalActivityPatient, PhysicalActivityPatientComorbidity.patient_id == PhysicalActivityPatient.id
+    ).join(
+        PhysicalActivityEvaluation, PhysicalActivityEvaluation.patient_id == PhysicalActivityPatient.id
+    ).filter(
+        and_(
+            Comorbidity.chave.in_(conditions),
+            PhysicalActivityPatient.ativo == True,
+            PhysicalActivityEvaluation.data_avaliacao >= start_date
+        )
+    ).group_by(Comorbidity.chave, month).order_by(Comorbidity.chave, month).all()
+
+    return [dict(row._mapping) for row in results]
@@ -1,13 +1,22 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from sqlalchemy import and_
+from typing import List, Optional, Tuple
+from datetime import date
 from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
+from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+from models.physical_activity.physical_activity_patient_comorbidity import PhysicalActivityPatientComorbidity
+from models.comorbidity import Comorbidity
+from models.health_unit import HealthUnit
+from db.comorbidities import refresh_patient_comorbidities, remove_patient_comorbidities
+from db.pagination import nulls_last, paginate
 
 
 def create_physical_activity_patient(db: Session, patient_data: dict) -> PhysicalActivityPatient:
     """Create a new Physical Activity patient"""
     db_patient = PhysicalActivityPatient(**patient_data)
     db.add(db_patient)
+    db.flush()
+    refresh_patient_comorbidities(db, PhysicalActivityPatient, db_patient.id)
     db.commit()
     db.refresh(db_patient)
     return db_patient
@@ -93,6 +102,8 @@ def update_physical_activity_patient(db: Session, patient_id: int, patient_data:
     for key, value in patient_data.items():
         if value is not None:
             setattr(db_patient, key, value)
+    db.flush()
+    refresh_patient_comorbidities(db, PhysicalActivityPatient, patient_id)
     
     db.commit()
     db.refresh(db_patient)
@@ -118,6 +129,7 @@ def hard_delete_physical_activity_patient(db: Session, patient_id: int) -> bool:
     if not db_patient:
         return False
     
+    remove_patient_comorbidities(db, PhysicalActivityPatient, patient_id)
     db.delete(db_patient)
     db.commit()
     return True
@@ -142,15 +154,67 @@ def count_physical_activity_patients(db: Session, active_only: bool = True) -> i
 
 
 def get_patients_with_conditions(db: Session, conditions: List[str]) -> List[PhysicalActivityPatient]:
-    """Get patients with specific medical conditions"""
-    query = db.query(PhysicalActivityPatient).filter(PhysicalActivityPatient.ativo == True)
-    
-    condition_filters = []
-    for condition in conditions:
-        condition_filters.append(PhysicalActivityPatient.diagnostico_principal.ilike(f"%{condition}%"))
-        condition_filters.append(PhysicalActivityPatient.comorbidades.ilike(f"%{condition}%"))
+    """Get active patients linked to any of the given comorbidity dictionary keys"""
+    linked = db.query(PhysicalActivityPatientComorbidity.patient_id).join(
+        Comorbidity, PhysicalActivityPatientComorbidity.comorbidity_id == Comorbidity.id
+    ).filter(Comorbidity.chave.in_(conditions))
     
-    if condition_filters:
-        query = query.filter(or_(*condition_filters))
-    
-    return query.all()
\ No newline at end of file
+    return db.query(PhysicalActivityPatient).filter(
+        and_(
+            PhysicalActivityPatient.ativo == True,
+            PhysicalActivityPatient.id.in_(linked)
+        )
+    ).all()
+
+# Sort options of the patient summary -> (column, placeholder for patients without evaluations)
+SUMMARY_SORTS = {
+    "last_evaluation_date": (PhysicalActivityEvaluation.data_avaliacao, date.min),
+    "sedentary_hours": (PhysicalActivityEvaluation.sedentary_hours_per_day, 0.0),
+    "name": (PhysicalActivityPatient.nome_completo, None),
+    "age": (PhysicalActivityPatient.idade, None),
+    "registration_date": (PhysicalActivityPatient.data_cadastro, None),
+}
+
+
+def get_patients_summary_page(
+    db: Session,
+    sort_by: str = "last_evaluation_date",
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of active patients with their latest evaluation (through
+    latest_evaluation_id) and health unit, sorted in the database.
+
+    Ties are broken by registration date and then id, in the same direction.
+    Returns (rows, next cursor); raises ValueError for an invalid cursor.
+    """
+    query = db.query(
+        PhysicalActivityPatient.id,
+        PhysicalActivityPatient.nome_completo,
+        PhysicalActivityPatient.cpf,
+        PhysicalActivityPatient.idade,
+        PhysicalActivityPatient.bairro,
+        PhysicalActivityPatient.data_cadastro,
+        HealthUnit.nome.label('health_unit'),
+        PhysicalActivityEvaluation.id.label('evaluation_id'),
+        PhysicalActivityEvaluation.data_avaliacao,
+        PhysicalActivityEvaluation.sedentary_hours_per_day,
+        PhysicalActivityEvaluation.sedentary_risk_level,
+        PhysicalActivityEvaluation.who_compliance,
+        PhysicalActivityEvaluation.total_weekly_moderate_minutes,
+        PhysicalActivityEvaluation.total_weekly_vigorous_minutes
+    ).outerjoin(
+        PhysicalActivityEvaluation, PhysicalActivityPatient.latest_evaluation_id == PhysicalActivityEvaluation.id
+    ).outerjoin(
+        HealthUnit, PhysicalActivityPatient.unidade_saude_id == HealthUnit.id
+    ).filter(PhysicalActivityPatient.ativo == True)
+
+    column, placeholder = SUMMARY_SORTS[sort_by]
+    keys = nulls_last(column, descending, placeholder) if placeholder is not None else [(column, descending)]
+    if sort_by != "registration_date":
+        keys.append((PhysicalActivityPatient.data_cadastro, descending))
+    keys.append((PhysicalActivityPatient.id, descending))
+
+    return paginate(query, keys, cursor, limit)
@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Upper bounds (in seconds) of the checkout wait time histogram buckets
+WAIT_TIME_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolWaitHistogram:
+    """Thread-safe cumulative histogram of connection checkout wait times"""
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_TIME_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded observations"""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+            self._timeouts = 0
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        """Record a single checkout wait"""
+        with self._lock:
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    index = i
+                    break
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            self._max = max(self._max, seconds)
+            if timed_out:
+                self._timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the histogram as a JSON-serializable dict"""
+        with self._lock:
+            buckets: List[Dict[str, Any]] = []
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets.append({"le": bound, "count": cumulative})
+            buckets.append({"le": "+Inf", "count": self._count})
+
+            return {
+                "count": self._count,
+                "sum_seconds": round(self._sum, 6),
+                "avg_seconds": round(self._sum / self._count, 6) if self._count else 0.0,
+                "max_seconds": round(self._max, 6),
+                "timeouts": self._timeouts,
+                "buckets": buckets
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = PoolWaitHistogram()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.wait_histogram.observe(time.perf_counter() - start, timed_out)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool, InstrumentedQueuePool):
+    """Instrumented pool for asyncio engines"""
+
+
+def get_pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Get live connection pool statistics for an engine"""
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status()
+    }
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0)
+        })
+
+    if isinstance(pool, InstrumentedQueuePool):
+        stats["wait_time"] = pool.wait_histogram.snapshot()
+
+    return stats
@@ -1,96 +1,140 @@
 """
 Script de inicialização de dados padrão.
 Cria o primeiro usuário de teste se não existir nenhum usuário no banco.
+
+Executado manualmente (`python init_data.py`) também corrige os dados do
+usuário de teste caso tenham sido alterados.
 """
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from db.base import SessionLocal
+from db.base import SessionLocal, advisory_lock
 from db.user import user_crud
-from core.security import get_password_hash
+from core.security import get_password_hash, verify_password
 from models.user.user import ProfileType
 
 
+TEST_USER_CPF = "11144477735"
+TEST_USER_MATRICULA = "TEST001"
+TEST_USER_PASSWORD = "senha123"
+TEST_USER_NAME = "Usuário de Teste"
+
+
+def _find_test_user(db: Session):
+    """Busca o usuário de teste pelo CPF ou pela matrícula"""
+    return (
+        user_crud.get_user_by_cpf(db, TEST_USER_CPF)
+        or user_crud.get_user_by_matricula(db, TEST_USER_MATRICULA)
+    )
+
+
+def _print_credentials(title: str, **extra):
+    print("=" * 60)
+    print(title)
+    print(f"   CPF: {TEST_USER_CPF}")
+    print(f"   Matrícula: {TEST_USER_MATRICULA}")
+    print(f"   Senha: {TEST_USER_PASSWORD}")
+    for label, value in extra.items():
+        print(f"   {label}: {value}")
+    print("=" * 60)
+
+
+def _create_test_user(db: Session):
+    """Insere o usuário de teste (um único hash bcrypt para as duas senhas)"""
+    password_hash = get_password_hash(TEST_USER_PASSWORD)
+    test_user_data = {
+        "nome_completo": TEST_USER_NAME,
+        "cpf": TEST_USER_CPF,
+        "matricula": TEST_USER_MATRICULA,
+        "profile_type": ProfileType.GESTOR,
+        "hashed_password": password_hash,
+        "recovery_hashed_password": password_hash,
+        "telefone": None,
+        "sexo": None,
+        "data_nascimento": None,
+        "cep": None,
+        "logradouro": None,
+        "numero": None,
+        "complemento": None,
+        "bairro": None,
+        "municipio": None,
+        "uf": None,
+    }
+    return user_crud.create_user(db, test_user_data)
+
+
+def seed_test_user() -> bool:
+    """
+    Cria o usuário de teste uma única vez por deployment.
+
+    Idempotente e barato quando o usuário já existe (nenhum hash bcrypt é
+    calculado). Roda sob um advisory lock, então com vários workers apenas o
+    primeiro cria o usuário e os demais o encontram pronto.
+
+    Returns:
+        True se o usuário foi criado nesta chamada
+    """
+    db: Session = SessionLocal()
+    try:
+        advisory_lock(db.connection(), "dataaging.seed")
+        if _find_test_user(db):
+            db.rollback()
+            return False
+
+        created_user = _create_test_user(db)
+        _print_credentials("Usuário de teste criado com sucesso!", Tipo="Gestor", ID=created_user.id)
+        return True
+    except IntegrityError:
+        # Outro processo criou o usuário ao mesmo tempo (SQLite não tem advisory lock)
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
 def create_test_user():
     """
-    Cria o usuário de teste padrão se não existir nenhum usuário no banco.
+    Cria o usuário de teste padrão ou corrige seus dados se ele já existir.
     """
     db: Session = SessionLocal()
     try:
-        test_cpf = "11144477735"
-        test_matricula = "TEST001"
-        
-        test_user = user_crud.get_user_by_cpf(db, test_cpf)
-        
-        if not test_user:
-            test_user = user_crud.get_user_by_matricula(db, test_matricula)
-        
+        test_user = _find_test_user(db)
+
         if test_user:
-            from core.security import verify_password
-            correct_password_hash = get_password_hash("senha123")
             updated = False
-            
-            if test_user.cpf != test_cpf:
-                test_user.cpf = test_cpf
+
+            if test_user.cpf != TEST_USER_CPF:
+                test_user.cpf = TEST_USER_CPF
                 updated = True
-            
-            if test_user.matricula != test_matricula:
-                test_user.matricula = test_matricula
+
+            if test_user.matricula != TEST_USER_MATRICULA:
+                test_user.matricula = TEST_USER_MATRICULA
                 updated = True
-            
-            if not verify_password("senha123", test_user.hashed_password):
+
+            if not verify_password(TEST_USER_PASSWORD, test_user.hashed_password):
+                correct_password_hash = get_password_hash(TEST_USER_PASSWORD)
                 test_user.hashed_password = correct_password_hash
                 test_user.recovery_hashed_password = correct_password_hash
                 updated = True
-            
-            if test_user.nome_completo != "Usuário de Teste":
-                test_user.nome_completo = "Usuário de Teste"
+
+            if test_user.nome_completo != TEST_USER_NAME:
+                test_user.nome_completo = TEST_USER_NAME
                 updated = True
-            
+
             if test_user.profile_type != ProfileType.GESTOR:
                 test_user.profile_type = ProfileType.GESTOR
                 updated = True
-            
+
             if updated:
                 db.commit()
                 db.refresh(test_user)
-                print("=" * 60)
-                print("Usuário de teste atualizado com sucesso!")
-                print(f"   CPF: {test_cpf}")
-                print("   Matrícula: TEST001")
-                print("   Senha: senha123")
-                print("=" * 60)
+                _print_credentials("Usuário de teste atualizado com sucesso!")
             else:
                 print("Usuário de teste já existe com os dados corretos.")
             return
-        
-        test_user_data = {
-            "nome_completo": "Usuário de Teste",
-            "cpf": test_cpf,
-            "matricula": test_matricula,
-            "profile_type": ProfileType.GESTOR,
-            "hashed_password": get_password_hash("senha123"),
-            "recovery_hashed_password": get_password_hash("senha123"),
-            "telefone": None,
-            "sexo": None,
-            "data_nascimento": None,
-            "cep": None,
-            "logradouro": None,
-            "numero": None,
-            "complemento": None,
-            "bairro": None,
-            "municipio": None,
-            "uf": None,
-        }
-        
-        created_user = user_crud.create_user(db, test_user_data)
-        print("=" * 60)
-        print("Usuário de teste criado com sucesso!")
-        print(f"   CPF: {test_cpf}")
-        print("   Matrícula: TEST001")
-        print("   Senha: senha123")
-        print("   Tipo: Gestor")
-        print(f"   ID: {created_user.id}")
-        print("=" * 60)
-        
+
+        created_user = _create_test_user(db)
+        _print_credentials("Usuário de teste criado com sucesso!", Tipo="Gestor", ID=created_user.id)
+
     except Exception as e:
         print(f"Erro ao criar usuário de teste: {e}")
         import traceback
@@ -101,4 +145,3 @@ def create_test_user():
 
 if __name__ == "__main__":
     create_test_user()
-
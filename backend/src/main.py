@@ -1,59 +1,71 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from api.auth import auth_router
 from api.auth.auth import get_current_user
+from api.dependencies import READ_PRIMARY_COOKIE
 from api.user import user_router
 from api.health_unit import router as health_unit_router
+from api.export import router as export_router
+from api.dashboard_cube import router as dashboard_cube_router
+from api.comorbidity import router as comorbidity_router
 from api.ivcf import ivcf_patient_router, ivcf_evaluation_router, ivcf_dashboard_router
 from api.factf import factf_patient_router, factf_evaluation_router, factf_dashboard_router
 from api.physical_activity import physical_activity_patient_router, physical_activity_evaluation_router, physical_activity_dashboard_router
 from config import settings
-from db.base import engine, Base, ensure_schema
+from core.instrumentation import (
+    SQLInstrumentationMiddleware, QUERY_COUNT_HEADER, QUERY_TIME_HEADER, REPEATED_QUERIES_HEADER
+)
+from db.base import engine, read_engine, async_engine, async_read_engine, ensure_schema
+from core.metrics import MetricsMiddleware, METRICS_CONTENT_TYPE, render_metrics
+from db.pool import get_pool_stats
 from models import user, ivcf, factf, physical_activity  # Import models to register them
 from models.user.user import User
-from init_data import create_test_user
+from init_data import seed_test_user
 
-Base.metadata.create_all(bind=engine)
-ensure_schema()
 
-# Pequeno delay para garantir que as tabelas foram criadas
-import time
-time.sleep(1)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Tarefas de inicialização/encerramento (executadas por worker, não no import)"""
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(ensure_schema)
+    if settings.SEED_TEST_USER:
+        await run_in_threadpool(seed_test_user)
 
-create_test_user()
+    yield
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version="1.0.0",
-    description="API DataAging - Sistema de Visualização de Dados de Saúde de Idosos"
-)
+    for async_bind in {async_engine, async_read_engine}:
+        await async_bind.dispose()
+    for bind in {engine, read_engine}:
+        bind.dispose()
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],  # Frontend URLs
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Include routers
-app.include_router(auth_router, prefix=settings.API_V1_PREFIX, tags=["auth"])
-app.include_router(user_router, prefix=settings.API_V1_PREFIX, tags=["users"])
-app.include_router(health_unit_router, prefix=settings.API_V1_PREFIX, tags=["health-units"])
-app.include_router(ivcf_patient_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-patients"])
-app.include_router(ivcf_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-evaluations"])
-app.include_router(ivcf_dashboard_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-dashboard"])
-app.include_router(factf_patient_router, prefix=settings.API_V1_PREFIX, tags=["factf-patients"])
-app.include_router(factf_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["factf-evaluations"])
-app.include_router(factf_dashboard_router, prefix=settings.API_V1_PREFIX, tags=["factf-dashboard"])
-app.include_router(physical_activity_patient_router, prefix=f"{settings.API_V1_PREFIX}/physical-activity-patients", tags=["physical-activity-patients"])
-app.include_router(physical_activity_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["physical-activity-evaluations"])
-app.include_router(physical_activity_dashboard_router, prefix=f"{settings.API_V1_PREFIX}/physical-activity-dashboard", tags=["physical-activity-dashboard"])
+async def read_your_writes(request: Request, call_next):
+    """Após uma escrita, faz as leituras seguintes do mesmo cliente irem ao banco primário"""
+    response = await call_next(request)
+    if (
+        settings.DATABASE_READ_URL
+        and request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
 
 #DEBUG
-@app.get("/debug/routes")
-async def list_routes(current_user: User = Depends(get_current_user)):
+system_router = APIRouter()
+
+
+@system_router.get("/debug/routes")
+async def list_routes(request: Request, current_user: User = Depends(get_current_user)):
     """Lista todas as rotas disponíveis na API"""
     routes = [
         {
@@ -62,12 +74,32 @@ async def list_routes(current_user: User = Depends(get_current_user)):
             "name": route.name,
             "endpoint": route.endpoint.__name__
         }
-        for route in app.routes
+        for route in request.app.routes
     ]
     return routes
 
 
-@app.get("/")
+@system_router.get("/debug/pool")
+def get_database_pool_stats(current_user: User = Depends(get_current_user)):
+    """Retorna estatísticas do pool de conexões do banco de dados"""
+    return get_pool_stats(engine)
+
+
+@system_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas da API no formato texto do Prometheus"""
+    engines = {
+        "primary": engine,
+        "replica": read_engine,
+        "async_primary": async_engine.sync_engine,
+        "async_replica": async_read_engine.sync_engine,
+    }
+    if read_engine is engine:
+        del engines["replica"], engines["async_replica"]
+    return PlainTextResponse(render_metrics(engines), media_type=METRICS_CONTENT_TYPE)
+
+
+@system_router.get("/")
 def root():
     """Endpoint raiz da API"""
     return {
@@ -77,6 +109,52 @@ def root():
     }
 
 
+def create_app() -> FastAPI:
+    """Cria a aplicação FastAPI (sem acessar o banco; ver lifespan)"""
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version="1.0.0",
+        description="API DataAging - Sistema de Visualização de Dados de Saúde de Idosos",
+        lifespan=lifespan
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],  # Frontend URLs
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[QUERY_COUNT_HEADER, QUERY_TIME_HEADER, REPEATED_QUERIES_HEADER],
+    )
+    app.middleware("http")(read_your_writes)
+    app.add_middleware(SQLInstrumentationMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(auth_router, prefix=settings.API_V1_PREFIX, tags=["auth"])
+    app.include_router(user_router, prefix=settings.API_V1_PREFIX, tags=["users"])
+    app.include_router(health_unit_router, prefix=settings.API_V1_PREFIX, tags=["health-units"])
+    app.include_router(ivcf_patient_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-patients"])
+    app.include_router(ivcf_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-evaluations"])
+    app.include_router(ivcf_dashboard_router, prefix=settings.API_V1_PREFIX, tags=["ivcf-dashboard"])
+    app.include_router(factf_patient_router, prefix=settings.API_V1_PREFIX, tags=["factf-patients"])
+    app.include_router(factf_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["factf-evaluations"])
+    app.include_router(factf_dashboard_router, prefix=settings.API_V1_PREFIX, tags=["factf-dashboard"])
+    app.include_router(physical_activity_patient_router, prefix=f"{settings.API_V1_PREFIX}/physical-activity-patients", tags=["physical-activity-patients"])
+    app.include_router(physical_activity_evaluation_router, prefix=settings.API_V1_PREFIX, tags=["physical-activity-evaluations"])
+    app.include_router(physical_activity_dashboard_router, prefix=f"{settings.API_V1_PREFIX}/physical-activity-dashboard", tags=["physical-activity-dashboard"])
+    app.include_router(dashboard_cube_router, prefix=settings.API_V1_PREFIX, tags=["dashboard-cube"])
+    app.include_router(export_router, prefix=settings.API_V1_PREFIX, tags=["exports"])
+    app.include_router(comorbidity_router, prefix=settings.API_V1_PREFIX, tags=["comorbidities"])
+    app.include_router(system_router)
+
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
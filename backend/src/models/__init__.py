@@ -1,7 +1,8 @@
 from .user import User
 from .health_unit import HealthUnit
-from .ivcf import IVCFPatient, IVCFEvaluation
-from .factf import FACTFPatient, FACTFEvaluation
-from .physical_activity import PhysicalActivityPatient, PhysicalActivityEvaluation
+from .comorbidity import Comorbidity
+from .ivcf import IVCFPatient, IVCFEvaluation, IVCFMonthlyRollup, IVCFPatientComorbidity
+from .factf import FACTFPatient, FACTFEvaluation, FACTFPatientComorbidity
+from .physical_activity import PhysicalActivityPatient, PhysicalActivityEvaluation, PhysicalActivityPatientComorbidity
 
-__all__ = ["User", "HealthUnit", "IVCFPatient", "IVCFEvaluation", "FACTFPatient", "FACTFEvaluation", "PhysicalActivityPatient", "PhysicalActivityEvaluation"]
+__all__ = ["User", "HealthUnit", "IVCFPatient", "IVCFEvaluation", "FACTFPatient", "FACTFEvaluation", "PhysicalActivityPatient", "PhysicalActivityEvaluation", "IVCFMonthlyRollup", "Comorbidity", "IVCFPatientComorbidity", "FACTFPatientComorbidity", "PhysicalActivityPatientComorbidity"]
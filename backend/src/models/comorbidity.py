@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String
+from db.base import Base
+
+
+class Comorbidity(Base):
+    """
+    Comorbidity dictionary entry (maintained by db/comorbidities.py)
+    
+    Patients are linked to entries through the <instrument>_patient_comorbidities
+    tables, so condition filters and breakdowns are joins instead of text scans.
+    """
+    __tablename__ = "comorbidities"
+    
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    
+    # Normalized key (lowercase, no accents, e.g. "hipertensao") and display name
+    chave = Column(String(50), unique=True, nullable=False)
+    nome = Column(String(100), nullable=False)
+    
+    def __repr__(self):
+        return f"<Comorbidity(id={self.id}, chave={self.chave})>"
@@ -1,4 +1,5 @@
 from .factf_patient import FACTFPatient
 from .factf_evaluation import FACTFEvaluation
+from .factf_patient_comorbidity import FACTFPatientComorbidity
 
-__all__ = ["FACTFPatient", "FACTFEvaluation"]
\ No newline at end of file
+__all__ = ["FACTFPatient", "FACTFEvaluation", "FACTFPatientComorbidity"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, CheckConstraint, Float
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, CheckConstraint, Float, Index, text
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -50,6 +50,9 @@ class FACTFEvaluation(Base):
         CheckConstraint('bem_estar_funcional >= 0 AND bem_estar_funcional <= 28', name='check_bem_estar_funcional'),
         CheckConstraint('subescala_fadiga >= 0 AND subescala_fadiga <= 52', name='check_subescala_fadiga'),
         CheckConstraint("classificacao_fadiga IN ('Sem Fadiga', 'Fadiga Leve', 'Fadiga Grave')", name='check_classificacao_fadiga'),
+        Index('ix_factf_evaluations_patient_date', 'patient_id', text('data_avaliacao DESC')),
+        Index('ix_factf_evaluations_data_avaliacao', 'data_avaliacao'),
+        Index('ix_factf_evaluations_classificacao_fadiga', 'classificacao_fadiga', 'data_avaliacao'),
     )
     
     def __repr__(self):
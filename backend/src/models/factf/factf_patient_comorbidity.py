@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from db.base import Base
+
+
+class FACTFPatientComorbidity(Base):
+    """
+    Link between a FACT-F patient and a comorbidity (maintained by db/comorbidities.py)
+    
+    Rebuilt from the patient's free-text comorbidities on every write.
+    """
+    __tablename__ = "factf_patient_comorbidities"
+    
+    patient_id = Column(Integer, ForeignKey("factf_patients.id"), primary_key=True)
+    comorbidity_id = Column(Integer, ForeignKey("comorbidities.id"), primary_key=True)
+    
+    # Condition-first lookups ("patients with diabetes")
+    __table_args__ = (
+        Index("ix_factf_patient_comorbidities_comorbidity", "comorbidity_id", "patient_id"),
+    )
+    
+    def __repr__(self):
+        return f"<FACTFPatientComorbidity(patient_id={self.patient_id}, comorbidity_id={self.comorbidity_id})>"
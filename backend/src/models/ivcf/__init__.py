@@ -1,4 +1,6 @@
 from .ivcf_patient import IVCFPatient
 from .ivcf_evaluation import IVCFEvaluation
+from .ivcf_monthly_rollup import IVCFMonthlyRollup
+from .ivcf_patient_comorbidity import IVCFPatientComorbidity
 
-__all__ = ["IVCFPatient", "IVCFEvaluation"]
+__all__ = ["IVCFPatient", "IVCFEvaluation", "IVCFMonthlyRollup", "IVCFPatientComorbidity"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, Text, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -49,6 +49,8 @@ class IVCFEvaluation(Base):
         CheckConstraint('dominio_avd >= 0 AND dominio_avd <= 5', name='check_dominio_avd'),
         CheckConstraint('dominio_autopercepcao >= 0 AND dominio_autopercepcao <= 5', name='check_dominio_autopercepcao'),
         CheckConstraint("classificacao IN ('Robusto', 'Em Risco', 'Frágil')", name='check_classificacao'),
+        Index('ix_ivcf_evaluations_patient_date', 'patient_id', text('data_avaliacao DESC')),
+        Index('ix_ivcf_evaluations_classificacao', 'classificacao', 'data_avaliacao'),
     )
     
     def __repr__(self):
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from db.base import Base
+
+
+class IVCFMonthlyRollup(Base):
+    """
+    IVCF-20 evaluations aggregated per month (maintained by db/monthly_rollups.py)
+    
+    One row per (month, health unit, region, age bucket, classification) holding
+    the evaluation count and score sum of the active patients.
+    """
+    __tablename__ = "ivcf_monthly_rollups"
+    
+    # Rollup key
+    month = Column(Date, primary_key=True)  # First day of the month
+    unidade_saude_id = Column(Integer, ForeignKey("health_units.id"), primary_key=True)
+    regiao = Column(String(50), primary_key=True)
+    age_bucket = Column(String(10), primary_key=True)  # <60, 60-70, 71-80, 81+
+    classificacao = Column(String(20), primary_key=True)  # Robusto, Em Risco, Frágil
+    
+    # Aggregates
+    evaluation_count = Column(Integer, default=0, nullable=False)
+    pontuacao_total_sum = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<IVCFMonthlyRollup(month={self.month}, unidade_saude_id={self.unidade_saude_id}, classificacao={self.classificacao}, count={self.evaluation_count})>"
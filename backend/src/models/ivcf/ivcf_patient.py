@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -28,5 +28,16 @@ class IVCFPatient(Base):
     health_unit = relationship("HealthUnit", back_populates="patients")
     evaluations = relationship("IVCFEvaluation", back_populates="patient", cascade="all, delete-orphan")
     
+    # Indexes (see db/migrations)
+    __table_args__ = (
+        Index(
+            "ix_ivcf_patients_active_unit",
+            "unidade_saude_id",
+            "idade",
+            postgresql_where=text("ativo"),
+            sqlite_where=text("ativo = 1")
+        ),
+    )
+    
     def __repr__(self):
         return f"<IVCFPatient(id={self.id}, nome={self.nome_completo}, cpf={self.cpf}, idade={self.idade})>"
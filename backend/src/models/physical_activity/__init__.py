@@ -1,4 +1,5 @@
 from .physical_activity_patient import PhysicalActivityPatient
 from .physical_activity_evaluation import PhysicalActivityEvaluation
+from .physical_activity_patient_comorbidity import PhysicalActivityPatientComorbidity
 
-__all__ = ["PhysicalActivityPatient", "PhysicalActivityEvaluation"]
\ No newline at end of file
+__all__ = ["PhysicalActivityPatient", "PhysicalActivityEvaluation", "PhysicalActivityPatientComorbidity"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Float, Text, JSON
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Float, Text, JSON, Index, text
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -38,5 +38,10 @@ class PhysicalActivityEvaluation(Base):
     # Relationships
     patient = relationship("PhysicalActivityPatient", back_populates="evaluations")
     
+    # Indexes (see db/migrations)
+    __table_args__ = (
+        Index('ix_physical_activity_evaluations_patient_date', 'patient_id', text('data_avaliacao DESC')),
+    )
+    
     def __repr__(self):
         return f"<PhysicalActivityEvaluation(id={self.id}, patient_id={self.patient_id}, data={self.data_avaliacao})>"
\ No newline at end of file
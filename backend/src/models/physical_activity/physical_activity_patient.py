@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from db.base import Base
 from datetime import date
@@ -31,9 +31,30 @@ class PhysicalActivityPatient(Base):
     data_cadastro = Column(Date, default=date.today, nullable=False)
     ativo = Column(Boolean, default=True, nullable=False)
     
+    # Current status: the latest evaluation, kept up to date by the CRUD (see db/latest_evaluations.py).
+    # No FOREIGN KEY so the two tables do not reference each other.
+    latest_evaluation_id = Column(Integer, nullable=True)
+    
     # Relationships
     health_unit = relationship("HealthUnit", back_populates="physical_activity_patients")
     evaluations = relationship("PhysicalActivityEvaluation", back_populates="patient", cascade="all, delete-orphan")
+    latest_evaluation = relationship(
+        "PhysicalActivityEvaluation",
+        primaryjoin="foreign(PhysicalActivityPatient.latest_evaluation_id) == PhysicalActivityEvaluation.id",
+        viewonly=True,
+        uselist=False
+    )
+    
+    # Indexes (see db/migrations)
+    __table_args__ = (
+        Index(
+            "ix_physical_activity_patients_active_unit",
+            "unidade_saude_id",
+            "idade",
+            postgresql_where=text("ativo"),
+            sqlite_where=text("ativo = 1")
+        ),
+    )
     
     def __repr__(self):
         return f"<PhysicalActivityPatient(id={self.id}, nome={self.nome_completo}, cpf={self.cpf}, idade={self.idade})>"
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from db.base import Base
+
+
+class PhysicalActivityPatientComorbidity(Base):
+    """
+    Link between a Physical Activity patient and a comorbidity (maintained by db/comorbidities.py)
+    
+    Rebuilt from the patient's free-text comorbidities on every write.
+    """
+    __tablename__ = "physical_activity_patient_comorbidities"
+    
+    patient_id = Column(Integer, ForeignKey("physical_activity_patients.id"), primary_key=True)
+    comorbidity_id = Column(Integer, ForeignKey("comorbidities.id"), primary_key=True)
+    
+    # Condition-first lookups ("patients with diabetes")
+    __table_args__ = (
+        Index("ix_physical_activity_patient_comorbidities_comorbidity", "comorbidity_id", "patient_id"),
+    )
+    
+    def __repr__(self):
+        return f"<PhysicalActivityPatientComorbidity(patient_id={self.patient_id}, comorbidity_id={self.comorbidity_id})>"
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict
+from schemas.ivcf.ivcf_dashboard import FiltersApplied
+
+
+class ComorbidityResponse(BaseModel):
+    """Schema for an entry of the comorbidity dictionary"""
+    chave: str
+    nome: str
+
+
+class ConditionBreakdown(BaseModel):
+    """Schema for the measures of an instrument among patients with one condition"""
+    condition: str
+    name: str
+    patient_count: int = Field(..., ge=0)
+    evaluation_count: int = Field(..., ge=0)
+    averages: Dict[str, Optional[float]]
+    classifications: Dict[str, int]
+    classification_percentages: Dict[str, float]
+
+
+class ConditionBreakdownResponse(BaseModel):
+    """Schema for condition breakdown API response"""
+    instrument: str
+    conditions: List[ConditionBreakdown]
+    filters_applied: FiltersApplied
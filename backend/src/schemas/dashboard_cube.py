@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict
+from schemas.ivcf.ivcf_dashboard import FiltersApplied
+
+
+class InstrumentCubeMeasures(BaseModel):
+    """Schema for the measures of one instrument at a cube node"""
+    evaluation_count: int = Field(..., ge=0)
+    patient_count: int = Field(..., ge=0)
+    averages: Dict[str, Optional[float]]
+    classifications: Dict[str, int]
+
+
+class CubeNode(BaseModel):
+    """Schema for a node of the city > region > bairro > health unit hierarchy"""
+    level: str
+    regiao: Optional[str] = None
+    bairro: Optional[str] = None
+    unidade_saude_id: Optional[int] = None
+    unidade_saude: Optional[str] = None
+    ivcf: InstrumentCubeMeasures
+    factf: InstrumentCubeMeasures
+    physical_activity: InstrumentCubeMeasures
+
+
+class DashboardCubeResponse(BaseModel):
+    """Schema for dashboard cube API response"""
+    nodes: List[CubeNode]
+    filters_applied: FiltersApplied
@@ -25,7 +25,8 @@ from .ivcf_dashboard import (
     MonthlyEvolutionResponse,
     CriticalPatient,
     CriticalPatientsResponse,
-    FragileElderlyPercentageResponse
+    FragileElderlyPercentageResponse,
+    IVCFDashboardSnapshot
 )
 
 __all__ = [
@@ -50,5 +51,7 @@ __all__ = [
     "MonthlyEvolution",
     "MonthlyEvolutionResponse",
     "CriticalPatient",
-    "CriticalPatientsResponse"
+    "CriticalPatientsResponse",
+    "FragileElderlyPercentageResponse",
+    "IVCFDashboardSnapshot"
 ]
@@ -99,15 +99,38 @@ class CriticalPatientsResponse(BaseModel):
     filters_applied: FiltersApplied
 
 
+class FragileRegionSubtotal(BaseModel):
+    """Schema for the fragile percentage of a single region"""
+    region: str
+    total_patients: int = Field(..., ge=0)
+    fragile_patients: int = Field(..., ge=0)
+    fragile_percentage: float = Field(..., ge=0, le=100)
+    breakdown: Dict[str, int] = Field(default_factory=dict)
+
+
 class FragilePercentageData(BaseModel):
     """Schema for fragile percentage data"""
     total_patients: int = Field(..., ge=0)
     fragile_patients: int = Field(..., ge=0)
     fragile_percentage: float = Field(..., ge=0, le=100)
     breakdown: Dict[str, int] = Field(default_factory=dict)
+    regions: List[FragileRegionSubtotal] = Field(default_factory=list)
 
 
 class FragileElderlyPercentageResponse(BaseModel):
     """Schema for fragile elderly percentage API response"""
     percentage_data: FragilePercentageData
     filters_applied: FiltersApplied
+
+
+class IVCFDashboardSnapshot(BaseModel):
+    """Schema for every IVCF dashboard widget computed for one filter set"""
+    summary: IVCFSummary
+    domains: List[DomainDistribution]
+    chart_config: ChartConfig
+    regions: List[RegionAverage]
+    evolution: List[MonthlyEvolution]
+    critical_patients: List[CriticalPatient]
+    total_critical: int = Field(..., ge=0)
+    fragile_percentage: FragilePercentageData
+    filters_applied: FiltersApplied
@@ -0,0 +1,88 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import List, Optional
+from datetime import date
+from schemas.comorbidity import ComorbidityResponse, ConditionBreakdown, ConditionBreakdownResponse
+from schemas.ivcf.ivcf_dashboard import FiltersApplied
+from db import comorbidity_crud
+from db.comorbidities import COMORBIDITIES, COMORBIDITY_LINKS
+from db.ivcf import ivcf_dashboard_crud
+
+
+class ComorbidityService:
+    """Service layer for the comorbidity dictionary and condition-stratified aggregates"""
+    
+    @staticmethod
+    def get_comorbidities() -> List[ComorbidityResponse]:
+        """Get every entry of the comorbidity dictionary"""
+        return [ComorbidityResponse(chave=key, nome=name) for key, (name, _) in COMORBIDITIES.items()]
+    
+    @staticmethod
+    def get_condition_breakdown(
+        db: Session,
+        instrument: str,
+        conditions: Optional[List[str]] = None,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None
+    ) -> ConditionBreakdownResponse:
+        """
+        Get the measures of an instrument grouped by condition.
+        
+        Args:
+            db: Database session
+            instrument: ivcf, factf or physical_activity
+            conditions: Dictionary keys to include (default: every condition with data)
+            period_from: Start date filter
+            period_to: End date filter
+            region: Region filter
+            health_unit_id: Health unit filter
+            age_range: Age range filter
+            
+        Returns:
+            ConditionBreakdownResponse object
+            
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        errors = {}
+        
+        if instrument not in COMORBIDITY_LINKS:
+            errors["instrument"] = f"Instrumento '{instrument}' não é válido. Use: {', '.join(COMORBIDITY_LINKS)}"
+        
+        unknown = [condition for condition in conditions or [] if condition not in COMORBIDITIES]
+        if unknown:
+            errors["conditions"] = f"Condições desconhecidas: {', '.join(unknown)}. Consulte GET /comorbidities"
+        
+        if region and not ivcf_dashboard_crud.validate_curitiba_region(region):
+            errors["region"] = f"Região '{region}' não é uma região válida de Curitiba"
+        
+        if age_range and not ivcf_dashboard_crud.validate_age_range(age_range):
+            errors["age_range"] = f"Faixa etária '{age_range}' não é válida. Use: 60-70, 71-80, 81+"
+        
+        if errors:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+        
+        breakdown, total_patients = comorbidity_crud.get_condition_breakdown(
+            db, instrument, conditions, period_from, period_to, region, health_unit_id, age_range
+        )
+        
+        for row in breakdown:
+            total = row["evaluation_count"]
+            row["classification_percentages"] = {
+                key: round(count / total * 100, 1) if total else 0.0
+                for key, count in row["classifications"].items()
+            }
+        
+        filters_applied = ivcf_dashboard_crud.get_dashboard_filters_applied(
+            period_from, period_to, region, health_unit_id, age_range
+        )
+        filters_applied["total_patients"] = total_patients
+        
+        return ConditionBreakdownResponse(
+            instrument=instrument,
+            conditions=[ConditionBreakdown(**row) for row in breakdown],
+            filters_applied=FiltersApplied(**filters_applied)
+        )
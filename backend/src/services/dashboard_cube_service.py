@@ -0,0 +1,76 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import Optional
+from datetime import date
+from config import settings
+from core.cache import TTLCache
+from schemas.dashboard_cube import DashboardCubeResponse, CubeNode
+from schemas.ivcf.ivcf_dashboard import FiltersApplied
+from db import dashboard_cube_crud
+from db.ivcf import ivcf_dashboard_crud
+
+
+# Computed cubes by filter set; drill-down requests for the same filters are served from here
+CUBE_CACHE = TTLCache(ttl_seconds=settings.DASHBOARD_CUBE_CACHE_SECONDS)
+
+
+class DashboardCubeService:
+    """Service layer for the cross-instrument region / bairro / health unit cube"""
+    
+    @staticmethod
+    def get_dashboard_cube(
+        db: Session,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None
+    ) -> DashboardCubeResponse:
+        """
+        Get every level of the city > region > bairro > health unit hierarchy.
+        
+        The cube is computed in one statement and cached per filter set for
+        DASHBOARD_CUBE_CACHE_SECONDS, so drilling down never queries the
+        evaluation tables again.
+        
+        Args:
+            db: Database session
+            period_from: Start date filter
+            period_to: End date filter
+            region: Region filter
+            health_unit_id: Health unit filter
+            age_range: Age range filter
+            
+        Returns:
+            DashboardCubeResponse object
+            
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        if region and not ivcf_dashboard_crud.validate_curitiba_region(region):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Região '{region}' não é uma região válida de Curitiba"
+            )
+        
+        if age_range and not ivcf_dashboard_crud.validate_age_range(age_range):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Faixa etária '{age_range}' não é válida. Use: 60-70, 71-80, 81+"
+            )
+        
+        def build() -> DashboardCubeResponse:
+            nodes, people_count = dashboard_cube_crud.get_dashboard_cube(
+                db, period_from, period_to, region, health_unit_id, age_range
+            )
+            filters_applied = ivcf_dashboard_crud.get_dashboard_filters_applied(
+                period_from, period_to, region, health_unit_id, age_range
+            )
+            # People evaluated in any instrument, counted once each (by CPF)
+            filters_applied["total_patients"] = people_count
+            return DashboardCubeResponse(
+                nodes=[CubeNode(**node) for node in nodes],
+                filters_applied=FiltersApplied(**filters_applied)
+            )
+        
+        return CUBE_CACHE.get_or_set((period_from, period_to, region, health_unit_id, age_range), build)
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from typing import AsyncIterator, Optional
+from datetime import date
+from db import export_crud
+from db.ivcf import ivcf_dashboard_crud
+
+
+# Format -> media type of the streamed file
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportService:
+    """Service layer for the bulk CSV/NDJSON exports"""
+
+    @staticmethod
+    def validate_filters(
+        instrument: Optional[str] = None,
+        region: Optional[str] = None,
+        age_range: Optional[str] = None,
+        classification: Optional[str] = None
+    ) -> None:
+        """
+        Validate export filters (same rules as the dashboards).
+
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        errors = {}
+
+        if instrument is not None and instrument not in export_crud.EXPORTS:
+            errors["instrument"] = f"Instrumento '{instrument}' não é válido. Use: {', '.join(export_crud.EXPORTS)}"
+
+        if region and not ivcf_dashboard_crud.validate_curitiba_region(region):
+            errors["region"] = f"Região '{region}' não é uma região válida de Curitiba"
+
+        if age_range and not ivcf_dashboard_crud.validate_age_range(age_range):
+            errors["age_range"] = f"Faixa etária '{age_range}' não é válida. Use: 60-70, 71-80, 81+"
+
+        if classification and instrument in export_crud.EXPORTS:
+            classifications = export_crud.EXPORTS[instrument].classifications
+            if classification not in classifications:
+                errors["classification"] = (
+                    f"Classificação '{classification}' não é válida. Use: {', '.join(classifications)}"
+                )
+
+        if errors:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+    @staticmethod
+    def get_evaluations_export(
+        instrument: str,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None,
+        classification: Optional[str] = None
+    ) -> Select:
+        """
+        Build the evaluation export of an instrument.
+
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        ExportService.validate_filters(instrument, region, age_range, classification)
+        return export_crud.get_evaluations_export(
+            instrument, period_from, period_to, region, health_unit_id, age_range, classification
+        )
+
+    @staticmethod
+    def get_patients_export(
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None
+    ) -> Select:
+        """
+        Build the cross-instrument patient export.
+
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        ExportService.validate_filters(region=region, age_range=age_range)
+        return export_crud.get_patients_export(region, health_unit_id, age_range)
+
+    @staticmethod
+    async def stream_export(db: AsyncSession, statement: Select, export_format: str) -> AsyncIterator[str]:
+        """
+        Run the export with a server-side cursor and yield it as CSV or NDJSON chunks.
+
+        Only one batch of EXPORT_BATCH_SIZE rows is held in memory at a time,
+        whatever the size of the export.
+        """
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if export_format == "csv":
+            writer.writerow(columns)
+            yield buffer.getvalue()
+
+        async for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            if export_format == "csv":
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+                    buffer.write("\n")
+            yield buffer.getvalue()
@@ -1,9 +1,18 @@
 from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
 from typing import Dict, List, Optional
-from datetime import date, datetime, timedelta
+from datetime import date
+from db import comorbidity_crud
 from db.factf import factf_patient_crud, factf_evaluation_crud
-from models.factf.factf_patient import FACTFPatient
-from models.factf.factf_evaluation import FACTFEvaluation
+from db.ivcf import ivcf_dashboard_crud
+from db.ivcf.ivcf_dashboard_crud import shift_months
+
+
+# Score percentiles reported by the monthly evolution
+PERCENTILES = (25, 50, 75)
+
+# Values of classificacao_fadiga
+FATIGUE_CLASSIFICATIONS = ("Sem Fadiga", "Fadiga Leve", "Fadiga Grave")
 
 
 class FACTFDashboardService:
@@ -17,30 +26,18 @@ class FACTFDashboardService:
         Returns:
             Dict with total patients, critical patients, average scores, etc.
         """
-        # Total patients
-        total_patients = factf_patient_crud.count_factf_patients(db, active_only=True)
+        # Counts, averages and both 30-day windows in one round-trip
+        stats = factf_evaluation_crud.get_summary_stats(db, today=date.today(), window_days=30, critical_fatigue_score=30.0)
         
-        # Critical patients (fatigue score <= 30)
-        critical_patients = factf_evaluation_crud.get_critical_patients(db, min_fatigue_score=30.0)
-        critical_count = len(critical_patients)
+        total_patients = stats['total_patients']
+        critical_count = stats['critical_patients']
         
         # Calculate percentage of severe fatigue
         severe_fatigue_percentage = (critical_count / total_patients * 100) if total_patients > 0 else 0
         
-        # Get domain averages
-        domain_averages = factf_evaluation_crud.get_domain_averages(db)
-        
         # Calculate monthly growth (last 30 days vs previous 30 days)
-        today = date.today()
-        last_30_days = today - timedelta(days=30)
-        previous_30_days = today - timedelta(days=60)
-        
-        recent_evaluations = len(factf_evaluation_crud.get_evaluations_by_date_range(
-            db, last_30_days, today
-        ))
-        previous_evaluations = len(factf_evaluation_crud.get_evaluations_by_date_range(
-            db, previous_30_days, last_30_days
-        ))
+        recent_evaluations = stats['recent_evaluations']
+        previous_evaluations = stats['previous_evaluations']
         
         growth_percentage = 0
         if previous_evaluations > 0:
@@ -50,14 +47,14 @@ class FACTFDashboardService:
             "total_patients": total_patients,
             "severe_fatigue_percentage": round(severe_fatigue_percentage, 1),
             "critical_patients_count": critical_count,
-            "average_total_score": round(domain_averages.get('pontuacao_total', 0), 1),
+            "average_total_score": round(stats.get('pontuacao_total', 0), 1),
             "monthly_growth_percentage": round(growth_percentage, 1),
             "domain_averages": {
-                "physical": round(domain_averages.get('bem_estar_fisico', 0), 1),
-                "social": round(domain_averages.get('bem_estar_social', 0), 1),
-                "emotional": round(domain_averages.get('bem_estar_emocional', 0), 1),
-                "functional": round(domain_averages.get('bem_estar_funcional', 0), 1),
-                "fatigue": round(domain_averages.get('subescala_fadiga', 0), 1)
+                "physical": round(stats.get('bem_estar_fisico', 0), 1),
+                "social": round(stats.get('bem_estar_social', 0), 1),
+                "emotional": round(stats.get('bem_estar_emocional', 0), 1),
+                "functional": round(stats.get('bem_estar_funcional', 0), 1),
+                "fatigue": round(stats.get('subescala_fadiga', 0), 1)
             }
         }
     
@@ -97,56 +94,27 @@ class FACTFDashboardService:
         Returns:
             List with fatigue distribution data by specific health conditions
         """
-        # Get all evaluations with patient data
-        evaluations = db.query(FACTFEvaluation, FACTFPatient.comorbidades).join(
-            FACTFPatient, FACTFEvaluation.patient_id == FACTFPatient.id
-        ).filter(FACTFPatient.ativo == True).all()
+        # Conditions to track, as comorbidity dictionary keys
+        conditions = ["diabetes", "hipertensao", "artrite"]
         
-        # Define conditions to track
-        conditions = ["Diabetes", "Hipertensão", "Artrite"]
-        
-        # Initialize distribution tracking
-        condition_distributions = {}
-        for condition in conditions:
-            condition_distributions[condition] = {
-                "Sem Fadiga": 0,
-                "Fadiga Leve": 0,
-                "Fadiga Grave": 0
-            }
-        
-        # Process each evaluation
-        for evaluation, comorbidades in evaluations:
-            if not comorbidades:
-                continue
-                
-            # Check which conditions this patient has
-            comorbidades_lower = comorbidades.lower()
-            patient_conditions = []
-            
-            if "diabetes" in comorbidades_lower:
-                patient_conditions.append("Diabetes")
-            if "hipertensão" in comorbidades_lower or "hipertensao" in comorbidades_lower:
-                patient_conditions.append("Hipertensão")
-            if "artrite" in comorbidades_lower:
-                patient_conditions.append("Artrite")
-            
-            # Count this evaluation for each condition the patient has
-            for condition in patient_conditions:
-                if evaluation.classificacao_fadiga in condition_distributions[condition]:
-                    condition_distributions[condition][evaluation.classificacao_fadiga] += 1
+        # Classification counts per condition, grouped in SQL over the comorbidity links
+        rows, _ = comorbidity_crud.get_condition_breakdown(db, "factf", conditions)
+        breakdown = {row["condition"]: row for row in rows}
         
         # Convert to the expected format with percentages
         result = []
         for condition in conditions:
-            distribution = condition_distributions[condition]
+            if condition not in breakdown:  # Only include conditions with data
+                continue
+            distribution = breakdown[condition]["classifications"]
             total = sum(distribution.values())
             
-            if total > 0:  # Only include conditions with data
+            if total > 0:
                 result.append({
-                    "condition": condition,
-                    "no_fatigue": round((distribution["Sem Fadiga"] / total * 100), 1),
-                    "mild_fatigue": round((distribution["Fadiga Leve"] / total * 100), 1),
-                    "severe_fatigue": round((distribution["Fadiga Grave"] / total * 100), 1)
+                    "condition": breakdown[condition]["name"],
+                    "no_fatigue": round((distribution["no_fatigue"] / total * 100), 1),
+                    "mild_fatigue": round((distribution["mild_fatigue"] / total * 100), 1),
+                    "severe_fatigue": round((distribution["severe_fatigue"] / total * 100), 1)
                 })
         
         # If no specific conditions found, return example data for demonstration
@@ -185,48 +153,36 @@ class FACTFDashboardService:
             months_back: Number of months to look back
             
         Returns:
-            List with monthly evolution data
+            One row per calendar month, oldest first, with averages and score
+            percentiles (months without evaluations have a zero count and null scores)
         """
-        today = date.today()
-        start_date = today - timedelta(days=months_back * 30)
-        
-        # Get evaluations in the period
-        evaluations = factf_evaluation_crud.get_evaluations_by_date_range(
-            db, start_date, today, limit=10000
-        )
-        
-        # Group by month
-        monthly_data = {}
+        # Calendar months from `months_back` months ago through the current month
+        start_month = shift_months(date.today(), months_back)
+        stats = {
+            row["month"]: row
+            for row in factf_evaluation_crud.get_monthly_score_stats(db, start_month, PERCENTILES)
+        }
         
-        for evaluation in evaluations:
-            month_key = evaluation.data_avaliacao.strftime("%Y-%m")
-            
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    "total_scores": [],
-                    "fatigue_scores": []
-                }
-            
-            monthly_data[month_key]["total_scores"].append(evaluation.pontuacao_total)
-            monthly_data[month_key]["fatigue_scores"].append(evaluation.subescala_fadiga)
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(float(value), 1) if value is not None else None
         
-        # Calculate averages
         result = []
-        for month_key in sorted(monthly_data.keys()):
-            data = monthly_data[month_key]
-            
-            avg_total = sum(data["total_scores"]) / len(data["total_scores"])
-            avg_fatigue = sum(data["fatigue_scores"]) / len(data["fatigue_scores"])
-            
-            # Convert month to readable format
-            month_date = datetime.strptime(month_key, "%Y-%m")
-            month_name = month_date.strftime("%b")
-            
+        for offset in range(months_back, -1, -1):
+            month = shift_months(date.today(), offset)
+            # Months without evaluations get an explicit row with zero evaluations
+            row = stats.get(month, {})
             result.append({
-                "month": month_name,
-                "average_total_score": round(avg_total, 1),
-                "average_fatigue_score": round(avg_fatigue, 1),
-                "evaluations_count": len(data["total_scores"])
+                "month": month.strftime("%b"),
+                "year": month.year,
+                "average_total_score": rounded(row.get("average_total_score")),
+                "average_fatigue_score": rounded(row.get("average_fatigue_score")),
+                "evaluations_count": row.get("evaluations_count", 0),
+                "total_score_percentiles": {
+                    f"p{percentile}": rounded(row.get(f"pontuacao_total_p{percentile}")) for percentile in PERCENTILES
+                },
+                "fatigue_score_percentiles": {
+                    f"p{percentile}": rounded(row.get(f"subescala_fadiga_p{percentile}")) for percentile in PERCENTILES
+                }
             })
         
         return result
@@ -329,4 +285,85 @@ class FACTFDashboardService:
                     "max_score": 52
                 }
             ]
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def get_all_patients_summary(
+        db: Session,
+        sort_by: str = "name",
+        order: str = "asc",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        classification: Optional[str] = None,
+        age_range: Optional[str] = None,
+        bairro: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        search: Optional[str] = None
+    ) -> Dict:
+        """
+        Get a page of active patients with their latest evaluation data.
+        
+        Args:
+            db: Database session
+            sort_by: name, age, last_score, fatigue_score or evaluation_date
+            order: asc or desc (patients without evaluations always come last)
+            cursor: next_cursor of the previous page
+            limit: Page size
+            classification: Latest evaluation fatigue classification filter
+            age_range: Age range filter
+            bairro: Neighborhood filter
+            health_unit_id: Health unit filter
+            search: Patient name filter
+            
+        Returns:
+            Dict with the patients of the page, the total count and the next cursor
+            
+        Raises:
+            HTTPException: If invalid parameters provided
+        """
+        errors = {}
+        
+        if sort_by not in factf_patient_crud.SUMMARY_SORTS:
+            errors["sort_by"] = f"Ordenação '{sort_by}' não é válida. Use: {', '.join(factf_patient_crud.SUMMARY_SORTS)}"
+        
+        if order not in ("asc", "desc"):
+            errors["order"] = f"Ordem '{order}' não é válida. Use: asc, desc"
+        
+        if classification and classification not in FATIGUE_CLASSIFICATIONS:
+            errors["classification"] = (
+                f"Classificação '{classification}' não é válida. Use: {', '.join(FATIGUE_CLASSIFICATIONS)}"
+            )
+        
+        if age_range and not ivcf_dashboard_crud.validate_age_range(age_range):
+            errors["age_range"] = f"Faixa etária '{age_range}' não é válida. Use: 60-70, 71-80, 81+"
+        
+        if errors:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+        
+        try:
+            rows, next_cursor, total_count = factf_patient_crud.get_patients_summary_page(
+                db, sort_by, order == "desc", cursor, limit,
+                classification, age_range, bairro, health_unit_id, search
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"cursor": "Cursor inválido para esta ordenação"}
+            )
+        
+        return {
+            "patients": [
+                {
+                    "id": row.id,
+                    "name": row.nome_completo,
+                    "age": row.idade,
+                    "last_score": float(row.pontuacao_total) if row.pontuacao_total is not None else None,
+                    "fatigue_score": float(row.subescala_fadiga) if row.subescala_fadiga is not None else None,
+                    "classification": row.classificacao_fadiga,
+                    "evaluation_date": row.data_avaliacao.isoformat() if row.data_avaliacao else None
+                }
+                for row in rows
+            ],
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        }
@@ -11,6 +11,8 @@ from schemas.ivcf.ivcf_dashboard import (
     MonthlyEvolutionResponse,
     CriticalPatientsResponse,
     FragileElderlyPercentageResponse,
+    FragilePercentageData,
+    IVCFDashboardSnapshot,
     DomainDistribution,
     RegionAverage,
     MonthlyEvolution,
@@ -23,17 +25,46 @@ class IVCFDashboardService:
     """Service layer for dashboard business logic"""
     
     @staticmethod
-    def get_ivcf_summary(db: Session) -> IVCFSummary:
+    def get_ivcf_summary(
+        db: Session,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None
+    ) -> IVCFSummary:
         """
         Get IVCF summary statistics.
         
         Args:
             db: Database session
+            period_from: Start date filter
+            period_to: End date filter
+            region: Region filter
+            health_unit_id: Health unit filter
+            age_range: Age range filter
             
         Returns:
             IVCFSummary object
+            
+        Raises:
+            HTTPException: If invalid filters provided
         """
-        summary_data = ivcf_dashboard_crud.get_ivcf_summary(db)
+        if region and not ivcf_dashboard_crud.validate_curitiba_region(region):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Região '{region}' não é uma região válida de Curitiba"
+            )
+        
+        if age_range and not ivcf_dashboard_crud.validate_age_range(age_range):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Faixa etária '{age_range}' não é válida. Use: 60-70, 71-80, 81+"
+            )
+        
+        summary_data = ivcf_dashboard_crud.get_ivcf_summary(
+            db, period_from, period_to, region, health_unit_id, age_range
+        )
         return IVCFSummary(**summary_data)
     
     @staticmethod
@@ -88,10 +119,8 @@ class IVCFDashboardService:
             db, period_from, period_to, region, health_unit_id, age_range, classification
         )
         
-        # Get total patients with filters
-        total_patients = ivcf_dashboard_crud.get_total_patients_with_filters(
-            db, period_from, period_to, region, health_unit_id, age_range, classification
-        )
+        # Same filters, so the aggregate query already carries the total
+        total_patients = domain_data[0]["patient_count"] if domain_data else 0
         
         # Get applied filters
         filters_applied = ivcf_dashboard_crud.get_dashboard_filters_applied(
@@ -327,20 +356,14 @@ class IVCFDashboardService:
         filters = FiltersApplied(**filters_applied)
         
         # Create percentage data structure
-        from schemas.ivcf.ivcf_dashboard import FragilePercentageData, FragileElderlyPercentageResponse
-        
-        # Calculate breakdown (we need to get classification counts)
-        breakdown = {
-            "robust": 0,
-            "risk": 0,
-            "fragile": percentage_data["fragile_elderly"]
-        }
+        from schemas.ivcf.ivcf_dashboard import FragilePercentageData, FragileRegionSubtotal, FragileElderlyPercentageResponse
         
         percentage_data_obj = FragilePercentageData(
             total_patients=percentage_data["total_elderly"],
             fragile_patients=percentage_data["fragile_elderly"],
             fragile_percentage=percentage_data["fragile_percentage"],
-            breakdown=breakdown
+            breakdown=percentage_data["breakdown"],
+            regions=[FragileRegionSubtotal(**item) for item in percentage_data["regions"]]
         )
         
         return FragileElderlyPercentageResponse(
@@ -348,6 +371,88 @@ class IVCFDashboardService:
             filters_applied=filters
         )
     
+    @staticmethod
+    def get_dashboard_snapshot(
+        db: Session,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        region: Optional[str] = None,
+        health_unit_id: Optional[int] = None,
+        age_range: Optional[str] = None,
+        months_back: int = 6,
+        from_last_evaluation: bool = False,
+        pontuacao_minima: int = 20
+    ) -> IVCFDashboardSnapshot:
+        """
+        Get every dashboard widget for one filter set.
+        
+        Args:
+            db: Database session
+            period_from: Start date filter
+            period_to: End date filter
+            region: Region filter
+            health_unit_id: Health unit filter
+            age_range: Age range filter
+            months_back: Number of months of monthly evolution
+            from_last_evaluation: If True, the evolution starts from the last evaluation date
+            pontuacao_minima: Minimum score for critical patients
+            
+        Returns:
+            IVCFDashboardSnapshot object
+            
+        Raises:
+            HTTPException: If invalid filters provided
+        """
+        errors = IVCFDashboardService.validate_filters(region, age_range)
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=errors
+            )
+        
+        if months_back < 1 or months_back > 24:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Número de meses deve estar entre 1 e 24"
+            )
+        
+        if pontuacao_minima < 0 or pontuacao_minima > 40:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Pontuação mínima deve estar entre 0 e 40"
+            )
+        
+        snapshot = ivcf_dashboard_crud.get_dashboard_snapshot(
+            db, period_from, period_to, region, health_unit_id, age_range,
+            months_back, from_last_evaluation, pontuacao_minima
+        )
+        
+        # Get applied filters
+        filters_applied = ivcf_dashboard_crud.get_dashboard_filters_applied(
+            period_from, period_to, region, health_unit_id, age_range
+        )
+        filters_applied["total_patients"] = snapshot["summary"]["total_elderly"]
+        
+        fragile = snapshot["fragile_percentage"]
+        
+        return IVCFDashboardSnapshot(
+            summary=IVCFSummary(**snapshot["summary"]),
+            domains=[DomainDistribution(**data) for data in snapshot["domains"]],
+            chart_config=ChartConfig(),
+            regions=[RegionAverage(**data) for data in snapshot["region_averages"]],
+            evolution=[MonthlyEvolution(**data) for data in snapshot["evolution"]],
+            critical_patients=[CriticalPatient(**data) for data in snapshot["critical_patients"]],
+            total_critical=len(snapshot["critical_patients"]),
+            fragile_percentage=FragilePercentageData(
+                total_patients=fragile["total_elderly"],
+                fragile_patients=fragile["fragile_elderly"],
+                fragile_percentage=fragile["fragile_percentage"],
+                breakdown=fragile["breakdown"],
+                regions=fragile["regions"]
+            ),
+            filters_applied=FiltersApplied(**filters_applied)
+        )
+    
     @staticmethod
     def validate_filters(
         region: Optional[str] = None,
@@ -1,11 +1,14 @@
+import re
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from typing import List, Dict, Any, Optional
-from datetime import date, timedelta
+from fastapi import HTTPException, status
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date
+from db.comorbidities import COMORBIDITIES
+from db.ivcf.ivcf_dashboard_crud import shift_months
 from db.physical_activity.physical_activity_patient_crud import (
     count_physical_activity_patients,
-    get_physical_activity_patients_by_age_range,
-    get_patients_with_conditions
+    get_patients_summary_page,
+    SUMMARY_SORTS
 )
 from db.physical_activity.physical_activity_evaluation_crud import (
     get_evaluations_by_who_compliance,
@@ -14,10 +17,16 @@ from db.physical_activity.physical_activity_evaluation_crud import (
     get_activity_distribution_stats,
     get_who_compliance_stats,
     get_monthly_evaluation_counts,
-    get_latest_evaluation_by_patient
+    get_latest_sedentary_by_age_bands,
+    get_monthly_sedentary_by_condition
 )
-from models.physical_activity.physical_activity_patient import PhysicalActivityPatient
-from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+
+
+# Age bands of the sedentary-by-age chart when none are requested
+DEFAULT_AGE_BANDS = "60-70,71-80,81+"
+
+# Cohorts of the sedentary trend when none are requested: comorbidity key -> response key
+DEFAULT_TREND_COHORTS = {"diabetes": "diabetics", "hipertensao": "hypertensives"}
 
 
 class PhysicalActivityDashboardService:
@@ -44,29 +53,37 @@ class PhysicalActivityDashboardService:
         }
     
     @staticmethod
-    def get_critical_patients(db: Session) -> List[Dict[str, Any]]:
-        """Get patients with critical sedentary risk (>10 hours/day)"""
-        critical_evaluations = get_critical_sedentary_patients(db)
+    def get_critical_patients(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of patients whose latest evaluation has critical sedentary risk (>10 hours/day), and the next cursor"""
+        try:
+            rows, next_cursor = get_critical_sedentary_patients(db, limit, cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Cursor inválido"
+            )
         
-        critical_patients = []
-        for evaluation in critical_evaluations:
-            patient_data = {
-                "patient_id": evaluation.patient_id,
-                "patient_name": evaluation.patient.nome_completo,
-                "cpf": evaluation.patient.cpf,
-                "age": evaluation.patient.idade,
-                "bairro": evaluation.patient.bairro,
-                "sedentary_hours_per_day": evaluation.sedentary_hours_per_day,
-                "evaluation_date": evaluation.data_avaliacao,
-                "who_compliance": evaluation.who_compliance,
-                "health_unit": evaluation.patient.health_unit.nome if evaluation.patient.health_unit else None
-            }
-            critical_patients.append(patient_data)
-        
-        # Sort by sedentary hours (highest first)
-        critical_patients.sort(key=lambda x: x['sedentary_hours_per_day'], reverse=True)
-        
-        return critical_patients
+        return {
+            "patients": [
+                {
+                    "patient_id": row.patient_id,
+                    "patient_name": row.nome_completo,
+                    "cpf": row.cpf,
+                    "age": row.idade,
+                    "bairro": row.bairro,
+                    "sedentary_hours_per_day": row.sedentary_hours_per_day,
+                    "evaluation_date": row.data_avaliacao,
+                    "who_compliance": row.who_compliance,
+                    "health_unit": row.health_unit
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor
+        }
     
     @staticmethod
     def get_activity_distribution(db: Session) -> Dict[str, Any]:
@@ -92,116 +109,80 @@ class PhysicalActivityDashboardService:
         }
     
     @staticmethod
-    def get_sedentary_by_age(db: Session) -> List[Dict[str, Any]]:
-        """Get sedentary hours by age range"""
-        age_ranges = ["60-70", "71-80", "81+"]
-        results = []
+    def parse_age_bands(age_bands: str) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """Parse "60-70,71-80,81+" into (label, min age, max age) bands, raising 422 if invalid"""
+        bands = []
+        for label in (part.strip() for part in age_bands.split(",")):
+            match = re.fullmatch(r"(\d+)(?:-(\d+)|\+)", label)
+            if not match or (match.group(2) and int(match.group(2)) < int(match.group(1))):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Faixa etária '{label}' não é válida. Use o formato 60-70 ou 81+"
+                )
+            bands.append((label, int(match.group(1)), int(match.group(2)) if match.group(2) else None))
         
-        for age_range in age_ranges:
-            # Get patients in age range
-            patients = get_physical_activity_patients_by_age_range(db, age_range)
-            
-            if not patients:
-                results.append({
-                    "age_range": age_range,
-                    "average_sedentary_hours": 0,
-                    "patient_count": 0
-                })
-                continue
-            
-            # Get latest evaluations for these patients
-            total_sedentary_hours = 0
-            evaluation_count = 0
-            
-            for patient in patients:
-                latest_eval = get_latest_evaluation_by_patient(db, patient.id)
-                if latest_eval:
-                    total_sedentary_hours += latest_eval.sedentary_hours_per_day
-                    evaluation_count += 1
-            
-            avg_sedentary = total_sedentary_hours / evaluation_count if evaluation_count > 0 else 0
-            
+        ordered = sorted(bands, key=lambda band: band[1])
+        for (label, _, max_age), (next_label, next_min, _) in zip(ordered, ordered[1:]):
+            if max_age is None or max_age >= next_min:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Faixas etárias '{label}' e '{next_label}' se sobrepõem"
+                )
+        return bands
+    
+    @staticmethod
+    def get_sedentary_by_age(db: Session, age_bands: str = DEFAULT_AGE_BANDS) -> List[Dict[str, Any]]:
+        """Get average sedentary hours of the latest evaluation by age band (one grouped query)"""
+        bands = PhysicalActivityDashboardService.parse_age_bands(age_bands)
+        stats = {row["age_range"]: row for row in get_latest_sedentary_by_age_bands(db, bands)}
+        
+        results = []
+        for label, _, _ in bands:
+            row = stats.get(label, {})
+            average = row.get("average_sedentary_hours")
             results.append({
-                "age_range": age_range,
-                "average_sedentary_hours": round(avg_sedentary, 1),
-                "patient_count": len(patients),
-                "evaluated_count": evaluation_count
+                "age_range": label,
+                "average_sedentary_hours": round(average, 1) if average is not None else 0,
+                "patient_count": row.get("patient_count", 0),
+                "evaluated_count": row.get("evaluated_count", 0)
             })
         
         return results
     
     @staticmethod
-    def get_sedentary_trend(db: Session, months: int = 12) -> Dict[str, List[Dict[str, Any]]]:
-        """Get sedentary trend over time for diabetics and hypertensives"""
-        # Get patients with diabetes and hypertension
-        diabetic_patients = get_patients_with_conditions(db, ["diabetes", "diabético", "diabética"])
-        hypertensive_patients = get_patients_with_conditions(db, ["hipertensão", "hipertenso", "hipertensa", "pressão alta"])
-        
-        diabetic_ids = [p.id for p in diabetic_patients]
-        hypertensive_ids = [p.id for p in hypertensive_patients]
+    def get_sedentary_trend(
+        db: Session,
+        months: int = 12,
+        conditions: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the monthly sedentary trend per condition cohort of active patients, in one query.
         
-        # Calculate trends for each condition
-        start_date = date.today() - timedelta(days=months * 30)
+        Months are calendar months ("YYYY-MM"), from `months` months ago up to the current one.
         
-        # Get monthly averages for diabetics
-        diabetic_trend = []
-        if diabetic_ids:
-            diabetic_trend = db.query(
-                func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM').label('month'),
-                func.avg(PhysicalActivityEvaluation.sedentary_hours_per_day).label('avg_sedentary')
-            ).filter(
-                and_(
-                    PhysicalActivityEvaluation.patient_id.in_(diabetic_ids),
-                    PhysicalActivityEvaluation.data_avaliacao >= start_date
-                )
-            ).group_by(
-                func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM')
-            ).order_by('month').all()
+        Without `conditions` the cohorts are diabetics and hypertensives (keys
+        "diabetics" and "hypertensives"); otherwise one cohort per comorbidity
+        dictionary key, keyed by it.
+        """
+        cohorts = DEFAULT_TREND_COHORTS if not conditions else {condition: condition for condition in conditions}
         
-        # Get monthly averages for hypertensives using PostgreSQL-compatible date functions
-        hypertensive_trend = []
-        if hypertensive_ids:
-            hypertensive_trend = db.query(
-                func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM').label('month'),
-                func.avg(PhysicalActivityEvaluation.sedentary_hours_per_day).label('avg_sedentary')
-            ).filter(
-                and_(
-                    PhysicalActivityEvaluation.patient_id.in_(hypertensive_ids),
-                    PhysicalActivityEvaluation.data_avaliacao >= start_date
-                )
-            ).group_by(
-                func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM')
-            ).order_by('month').all()
+        unknown = [condition for condition in cohorts if condition not in COMORBIDITIES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Condições desconhecidas: {', '.join(unknown)}. Consulte GET /comorbidities"
+            )
         
-        # Process results safely
-        diabetic_results = []
-        for result in diabetic_trend:
-            try:
-                avg_value = result.avg_sedentary if result.avg_sedentary is not None else 0
-                diabetic_results.append({
-                    "month": result.month,
-                    "average_sedentary_hours": round(float(avg_value), 1)
-                })
-            except (ValueError, TypeError, AttributeError):
-                # Skip invalid results
-                continue
+        start_month = shift_months(date.today(), months)
         
-        hypertensive_results = []
-        for result in hypertensive_trend:
-            try:
-                avg_value = result.avg_sedentary if result.avg_sedentary is not None else 0
-                hypertensive_results.append({
-                    "month": result.month,
-                    "average_sedentary_hours": round(float(avg_value), 1)
-                })
-            except (ValueError, TypeError, AttributeError):
-                # Skip invalid results
-                continue
+        trend = {name: [] for name in cohorts.values()}
+        for row in get_monthly_sedentary_by_condition(db, list(cohorts), start_month):
+            trend[cohorts[row["condition"]]].append({
+                "month": row["month"].strftime("%Y-%m"),
+                "average_sedentary_hours": round(float(row["avg_sedentary"]), 1)
+            })
         
-        return {
-            "diabetics": diabetic_results,
-            "hypertensives": hypertensive_results
-        }
+        return trend
     
     @staticmethod
     def get_who_compliance(db: Session) -> Dict[str, Any]:
@@ -227,58 +208,52 @@ class PhysicalActivityDashboardService:
         }
     
     @staticmethod
-    def get_all_patients_summary(db: Session) -> List[Dict[str, Any]]:
-        """Get summary of all patients with their latest evaluation"""
-        # Get all active patients
-        patients = db.query(PhysicalActivityPatient).filter(
-            PhysicalActivityPatient.ativo == True
-        ).all()
+    def get_all_patients_summary(
+        db: Session,
+        sort_by: str = "last_evaluation_date",
+        order: str = "desc",
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of active patients with their latest evaluation, sorted in the database, and the next cursor"""
+        errors = {}
         
-        patients_summary = []
+        if sort_by not in SUMMARY_SORTS:
+            errors["sort_by"] = f"Ordenação '{sort_by}' não é válida. Use: {', '.join(SUMMARY_SORTS)}"
         
-        for patient in patients:
-            # Get latest evaluation
-            latest_eval = get_latest_evaluation_by_patient(db, patient.id)
-            
-            patient_data = {
-                "id": patient.id,
-                "nome_completo": patient.nome_completo,
-                "cpf": patient.cpf,
-                "idade": patient.idade,
-                "bairro": patient.bairro,
-                "health_unit": patient.health_unit.nome if patient.health_unit else None,
-                "data_cadastro": patient.data_cadastro,
-                "has_evaluation": latest_eval is not None
-            }
-            
-            if latest_eval:
-                patient_data.update({
-                    "last_evaluation_date": latest_eval.data_avaliacao,
-                    "sedentary_hours_per_day": latest_eval.sedentary_hours_per_day,
-                    "sedentary_risk_level": latest_eval.sedentary_risk_level,
-                    "who_compliance": latest_eval.who_compliance,
-                    "total_weekly_moderate_minutes": latest_eval.total_weekly_moderate_minutes,
-                    "total_weekly_vigorous_minutes": latest_eval.total_weekly_vigorous_minutes
-                })
-            else:
-                patient_data.update({
-                    "last_evaluation_date": None,
-                    "sedentary_hours_per_day": None,
-                    "sedentary_risk_level": None,
-                    "who_compliance": None,
-                    "total_weekly_moderate_minutes": None,
-                    "total_weekly_vigorous_minutes": None
-                })
-            
-            patients_summary.append(patient_data)
+        if order not in ("asc", "desc"):
+            errors["order"] = f"Ordem '{order}' não é válida. Use: asc, desc"
         
-        # Sort by last evaluation date (most recent first), then by registration date
-        patients_summary.sort(
-            key=lambda x: (
-                x['last_evaluation_date'] or date.min,
-                x['data_cadastro']
-            ),
-            reverse=True
-        )
+        if errors:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
         
-        return patients_summary
\ No newline at end of file
+        try:
+            rows, next_cursor = get_patients_summary_page(db, sort_by, order == "desc", cursor, limit)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"cursor": "Cursor inválido para esta ordenação"}
+            )
+        
+        return {
+            "patients": [
+                {
+                    "id": row.id,
+                    "nome_completo": row.nome_completo,
+                    "cpf": row.cpf,
+                    "idade": row.idade,
+                    "bairro": row.bairro,
+                    "health_unit": row.health_unit,
+                    "data_cadastro": row.data_cadastro,
+                    "has_evaluation": row.evaluation_id is not None,
+                    "last_evaluation_date": row.data_avaliacao,
+                    "sedentary_hours_per_day": row.sedentary_hours_per_day,
+                    "sedentary_risk_level": row.sedentary_risk_level,
+                    "who_compliance": row.who_compliance,
+                    "total_weekly_moderate_minutes": row.total_weekly_moderate_minutes,
+                    "total_weekly_vigorous_minutes": row.total_weekly_vigorous_minutes
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor
+        }
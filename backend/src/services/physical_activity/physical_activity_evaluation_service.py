@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc, func
 from typing import List, Optional
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from models.physical_activity.physical_activity_evaluation import PhysicalActivityEvaluation
+from db.physical_activity import physical_activity_evaluation_crud
 from utils.physical_activity_calculator import calculate_evaluation_metrics
 
 
@@ -29,11 +30,7 @@ class PhysicalActivityEvaluationService:
         evaluation_data['who_compliance'] = who_compliance
         evaluation_data['sedentary_risk_level'] = sedentary_risk
         
-        db_evaluation = PhysicalActivityEvaluation(**evaluation_data)
-        db.add(db_evaluation)
-        db.commit()
-        db.refresh(db_evaluation)
-        return db_evaluation
+        return physical_activity_evaluation_crud.create_physical_activity_evaluation(db, evaluation_data)
     
     @staticmethod
     def get_evaluation(db: Session, evaluation_id: int) -> Optional[PhysicalActivityEvaluation]:
@@ -55,9 +52,7 @@ class PhysicalActivityEvaluationService:
     @staticmethod
     def get_latest_evaluation_by_patient(db: Session, patient_id: int) -> Optional[PhysicalActivityEvaluation]:
         """Get the most recent evaluation for a patient"""
-        return db.query(PhysicalActivityEvaluation).filter(
-            PhysicalActivityEvaluation.patient_id == patient_id
-        ).order_by(desc(PhysicalActivityEvaluation.data_avaliacao)).first()
+        return physical_activity_evaluation_crud.get_latest_evaluation_by_patient(db, patient_id)
     
     @staticmethod
     def update_evaluation(
@@ -81,45 +76,33 @@ class PhysicalActivityEvaluationService:
             'sedentary_hours_per_day'
         ])
         
-        # Update fields
-        for key, value in evaluation_data.items():
-            if value is not None:
-                setattr(db_evaluation, key, value)
-        
         # Recalculate metrics if activity fields were updated
         if activity_fields_updated:
+            def current(field):
+                value = evaluation_data.get(field)
+                return getattr(db_evaluation, field) if value is None else value
+            
             total_moderate, total_vigorous, who_compliance, sedentary_risk = calculate_evaluation_metrics(
-                light_minutes_per_day=db_evaluation.light_activity_minutes_per_day,
-                light_days_per_week=db_evaluation.light_activity_days_per_week,
-                moderate_minutes_per_day=db_evaluation.moderate_activity_minutes_per_day,
-                moderate_days_per_week=db_evaluation.moderate_activity_days_per_week,
-                vigorous_minutes_per_day=db_evaluation.vigorous_activity_minutes_per_day,
-                vigorous_days_per_week=db_evaluation.vigorous_activity_days_per_week,
-                sedentary_hours_per_day=db_evaluation.sedentary_hours_per_day
+                light_minutes_per_day=current('light_activity_minutes_per_day'),
+                light_days_per_week=current('light_activity_days_per_week'),
+                moderate_minutes_per_day=current('moderate_activity_minutes_per_day'),
+                moderate_days_per_week=current('moderate_activity_days_per_week'),
+                vigorous_minutes_per_day=current('vigorous_activity_minutes_per_day'),
+                vigorous_days_per_week=current('vigorous_activity_days_per_week'),
+                sedentary_hours_per_day=current('sedentary_hours_per_day')
             )
             
-            db_evaluation.total_weekly_moderate_minutes = total_moderate
-            db_evaluation.total_weekly_vigorous_minutes = total_vigorous
-            db_evaluation.who_compliance = who_compliance
-            db_evaluation.sedentary_risk_level = sedentary_risk
+            evaluation_data['total_weekly_moderate_minutes'] = total_moderate
+            evaluation_data['total_weekly_vigorous_minutes'] = total_vigorous
+            evaluation_data['who_compliance'] = who_compliance
+            evaluation_data['sedentary_risk_level'] = sedentary_risk
         
-        db.commit()
-        db.refresh(db_evaluation)
-        return db_evaluation
+        return physical_activity_evaluation_crud.update_physical_activity_evaluation(db, evaluation_id, evaluation_data)
     
     @staticmethod
     def delete_evaluation(db: Session, evaluation_id: int) -> bool:
         """Delete a Physical Activity evaluation"""
-        db_evaluation = db.query(PhysicalActivityEvaluation).filter(
-            PhysicalActivityEvaluation.id == evaluation_id
-        ).first()
-        
-        if not db_evaluation:
-            return False
-        
-        db.delete(db_evaluation)
-        db.commit()
-        return True
+        return physical_activity_evaluation_crud.delete_physical_activity_evaluation(db, evaluation_id)
     
     @staticmethod
     def get_evaluations_by_date_range(
@@ -165,22 +148,6 @@ class PhysicalActivityEvaluationService:
             PhysicalActivityEvaluation.patient_id == patient_id
         ).count()
     
-    @staticmethod
-    def get_monthly_evaluation_counts(db: Session, months: int = 12) -> List[dict]:
-        """Get evaluation counts by month for the last N months"""
-        start_date = date.today() - timedelta(days=months * 30)
-        
-        results = db.query(
-            func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM').label('month'),
-            func.count(PhysicalActivityEvaluation.id).label('count')
-        ).filter(
-            PhysicalActivityEvaluation.data_avaliacao >= start_date
-        ).group_by(
-            func.to_char(PhysicalActivityEvaluation.data_avaliacao, 'YYYY-MM')
-        ).order_by('month').all()
-        
-        return [{'month': result.month, 'count': result.count} for result in results]
-    
     @staticmethod
     def get_activity_distribution_stats(db: Session) -> dict:
         """Get distribution statistics for activity levels"""
@@ -0,0 +1,150 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+# In-process tests run against throwaway SQLite files: one primary and one "replica"
+_TMP_DIR = tempfile.mkdtemp(prefix="dataaging-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR}/primary.db")
+os.environ.setdefault("DATABASE_READ_URL", f"sqlite:///{_TMP_DIR}/replica.db")
+
+
+@pytest.fixture
+def db():
+    """Fresh schema on the primary (and replica) with a primary session"""
+    from db.base import Base, engine, read_engine, SessionLocal
+    import models  # noqa: F401 - register models
+
+    for bind in {engine, read_engine}:
+        Base.metadata.drop_all(bind=bind)
+        Base.metadata.create_all(bind=bind)
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """TestClient for a fresh app, authenticated and reading from the primary"""
+    from fastapi.testclient import TestClient
+    from api.auth.auth import get_current_user, get_current_user_async
+    from config import settings
+    from api.dependencies import READ_PRIMARY_HEADER
+    from main import create_app
+    from models.user.user import ProfileType, User
+
+    # The db fixture already built the schema
+    monkeypatch.setattr(settings, "RUN_MIGRATIONS_ON_STARTUP", False)
+
+    user = User(id=1, nome_completo="Usuário de Teste", cpf="11144477735", profile_type=ProfileType.GESTOR)
+    app = create_app()
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_current_user_async] = lambda: user
+
+    with TestClient(app, headers={READ_PRIMARY_HEADER: "1"}) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """Strict mode: requests running more than `max_queries` queries raise QueryBudgetExceeded"""
+    from config import settings
+
+    def set_budget(max_queries: int):
+        monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", max_queries)
+
+    return set_budget
+
+
+@pytest.fixture
+def seed_health_units(db):
+    """Insert health units named "Unidade <id>" from {id: (regiao, bairro)} (default: unit 1 in Centro)"""
+    from sqlalchemy import insert
+    from models import HealthUnit
+
+    def seed(units=None):
+        db.execute(insert(HealthUnit), [
+            {"id": unit_id, "nome": f"Unidade {unit_id}", "bairro": bairro, "regiao": regiao, "ativo": True}
+            for unit_id, (regiao, bairro) in (units or {1: ("Matriz", "Centro")}).items()
+        ])
+
+    return seed
+
+
+@pytest.fixture
+def patients(db):
+    """
+    Insert `model` patients "Paciente <id>" with CPF <id>, aged 70, active, in unit 1 (Centro), registered today.
+
+    Keyword arguments override columns; a callable is called with the patient id.
+    """
+    from datetime import date
+    from sqlalchemy import insert
+
+    def insert_patients(model, ids, **overrides):
+        db.execute(insert(model), [
+            {
+                "id": i, "nome_completo": f"Paciente {i}", "cpf": f"{i:011d}", "idade": 70, "bairro": "Centro",
+                "unidade_saude_id": 1, "data_cadastro": date.today(), "ativo": True,
+                **{column: value(i) if callable(value) else value for column, value in overrides.items()}
+            }
+            for i in ids
+        ])
+
+    return insert_patients
+
+
+@pytest.fixture
+def ivcf_evaluation():
+    """Builder of random IVCF evaluation rows; keyword arguments override columns"""
+    def build(rng, patient_id, day, **fields):
+        total = rng.randint(0, 30)
+        return {
+            "patient_id": patient_id, "data_avaliacao": day, "pontuacao_total": total,
+            "classificacao": "Robusto" if total <= 6 else "Em Risco" if total <= 14 else "Frágil",
+            "dominio_idade": 1, "dominio_comorbidades": 1, "dominio_comunicacao": 1, "dominio_mobilidade": 1,
+            "dominio_humor": 1, "dominio_cognicao": 1, "dominio_avd": 1, "dominio_autopercepcao": 1,
+            **fields
+        }
+
+    return build
+
+
+@pytest.fixture
+def factf_evaluation():
+    """Builder of random FACT-F evaluation rows with the total drawn from `total_range`"""
+    def build(rng, patient_id, day, total_range=(40, 136), **fields):
+        fatigue = float(rng.randint(0, 52))
+        return {
+            "patient_id": patient_id, "data_avaliacao": day, "pontuacao_total": float(rng.randint(*total_range)),
+            "pontuacao_fadiga": fatigue, "subescala_fadiga": fatigue,
+            "classificacao_fadiga": "Fadiga Grave" if fatigue <= 30 else "Fadiga Leve" if fatigue <= 43 else "Sem Fadiga",
+            "bem_estar_fisico": 20.0, "bem_estar_social": 20.0, "bem_estar_emocional": 20.0, "bem_estar_funcional": 20.0,
+            **fields
+        }
+
+    return build
+
+
+@pytest.fixture
+def physical_activity_evaluation():
+    """Builder of random physical activity evaluation rows with sedentary hours drawn from `hours`"""
+    def build(rng, patient_id, day, hours=(2.5, 6.5, 9.0, 11.5), **fields):
+        sedentary = rng.choice(hours)
+        return {
+            "patient_id": patient_id, "data_avaliacao": day, "sedentary_hours_per_day": sedentary,
+            "sedentary_risk_level": (
+                "Crítico" if sedentary > 10 else "Alto" if sedentary > 8 else "Moderado" if sedentary > 6 else "Baixo"
+            ),
+            **fields
+        }
+
+    return build
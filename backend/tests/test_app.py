@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from init_data import TEST_USER_CPF, seed_test_user
+from models.user.user import User
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_import_has_no_database_side_effects(tmp_path):
+    database = tmp_path / "untouched.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}", "DATABASE_READ_URL": f"sqlite:///{database}"}
+
+    subprocess.run(
+        [sys.executable, "-c", "import main; assert main.create_app() is not main.app"],
+        cwd=SRC_DIR, env=env, check=True
+    )
+
+    assert not database.exists()
+
+
+def test_seed_test_user_is_idempotent(db):
+    assert seed_test_user() is True
+    assert seed_test_user() is False
+
+    assert db.query(User).filter(User.cpf == TEST_USER_CPF).count() == 1
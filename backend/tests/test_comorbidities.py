@@ -0,0 +1,164 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from db import comorbidity_crud
+from db.comorbidities import COMORBIDITY_LINKS, match_comorbidities, rebuild_patient_comorbidities
+from db.dashboard_cube_crud import CUBE_INSTRUMENTS
+from db.factf import factf_patient_crud
+from db.ivcf import ivcf_evaluation_crud
+from models import Comorbidity, FACTFEvaluation, FACTFPatient, IVCFPatient
+
+TEXTS = [
+    "Hipertensão arterial, DIABETES mellitus tipo 2", "diabético; artrite reumatoide", "Artrose de joelho",
+    "pressão alta", "Nenhuma", None, "HAS, DM2, depressão", "Admissão recente", "hipertensa e obesa",
+]
+
+
+@pytest.fixture
+def factf_data(db, seed_health_units, patients, factf_evaluation):
+    rng = random.Random(19)
+    today = date.today()
+    seed_health_units()
+    patients(
+        FACTFPatient, range(1, 81), idade=lambda i: rng.randint(60, 95), ativo=lambda i: i % 9 != 0,
+        comorbidades=lambda i: rng.choice(TEXTS)
+    )
+    db.execute(insert(FACTFEvaluation), [
+        factf_evaluation(rng, rng.randint(1, 80), today - timedelta(days=rng.randint(0, 300))) for _ in range(400)
+    ])
+    rebuild_patient_comorbidities(db)
+    db.commit()
+    return db
+
+
+def _links(db, instrument):
+    link = COMORBIDITY_LINKS[instrument].link
+    return set(db.execute(
+        select(link.patient_id, Comorbidity.chave).join(Comorbidity, link.comorbidity_id == Comorbidity.id)
+    ).all())
+
+
+def _reference(db, conditions, period_from=None):
+    """Breakdown computed in Python from the raw text"""
+    measures = CUBE_INSTRUMENTS["factf"]
+    reference = {}
+    for evaluation, patient in db.query(FACTFEvaluation, FACTFPatient).join(
+        FACTFPatient, FACTFEvaluation.patient_id == FACTFPatient.id
+    ):
+        if not patient.ativo or (period_from and evaluation.data_avaliacao < period_from):
+            continue
+        for condition in match_comorbidities(patient.comorbidades) & set(conditions):
+            row = reference.setdefault(condition, {"patients": set(), "evaluations": []})
+            row["patients"].add(patient.id)
+            row["evaluations"].append(evaluation)
+    return {
+        condition: {
+            "patient_count": len(row["patients"]),
+            "evaluation_count": len(row["evaluations"]),
+            "classifications": {
+                key: sum(e.classificacao_fadiga == value for e in row["evaluations"])
+                for key, value in measures.classes.items()
+            },
+            "averages": {
+                column: round(sum(getattr(e, column) for e in row["evaluations"]) / len(row["evaluations"]), 2)
+                for column in measures.averages
+            },
+        }
+        for condition, row in reference.items()
+    }
+
+
+def _patients(db, conditions, period_from=None):
+    """Active patients with any of `conditions` and an evaluation in the period"""
+    return {
+        patient.id
+        for evaluation, patient in db.query(FACTFEvaluation, FACTFPatient).join(
+            FACTFPatient, FACTFEvaluation.patient_id == FACTFPatient.id
+        )
+        if patient.ativo and not (period_from and evaluation.data_avaliacao < period_from)
+        and match_comorbidities(patient.comorbidades) & set(conditions)
+    }
+
+
+def test_matching_ignores_case_accents_and_partial_words():
+    assert match_comorbidities("Hipertensão Arterial; DIABÉTICO tipo 2") == {"hipertensao", "diabetes"}
+    assert match_comorbidities("Admissão", "hashimoto") == set()
+    assert match_comorbidities(None, "HAS", "DM2 - artrose") == {"hipertensao", "diabetes", "artrose"}
+
+
+def test_crud_writes_keep_links_equal_to_a_rebuild(db, seed_health_units, patients, ivcf_evaluation):
+    rng = random.Random(19)
+    today = date.today()
+    seed_health_units()
+    db.commit()
+    patient = factf_patient_crud.create_factf_patient(db, {
+        "nome_completo": "Paciente", "cpf": "00000000001", "idade": 70, "bairro": "Centro",
+        "unidade_saude_id": 1, "data_cadastro": today, "comorbidades": "Diabetes"
+    })
+    factf_patient_crud.update_factf_patient(db, patient.id, {"comorbidades": "Hipertensão, artrite"})
+    patients(IVCFPatient, [1])
+    db.commit()
+    ivcf_evaluation_crud.create_ivcf_evaluation(db, ivcf_evaluation(rng, 1, today, comorbidades="DPOC"))
+    second = ivcf_evaluation_crud.create_ivcf_evaluation(db, ivcf_evaluation(rng, 1, today, comorbidades="Glaucoma"))
+    ivcf_evaluation_crud.update_ivcf_evaluation(db, second.id, {"comorbidades": "catarata"})
+
+    written = {instrument: _links(db, instrument) for instrument in ("ivcf", "factf")}
+    rebuild_patient_comorbidities(db)
+    db.commit()
+
+    assert written == {instrument: _links(db, instrument) for instrument in ("ivcf", "factf")}
+    assert written["factf"] == {(patient.id, "hipertensao"), (patient.id, "artrite")}
+    assert written["ivcf"] == {(1, "dpoc"), (1, "catarata")}
+
+
+def test_breakdown_matches_the_text_scan(factf_data):
+    conditions = ["diabetes", "hipertensao", "artrite", "artrose", "obesidade", "depressao"]
+    period_from = date.today() - timedelta(days=150)
+
+    for since in (None, period_from):
+        rows, total_patients = comorbidity_crud.get_condition_breakdown(factf_data, "factf", conditions, period_from=since)
+
+        assert {
+            row["condition"]: {key: row[key] for key in ("patient_count", "evaluation_count", "classifications", "averages")}
+            for row in rows
+        } == _reference(factf_data, conditions, since)
+        assert [row["evaluation_count"] for row in rows] == sorted((row["evaluation_count"] for row in rows), reverse=True)
+        assert total_patients == len(_patients(factf_data, conditions, since))
+
+
+def test_breakdown_endpoint_runs_one_query(factf_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/comorbidities/factf/breakdown", params={"conditions": ["diabetes", "hipertensao"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert {row["condition"] for row in body["conditions"]} == {"diabetes", "hipertensao"}
+    for row in body["conditions"]:
+        assert sum(row["classification_percentages"].values()) == pytest.approx(100, abs=0.2)
+    assert body["filters_applied"]["total_patients"] == len(_patients(factf_data, ["diabetes", "hipertensao"]))
+
+
+def test_fatigue_distribution_uses_the_links(factf_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/factf-dashboard/fatigue-distribution")
+
+    assert response.status_code == 200
+    reference = _reference(factf_data, ["diabetes", "hipertensao", "artrite"])
+    assert [row["condition"] for row in response.json()["distribution"]] == [
+        name for key, name in (("diabetes", "Diabetes"), ("hipertensao", "Hipertensão"), ("artrite", "Artrite"))
+        if key in reference
+    ]
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/v1/comorbidities/katz/breakdown", {}),
+    ("/api/v1/comorbidities/factf/breakdown", {"conditions": ["gripe"]}),
+    ("/api/v1/comorbidities/factf/breakdown", {"age_range": "50-60"}),
+])
+def test_breakdown_rejects_invalid_filters(client, path, params):
+    assert client.get(path, params=params).status_code == 422
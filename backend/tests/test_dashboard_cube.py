@@ -0,0 +1,146 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db import dashboard_cube_crud
+from db.dashboard_cube_crud import CUBE_INSTRUMENTS
+from services.dashboard_cube_service import CUBE_CACHE
+
+# (regiao, bairro) of health units 1-7; units 1 and 2 share a bairro, unit 7 has no evaluations
+UNITS = {
+    1: ("Matriz", "Centro"), 2: ("Matriz", "Centro"), 3: ("Matriz", "Batel"),
+    4: ("Boqueirão", "Hauer"), 5: ("Boqueirão", "Xaxim"), 6: ("Portão", "Fazendinha"), 7: ("Portão", "Capão Raso"),
+}
+
+
+@pytest.fixture
+def cube_data(db, seed_health_units, patients, ivcf_evaluation, factf_evaluation, physical_activity_evaluation):
+    CUBE_CACHE.clear()
+    rng = random.Random(17)
+    today = date.today()
+    seed_health_units(UNITS)
+    builders = {"ivcf": ivcf_evaluation, "factf": factf_evaluation, "physical_activity": physical_activity_evaluation}
+    for instrument, measures in CUBE_INSTRUMENTS.items():
+        patients(
+            measures.patient, range(1, 61), idade=lambda i: rng.randint(60, 95),
+            unidade_saude_id=lambda i: i % 6 + 1, ativo=lambda i: i % 11 != 0
+        )
+        db.execute(insert(measures.evaluation), [
+            builders[instrument](rng, rng.randint(1, 60), today - timedelta(days=rng.randint(0, 400)))
+            for _ in range(rng.randint(150, 250))
+        ])
+    db.commit()
+    yield db
+    CUBE_CACHE.clear()
+
+
+def _reference(db, period_from=None, age_range=None):
+    """Cube computed in Python from the raw evaluations, keyed by (level, regiao, bairro, unit id)"""
+    ages = {"60-70": range(60, 71), "71-80": range(71, 81), "81+": range(81, 200), None: range(0, 200)}[age_range]
+    groups = defaultdict(lambda: defaultdict(list))
+    for instrument, measures in CUBE_INSTRUMENTS.items():
+        for evaluation, patient in db.query(measures.evaluation, measures.patient).join(
+            measures.patient, measures.evaluation.patient_id == measures.patient.id
+        ):
+            if not patient.ativo or patient.idade not in ages:
+                continue
+            if period_from and evaluation.data_avaliacao < period_from:
+                continue
+            regiao, bairro = UNITS[patient.unidade_saude_id]
+            for key in (
+                ("city", None, None, None), ("region", regiao, None, None),
+                ("bairro", regiao, bairro, None), ("health_unit", regiao, bairro, patient.unidade_saude_id),
+            ):
+                groups[key][instrument].append((evaluation, patient.id))
+
+    cube = {}
+    for key, by_instrument in groups.items():
+        cube[key] = {}
+        for instrument, measures in CUBE_INSTRUMENTS.items():
+            evaluations = [evaluation for evaluation, _ in by_instrument[instrument]]
+            cube[key][instrument] = {
+                "evaluation_count": len(evaluations),
+                "patient_count": len({patient_id for _, patient_id in by_instrument[instrument]}),
+                "averages": {
+                    column: round(sum(getattr(e, column) for e in evaluations) / len(evaluations), 2) if evaluations else None
+                    for column in measures.averages
+                },
+                "classifications": {
+                    name: sum(getattr(e, measures.classification) == value for e in evaluations)
+                    for name, value in measures.classes.items()
+                },
+            }
+    return cube
+
+
+def _by_key(nodes):
+    return {
+        (node["level"], node["regiao"], node["bairro"], node["unidade_saude_id"]):
+            {instrument: node[instrument] for instrument in CUBE_INSTRUMENTS}
+        for node in nodes
+    }
+
+
+def test_cube_matches_every_level_of_the_hierarchy(cube_data):
+    nodes, _ = dashboard_cube_crud.get_dashboard_cube(cube_data)
+
+    assert _by_key(nodes) == _reference(cube_data)
+    assert [node["level"] for node in nodes] == sorted(
+        (node["level"] for node in nodes), key=dashboard_cube_crud.CUBE_LEVELS.index
+    )
+    assert {node["unidade_saude"] for node in nodes if node["level"] == "health_unit"} == {
+        f"Unidade {unit_id}" for unit_id in range(1, 7)
+    }
+
+
+def test_cube_applies_filters(cube_data):
+    period_from = date.today() - timedelta(days=120)
+
+    nodes, people_count = dashboard_cube_crud.get_dashboard_cube(cube_data, period_from=period_from, age_range="71-80")
+
+    assert _by_key(nodes) == _reference(cube_data, period_from, "71-80")
+    assert people_count == len({
+        patient.cpf
+        for measures in CUBE_INSTRUMENTS.values()
+        for evaluation, patient in cube_data.query(measures.evaluation, measures.patient).join(
+            measures.patient, measures.evaluation.patient_id == measures.patient.id
+        )
+        if patient.ativo and 71 <= patient.idade <= 80 and evaluation.data_avaliacao >= period_from
+    })
+
+
+def test_cube_endpoint_runs_one_query_and_caches_per_filter_set(cube_data, client, query_budget):
+    query_budget(1)
+    params = {"region": "Boqueirão"}
+
+    response = client.get("/api/v1/dashboard-cube", params=params)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert {node["regiao"] for node in body["nodes"]} == {None, "Boqueirão"}
+    city = body["nodes"][0]
+    assert city["level"] == "city"
+    # The same people (CPFs) are registered in several instruments: each counts once
+    people = {
+        patient.cpf
+        for measures in CUBE_INSTRUMENTS.values()
+        for patient in cube_data.query(measures.patient).join(
+            measures.evaluation, measures.evaluation.patient_id == measures.patient.id
+        )
+        if patient.ativo and UNITS[patient.unidade_saude_id][0] == "Boqueirão"
+    }
+    assert body["filters_applied"]["total_patients"] == len(people)
+    assert len(people) < sum(city[instrument]["patient_count"] for instrument in CUBE_INSTRUMENTS)
+
+    # Drill-down with the same filters never reaches the database
+    query_budget(0)
+    assert client.get("/api/v1/dashboard-cube", params=params).json() == body
+
+
+def test_cube_rejects_invalid_filters(client):
+    response = client.get("/api/v1/dashboard-cube", params={"age_range": "50-60"})
+
+    assert response.status_code == 422
@@ -0,0 +1,165 @@
+import asyncio
+import csv
+import io
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.base import AsyncSessionLocal
+from db.latest_evaluations import rebuild_latest_evaluations
+from models import (
+    FACTFEvaluation, FACTFPatient, HealthUnit, IVCFEvaluation, IVCFPatient,
+    PhysicalActivityEvaluation, PhysicalActivityPatient
+)
+from services import export_service
+
+REGIONS = ["Matriz", "Boqueirão", "Portão"]
+
+
+@pytest.fixture
+def export_data(db, seed_health_units, patients, ivcf_evaluation, factf_evaluation, physical_activity_evaluation):
+    """
+    Three instruments sharing part of their CPFs: patient i of an instrument has
+    CPF i, IVCF has 1-40, FACT-F 21-60 and Physical Activity 31-70.
+    """
+    rng = random.Random(16)
+    today = date.today()
+    seed_health_units({i: (REGIONS[i % len(REGIONS)], f"Bairro {i}") for i in range(1, 7)})
+
+    def build_ivcf(*args):
+        row = ivcf_evaluation(*args)
+        return {**row, "comorbidades": "Hipertensão, \"Diabetes\"" if row["pontuacao_total"] % 2 else None}
+
+    def build_physical_activity(*args):
+        row = physical_activity_evaluation(*args)
+        return {**row, "who_compliance": row["sedentary_hours_per_day"] < 6}
+
+    for patient_model, evaluation_model, build, cpfs in (
+        (IVCFPatient, IVCFEvaluation, build_ivcf, range(1, 41)),
+        (FACTFPatient, FACTFEvaluation, factf_evaluation, range(21, 61)),
+        (PhysicalActivityPatient, PhysicalActivityEvaluation, build_physical_activity, range(31, 71)),
+    ):
+        patients(
+            patient_model, cpfs, idade=lambda i: 55 + i % 35, unidade_saude_id=lambda i: i % 6 + 1,
+            ativo=lambda i: i % 13 != 0
+        )
+        db.execute(insert(evaluation_model), [
+            build(rng, rng.choice(cpfs[:-5]), today - timedelta(days=rng.randint(0, 400)))
+            for _ in range(250)
+        ])
+    rebuild_latest_evaluations(db)
+    db.commit()
+    return db
+
+
+def _in_age_range(age, age_range):
+    return {"60-70": 60 <= age <= 70, "71-80": 71 <= age <= 80, "81+": age >= 81}[age_range]
+
+
+def test_csv_export_applies_dashboard_filters(export_data, client):
+    params = {
+        "period_from": (date.today() - timedelta(days=200)).isoformat(),
+        "region": "Boqueirão", "age_range": "60-70", "classification": "Frágil"
+    }
+
+    response = client.get("/api/v1/exports/ivcf", params=params)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="ivcf_avaliacoes.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    expected = [
+        (evaluation, patient)
+        for evaluation, patient, unit in export_data.query(IVCFEvaluation, IVCFPatient, HealthUnit)
+        .join(IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id)
+        .join(HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id)
+        .order_by(IVCFEvaluation.id)
+        if patient.ativo and unit.regiao == "Boqueirão" and _in_age_range(patient.idade, "60-70")
+        and evaluation.classificacao == "Frágil" and evaluation.data_avaliacao >= date.fromisoformat(params["period_from"])
+    ]
+    assert expected
+    assert [int(row["avaliacao_id"]) for row in rows] == [evaluation.id for evaluation, _ in expected]
+    assert [row["comorbidades"] for row in rows] == [evaluation.comorbidades or "" for evaluation, _ in expected]
+    assert rows[0]["cpf"] == expected[0][1].cpf
+    assert rows[0]["data_avaliacao"] == expected[0][0].data_avaliacao.isoformat()
+
+
+def test_ndjson_export_matches_evaluations(export_data, client):
+    response = client.get("/api/v1/exports/physical-activity", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    active = [
+        evaluation for evaluation, patient in export_data.query(PhysicalActivityEvaluation, PhysicalActivityPatient)
+        .join(PhysicalActivityPatient, PhysicalActivityEvaluation.patient_id == PhysicalActivityPatient.id)
+        .order_by(PhysicalActivityEvaluation.id)
+        if patient.ativo
+    ]
+    assert [row["avaliacao_id"] for row in rows] == [evaluation.id for evaluation in active]
+    assert [row["who_compliance"] for row in rows] == [evaluation.who_compliance for evaluation in active]
+
+
+def test_export_is_streamed_one_batch_at_a_time(export_data, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 40)
+    statement = export_service.ExportService.get_evaluations_export("factf")
+
+    async def collect():
+        async with AsyncSessionLocal() as session:
+            return [chunk async for chunk in export_service.ExportService.stream_export(session, statement, "csv")]
+
+    chunks = asyncio.run(collect())
+
+    rows = export_data.execute(statement).all()
+    assert len(chunks) == 1 + -(-len(rows) // 40)
+    assert all(len(chunk.splitlines()) <= 40 for chunk in chunks)
+    assert list(csv.reader(io.StringIO("".join(chunks))))[1:] == [
+        [str(value) for value in row] for row in rows
+    ]
+
+
+def test_patients_export_joins_latest_evaluation_of_each_instrument(export_data, client):
+    response = client.get("/api/v1/exports/patients", params={"format": "ndjson", "age_range": "71-80"})
+
+    assert response.status_code == 200
+    rows = {row["cpf"]: row for row in map(json.loads, response.text.splitlines())}
+
+    def latest(patient_model, evaluation_model):
+        by_cpf = {}
+        for patient in export_data.query(patient_model).filter(patient_model.ativo == True):
+            evaluations = export_data.query(evaluation_model).filter(evaluation_model.patient_id == patient.id).all()
+            by_cpf[patient.cpf] = (patient, max(evaluations, key=lambda e: (e.data_avaliacao, e.id), default=None))
+        return by_cpf
+
+    ivcf = latest(IVCFPatient, IVCFEvaluation)
+    factf = latest(FACTFPatient, FACTFEvaluation)
+    activity = latest(PhysicalActivityPatient, PhysicalActivityEvaluation)
+    people = {
+        cpf: (ivcf.get(cpf) or factf.get(cpf) or activity.get(cpf))[0]
+        for cpf in set(ivcf) | set(factf) | set(activity)
+    }
+    assert sorted(rows) == sorted(cpf for cpf, patient in people.items() if _in_age_range(patient.idade, "71-80"))
+
+    for cpf, row in rows.items():
+        evaluation = (ivcf.get(cpf) or (None, None))[1]
+        assert row["ivcf_classificacao"] == (evaluation.classificacao if evaluation else None)
+        evaluation = (factf.get(cpf) or (None, None))[1]
+        assert row["factf_data_avaliacao"] == (evaluation.data_avaliacao.isoformat() if evaluation else None)
+        evaluation = (activity.get(cpf) or (None, None))[1]
+        assert row["atividade_fisica_sedentary_risk_level"] == (evaluation.sedentary_risk_level if evaluation else None)
+
+
+@pytest.mark.parametrize("path, params, field", [
+    ("/api/v1/exports/katz", {}, "instrument"),
+    ("/api/v1/exports/factf", {"classification": "Frágil"}, "classification"),
+    ("/api/v1/exports/ivcf", {"region": "Atlântida"}, "region"),
+    ("/api/v1/exports/patients", {"age_range": "50-60"}, "age_range"),
+])
+def test_invalid_export_filters_are_rejected(client, path, params, field):
+    response = client.get(path, params=params)
+
+    assert response.status_code == 422
+    assert field in response.json()["detail"]
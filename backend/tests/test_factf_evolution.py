@@ -0,0 +1,72 @@
+import random
+import statistics
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.ivcf.ivcf_dashboard_crud import shift_months
+from models import FACTFEvaluation, FACTFPatient
+
+
+@pytest.fixture
+def evolution_data(db, seed_health_units, patients, factf_evaluation):
+    """Evaluations on the first and last day of months, a single-evaluation month and two empty months"""
+    rng = random.Random(20)
+    today = date.today()
+    seed_health_units()
+    patients(FACTFPatient, range(1, 41), ativo=lambda i: i % 8 != 0)
+    days = []
+    for offset in range(14):
+        first = shift_months(today, offset)
+        last = min(shift_months(today, offset - 1) - timedelta(days=1), today)
+        if offset in (3, 7):
+            continue
+        if offset == 5:
+            days.append(first)
+            continue
+        days += [first, last] + [first + timedelta(days=rng.randint(0, (last - first).days)) for _ in range(rng.randint(5, 40))]
+    db.execute(insert(FACTFEvaluation), [factf_evaluation(rng, rng.randint(1, 40), day) for day in days])
+    db.commit()
+    return db
+
+
+def _percentiles(values):
+    if len(values) == 1:
+        return {f"p{p}": round(values[0], 1) for p in (25, 50, 75)}
+    p25, p50, p75 = statistics.quantiles(values, n=4, method="inclusive")
+    return {"p25": round(p25, 1), "p50": round(p50, 1), "p75": round(p75, 1)}
+
+
+def test_evolution_has_every_calendar_month_with_sql_percentiles(evolution_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/factf-dashboard/monthly-evolution", params={"months_back": 12})
+
+    assert response.status_code == 200
+    months = defaultdict(list)
+    for evaluation, patient in evolution_data.query(FACTFEvaluation, FACTFPatient).join(
+        FACTFPatient, FACTFEvaluation.patient_id == FACTFPatient.id
+    ):
+        if patient.ativo:
+            months[evaluation.data_avaliacao.replace(day=1)].append(evaluation)
+
+    expected = []
+    for offset in range(12, -1, -1):
+        month = shift_months(date.today(), offset)
+        rows = months.get(month, [])
+        totals = [e.pontuacao_total for e in rows]
+        fatigue = [e.subescala_fadiga for e in rows]
+        expected.append({
+            "month": month.strftime("%b"),
+            "year": month.year,
+            "average_total_score": round(sum(totals) / len(rows), 1) if rows else None,
+            "average_fatigue_score": round(sum(fatigue) / len(rows), 1) if rows else None,
+            "evaluations_count": len(rows),
+            "total_score_percentiles": _percentiles(totals) if rows else {"p25": None, "p50": None, "p75": None},
+            "fatigue_score_percentiles": _percentiles(fatigue) if rows else {"p25": None, "p50": None, "p75": None},
+        })
+
+    assert response.json()["evolution"] == expected
+    assert [row["evaluations_count"] for row in expected if row["evaluations_count"] == 0] == [0, 0]
@@ -0,0 +1,116 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.latest_evaluations import rebuild_latest_evaluations
+from models import FACTFEvaluation, FACTFPatient
+
+
+@pytest.fixture
+def patients_data(db, seed_health_units, patients, factf_evaluation):
+    """More than 1000 patients (many sharing names and scores), some inactive or never evaluated"""
+    rng = random.Random(21)
+    today = date.today()
+    seed_health_units({1: ("Matriz", "Centro"), 2: ("Matriz", "Centro")})
+    patients(
+        FACTFPatient, range(1, 1101), nome_completo=lambda i: f"Paciente {rng.randint(1, 300)}",
+        idade=lambda i: rng.randint(60, 95), bairro=lambda i: rng.choice(["Centro", "Batel"]),
+        unidade_saude_id=lambda i: rng.choice([1, 2]), ativo=lambda i: i % 13 != 0
+    )
+    db.execute(insert(FACTFEvaluation), [
+        factf_evaluation(rng, rng.randint(1, 1000), today - timedelta(days=rng.randint(0, 60)), total_range=(40, 60))
+        for _ in range(2500)
+    ])
+    rebuild_latest_evaluations(db)
+    db.commit()
+    return db
+
+
+def _reference(db, sort_by, order, **filters):
+    by_id = {evaluation.id: evaluation for evaluation in db.query(FACTFEvaluation)}
+    rows = []
+    for patient in db.query(FACTFPatient).filter(FACTFPatient.ativo == True):
+        latest = by_id.get(patient.latest_evaluation_id)
+        if filters.get("classification") and (not latest or latest.classificacao_fadiga != filters["classification"]):
+            continue
+        if filters.get("bairro") and patient.bairro != filters["bairro"]:
+            continue
+        if filters.get("age_range") == "71-80" and not 71 <= patient.idade <= 80:
+            continue
+        rows.append({
+            "id": patient.id, "name": patient.nome_completo, "age": patient.idade,
+            "last_score": latest.pontuacao_total if latest else None,
+            "fatigue_score": latest.subescala_fadiga if latest else None,
+            "classification": latest.classificacao_fadiga if latest else None,
+            "evaluation_date": latest.data_avaliacao.isoformat() if latest else None,
+        })
+    present = [row for row in rows if row[sort_by] is not None]
+    missing = [row for row in rows if row[sort_by] is None]
+    reverse = order == "desc"
+    return (
+        sorted(present, key=lambda row: (row[sort_by], row["id"]), reverse=reverse)
+        + sorted(missing, key=lambda row: row["id"], reverse=reverse)
+    )
+
+
+def _all_pages(client, query_budget, params):
+    patients, cursor, pages = [], None, 0
+    while True:
+        query_budget(1)
+        response = client.get("/api/v1/factf-dashboard/all-patients", params={**params, "cursor": cursor})
+        assert response.status_code == 200
+        body = response.json()
+        patients += body["patients"]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return patients, body["total_count"], pages
+
+
+@pytest.mark.parametrize("sort_by, order", [
+    ("name", "asc"), ("age", "desc"), ("last_score", "asc"), ("fatigue_score", "desc"), ("evaluation_date", "desc"),
+])
+def test_pages_walk_every_patient_once_in_order(patients_data, client, query_budget, sort_by, order):
+    patients, total_count, pages = _all_pages(
+        client, query_budget, {"sort_by": sort_by, "order": order, "limit": 200}
+    )
+
+    expected = _reference(patients_data, sort_by, order)
+    assert patients == expected
+    assert total_count == len(expected) > 1000
+    assert pages == -(-len(expected) // 200)
+
+
+def test_filters_are_applied_in_the_query(patients_data, client, query_budget):
+    filters = {"classification": "Fadiga Leve", "bairro": "Batel", "age_range": "71-80"}
+
+    patients, total_count, _ = _all_pages(
+        client, query_budget, {"sort_by": "last_score", "order": "desc", "limit": 7, **filters}
+    )
+
+    expected = _reference(patients_data, "last_score", "desc", **filters)
+    assert patients == expected
+    assert total_count == len(expected)
+
+
+def test_cursor_past_the_last_page(patients_data, client):
+    first = client.get("/api/v1/factf-dashboard/all-patients", params={"search": "Paciente 7", "limit": 1}).json()
+    last = client.get(
+        "/api/v1/factf-dashboard/all-patients",
+        params={"search": "Paciente 7", "limit": first["total_count"] - 1, "cursor": first["next_cursor"]}
+    ).json()
+
+    assert last["next_cursor"] is None
+    assert len(last["patients"]) == first["total_count"] - 1
+
+
+@pytest.mark.parametrize("params", [
+    {"sort_by": "cpf"}, {"order": "up"}, {"classification": "Cansado"}, {"cursor": "not-a-cursor"},
+    {"sort_by": "age", "cursor": "WyJQYWNpZW50ZSAxIiwgMV0"},
+])
+def test_invalid_parameters_are_rejected(client, params):
+    response = client.get("/api/v1/factf-dashboard/all-patients", params=params)
+
+    assert response.status_code == 422
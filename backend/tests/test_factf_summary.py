@@ -0,0 +1,75 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.latest_evaluations import rebuild_latest_evaluations
+from models import FACTFEvaluation, FACTFPatient
+
+
+@pytest.fixture
+def summary_data(db, seed_health_units, patients, factf_evaluation):
+    """Well over 100 evaluations in each 30-day window, including both window edges"""
+    rng = random.Random(18)
+    today = date.today()
+    seed_health_units()
+    patients(FACTFPatient, range(1, 121), ativo=lambda i: i % 7 != 0)
+    days = [0, 30, 31, 60, 61] + [rng.randint(0, 29) for _ in range(180)] + [rng.randint(31, 60) for _ in range(140)]
+    days += [rng.randint(61, 400) for _ in range(100)]
+    db.execute(insert(FACTFEvaluation), [
+        factf_evaluation(
+            rng, rng.randint(1, 120), today - timedelta(days=offset),
+            bem_estar_fisico=float(rng.randint(0, 28)), bem_estar_social=float(rng.randint(0, 28)),
+            bem_estar_emocional=float(rng.randint(0, 24)), bem_estar_funcional=float(rng.randint(0, 28))
+        )
+        for offset in days
+    ])
+    rebuild_latest_evaluations(db)
+    db.commit()
+    return db
+
+
+def test_summary_counts_full_windows_in_one_query(summary_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/factf-dashboard/summary")
+
+    assert response.status_code == 200
+    today = date.today()
+    evaluations = summary_data.query(FACTFEvaluation).all()
+    patients = summary_data.query(FACTFPatient).filter(FACTFPatient.ativo == True).all()
+    by_id = {evaluation.id: evaluation for evaluation in evaluations}
+    recent = sum(today - timedelta(days=30) <= e.data_avaliacao <= today for e in evaluations)
+    previous = sum(today - timedelta(days=60) <= e.data_avaliacao < today - timedelta(days=30) for e in evaluations)
+    critical = sum(
+        1 for patient in patients
+        if patient.latest_evaluation_id and by_id[patient.latest_evaluation_id].subescala_fadiga <= 30.0
+    )
+    assert recent > 100 and previous > 100
+
+    def average(field):
+        return round(sum(getattr(e, field) for e in evaluations) / len(evaluations), 1)
+
+    assert response.json() == {
+        "total_patients": len(patients),
+        "severe_fatigue_percentage": round(critical / len(patients) * 100, 1),
+        "critical_patients_count": critical,
+        "average_total_score": average("pontuacao_total"),
+        "monthly_growth_percentage": round((recent - previous) / previous * 100, 1),
+        "domain_averages": {
+            "physical": average("bem_estar_fisico"),
+            "social": average("bem_estar_social"),
+            "emotional": average("bem_estar_emocional"),
+            "functional": average("bem_estar_funcional"),
+            "fatigue": average("subescala_fadiga")
+        }
+    }
+
+
+def test_summary_without_evaluations(db, client):
+    response = client.get("/api/v1/factf-dashboard/summary")
+
+    assert response.status_code == 200
+    assert response.json()["total_patients"] == 0
+    assert response.json()["monthly_growth_percentage"] == 0
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from config import settings
+from core.instrumentation import (
+    QUERY_COUNT_HEADER, QUERY_TIME_HEADER, REPEATED_QUERIES_HEADER, QueryBudgetExceeded, fingerprint
+)
+from db.base import get_db
+from models.health_unit import HealthUnit
+
+
+def _add_n_plus_one_route(app):
+    @app.get("/test/n-plus-one")
+    def n_plus_one(db: Session = Depends(get_db)):
+        ids = [unit.id for unit in db.query(HealthUnit).all()]
+        return [db.query(HealthUnit).filter(HealthUnit.id == unit_id).first().nome for unit_id in ids]
+
+
+@pytest.fixture
+def units(db):
+    db.add_all([HealthUnit(nome=f"Unidade {i}", bairro="Centro", regiao="Centro") for i in range(5)])
+    db.commit()
+
+
+def test_fingerprint_ignores_parameters():
+    assert fingerprint("SELECT * FROM t WHERE id = ? AND name = 'a'") == fingerprint(
+        "SELECT *  FROM t\nWHERE id = 42 AND name = 'bob'"
+    )
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (?)"
+
+
+def test_debug_headers(client, units, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+    _add_n_plus_one_route(client.app)
+
+    response = client.get("/test/n-plus-one")
+
+    assert response.status_code == 200
+    assert response.headers[QUERY_COUNT_HEADER] == "6"
+    assert float(response.headers[QUERY_TIME_HEADER]) > 0
+    # One statement repeated once per health unit
+    assert response.headers[REPEATED_QUERIES_HEADER].endswith("=5")
+
+
+def test_headers_hidden_outside_debug(client, units):
+    response = client.get("/api/v1/health-units/")
+
+    assert response.status_code == 200
+    assert QUERY_COUNT_HEADER not in response.headers
+
+
+def test_query_budget_fails_route(client, units, query_budget):
+    query_budget(3)
+    _add_n_plus_one_route(client.app)
+
+    with pytest.raises(QueryBudgetExceeded, match="executed 6 queries"):
+        client.get("/test/n-plus-one")
+
+    assert client.get("/api/v1/health-units/").status_code == 200
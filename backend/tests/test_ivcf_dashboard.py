@@ -0,0 +1,243 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.ivcf import ivcf_dashboard_crud, ivcf_evaluation_crud
+from models import HealthUnit, IVCFEvaluation, IVCFPatient
+
+REGIONS = ["Centro", "Norte", "Sul", "Boqueirão"]
+DOMAIN_FIELDS = [field for _, field in ivcf_dashboard_crud.IVCF_DOMAINS]
+
+
+def _classification(total: int) -> str:
+    return "Robusto" if total <= 6 else "Em Risco" if total <= 14 else "Frágil"
+
+
+@pytest.fixture
+def ivcf_data(db, seed_health_units, patients):
+    """Mixed IVCF dataset: four regions, all age ranges, some inactive patients"""
+    rng = random.Random(7)
+    today = date.today()
+    seed_health_units({i: (REGIONS[i % len(REGIONS)], f"Bairro {i}") for i in range(1, 9)})
+    patients(
+        IVCFPatient, range(1, 121), idade=lambda i: rng.randint(60, 95), bairro=lambda i: f"Bairro {i % 8 + 1}",
+        unidade_saude_id=lambda i: i % 8 + 1, ativo=lambda i: i % 7 != 0
+    )
+    evaluations = []
+    for i in range(400):
+        domains = {field: rng.randint(0, 5) for field in DOMAIN_FIELDS}
+        total = sum(domains.values())
+        evaluations.append({
+            "patient_id": rng.randint(1, 120), "data_avaliacao": today - timedelta(days=rng.randint(0, 400)),
+            "pontuacao_total": total, "classificacao": _classification(total), **domains
+        })
+    db.execute(insert(IVCFEvaluation), evaluations)
+    db.commit()
+    return db
+
+
+def _filtered_evaluations(db, period_from=None, period_to=None, region=None, health_unit_id=None,
+                          age_range=None, classification=None):
+    ages = {"60-70": (60, 70), "71-80": (71, 80), "81+": (81, 200), None: (0, 200)}[age_range]
+    return [
+        evaluation
+        for evaluation, patient, unit in db.query(IVCFEvaluation, IVCFPatient, HealthUnit)
+        .join(IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id)
+        .join(HealthUnit, IVCFPatient.unidade_saude_id == HealthUnit.id)
+        if patient.ativo
+        and (period_from is None or evaluation.data_avaliacao >= period_from)
+        and (period_to is None or evaluation.data_avaliacao <= period_to)
+        and (region is None or unit.regiao == region)
+        and (health_unit_id is None or patient.unidade_saude_id == health_unit_id)
+        and ages[0] <= patient.idade <= ages[1]
+        and (classification is None or evaluation.classificacao == classification)
+    ]
+
+
+def _expected_domains(db, **filters):
+    """Reference: the distribution computed in Python over the loaded rows"""
+    rows = _filtered_evaluations(db, **filters)
+    if not rows:
+        return []
+    result = []
+    for name, field in ivcf_dashboard_crud.IVCF_DOMAINS:
+        scores = [getattr(evaluation, field) for evaluation in rows]
+        result.append({
+            "domain": name,
+            "average_score": round(sum(scores) / len(scores), 1),
+            "min_score": min(scores),
+            "max_score": max(scores),
+            "patient_count": len(rows)
+        })
+    return result
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"region": "Norte"},
+    {"age_range": "71-80", "classification": "Frágil"},
+    {"period_from": date.today() - timedelta(days=90), "region": "Sul"},
+])
+def test_domain_distribution_matches_python_aggregation(ivcf_data, filters):
+    result = ivcf_evaluation_crud.get_domain_distribution(ivcf_data, **filters)
+
+    assert result == _expected_domains(ivcf_data, **filters)
+    assert len(result) == 8
+
+
+def test_domain_distribution_empty_when_nothing_matches(ivcf_data):
+    assert ivcf_evaluation_crud.get_domain_distribution(ivcf_data, period_from=date.today() + timedelta(days=1)) == []
+
+
+def test_domain_distribution_endpoint_runs_one_query(ivcf_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/ivcf-dashboard/ivcf-by-domain", params={"region": "Norte"})
+
+    assert response.status_code == 200
+    body = response.json()
+    expected = _expected_domains(ivcf_data, region="Norte")
+    assert body["domains"] == expected
+    assert body["filters_applied"]["total_patients"] == expected[0]["patient_count"]
+
+
+def _expected_summary(db, **filters):
+    """Reference: the summary computed in Python over the loaded rows"""
+    rows = _filtered_evaluations(db, **filters)
+    if not rows:
+        return {"total_elderly": 0, "fragile_percentage": 0.0, "risk_percentage": 0.0,
+                "robust_percentage": 0.0, "average_score": 0.0, "critical_patients": 0}
+
+    def percentage(classification):
+        return round(sum(1 for row in rows if row.classificacao == classification) / len(rows) * 100, 1)
+
+    return {
+        "total_elderly": len(rows),
+        "fragile_percentage": percentage("Frágil"),
+        "risk_percentage": percentage("Em Risco"),
+        "robust_percentage": percentage("Robusto"),
+        "average_score": round(sum(row.pontuacao_total for row in rows) / len(rows), 1),
+        "critical_patients": sum(1 for row in rows if row.classificacao == "Frágil" and row.pontuacao_total >= 20)
+    }
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"region": "Boqueirão"},
+    {"health_unit_id": 3, "age_range": "81+"},
+    {"period_from": date.today() - timedelta(days=180), "period_to": date.today() - timedelta(days=30)},
+])
+def test_summary_matches_python_aggregation(ivcf_data, filters):
+    assert ivcf_dashboard_crud.get_ivcf_summary(ivcf_data, **filters) == _expected_summary(ivcf_data, **filters)
+
+
+def test_summary_endpoint_runs_one_query(ivcf_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/ivcf-dashboard/ivcf-summary", params={"region": "Norte", "age_range": "71-80"})
+
+    assert response.status_code == 200
+    assert response.json() == _expected_summary(ivcf_data, region="Norte", age_range="71-80")
+
+
+def test_summary_rejects_invalid_region(client):
+    response = client.get("/api/v1/ivcf-dashboard/ivcf-summary", params={"region": "Atlântida"})
+
+    assert response.status_code == 422
+
+
+def _counts(rows):
+    return {
+        "robust": sum(1 for row in rows if row.classificacao == "Robusto"),
+        "risk": sum(1 for row in rows if row.classificacao == "Em Risco"),
+        "fragile": sum(1 for row in rows if row.classificacao == "Frágil")
+    }
+
+
+@pytest.mark.parametrize("filters", [{}, {"age_range": "60-70"}, {"region": "Sul"}])
+def test_fragile_percentage_breakdown_and_region_subtotals(ivcf_data, filters):
+    result = ivcf_dashboard_crud.get_fragile_elderly_percentage(ivcf_data, **filters)
+
+    rows = _filtered_evaluations(ivcf_data, **filters)
+    assert result["total_elderly"] == len(rows)
+    assert result["breakdown"] == _counts(rows)
+    assert result["fragile_elderly"] == result["breakdown"]["fragile"]
+    assert result["fragile_percentage"] == round(result["fragile_elderly"] / len(rows) * 100, 1)
+
+    regions = {item["region"]: item for item in result["regions"]}
+    for region in REGIONS:
+        if filters.get("region", region) != region:
+            assert region not in regions
+            continue
+        region_rows = _filtered_evaluations(ivcf_data, **{**filters, "region": region})
+        item = regions[region]
+        assert item["total_patients"] == len(region_rows)
+        assert item["breakdown"] == _counts(region_rows)
+
+
+def test_fragile_percentage_endpoint_runs_one_query(ivcf_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/ivcf-dashboard/fragile-percentage")
+
+    assert response.status_code == 200
+    data = response.json()["percentage_data"]
+    rows = _filtered_evaluations(ivcf_data)
+    assert data["breakdown"] == _counts(rows)
+    assert sum(item["total_patients"] for item in data["regions"]) == data["total_patients"] == len(rows)
+
+
+@pytest.mark.parametrize("filters", [{}, {"region": "Norte"}, {"age_range": "81+", "health_unit_id": 2}])
+def test_snapshot_matches_individual_widgets(ivcf_data, filters):
+    snapshot = ivcf_dashboard_crud.get_dashboard_snapshot(ivcf_data, **filters, months_back=24)
+
+    assert snapshot["summary"] == ivcf_dashboard_crud.get_ivcf_summary(ivcf_data, **filters)
+    assert snapshot["domains"] == ivcf_evaluation_crud.get_domain_distribution(ivcf_data, **filters)
+    assert snapshot["fragile_percentage"] == ivcf_dashboard_crud.get_fragile_elderly_percentage(ivcf_data, **filters)
+
+    rows = _filtered_evaluations(ivcf_data, **filters)
+    assert sum(item["patient_count"] for item in snapshot["region_averages"]) == len(rows)
+    assert sorted(item["patient_id"] for item in snapshot["critical_patients"]) == sorted(
+        row.patient_id for row in rows if row.classificacao == "Frágil" and row.pontuacao_total >= 20
+    )
+
+    # 24 months back covers the whole dataset (400 days)
+    evolution = snapshot["evolution"]
+    assert sum(item["total"] for item in evolution) == len(rows)
+    assert [(item["year"], item["month"]) for item in evolution] == sorted(
+        {(row.data_avaliacao.year, ivcf_dashboard_crud.MONTH_NAMES[f"{row.data_avaliacao.month:02d}"]) for row in rows},
+        key=lambda item: (item[0], list(ivcf_dashboard_crud.MONTH_NAMES.values()).index(item[1]))
+    )
+
+
+def test_snapshot_region_averages_match_region_endpoint(ivcf_data):
+    snapshot = ivcf_dashboard_crud.get_dashboard_snapshot(ivcf_data)
+
+    def key(item):
+        return item["regiao"], item["bairro"]
+
+    expected = sorted(ivcf_evaluation_crud.get_region_averages(ivcf_data), key=key)
+    assert len(snapshot["region_averages"]) == len(expected)
+    for actual, reference in zip(snapshot["region_averages"], expected):
+        assert {**actual, "average_score": pytest.approx(reference["average_score"])} == reference
+
+
+def test_snapshot_endpoint_runs_two_queries(ivcf_data, client, query_budget):
+    query_budget(2)
+
+    response = client.get("/api/v1/ivcf-dashboard/snapshot", params={"region": "Sul", "months_back": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"] == _expected_summary(ivcf_data, region="Sul")
+    assert body["filters_applied"]["total_patients"] == body["summary"]["total_elderly"]
+    assert len(body["evolution"]) <= 4
+    assert body["total_critical"] == len(body["critical_patients"])
+
+
+def test_snapshot_rejects_invalid_filters(client):
+    response = client.get("/api/v1/ivcf-dashboard/snapshot", params={"age_range": "50-60"})
+
+    assert response.status_code == 422
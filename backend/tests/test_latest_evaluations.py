@@ -0,0 +1,155 @@
+import random
+from functools import partial
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.factf import factf_evaluation_crud, factf_patient_crud
+from db.latest_evaluations import rebuild_latest_evaluations
+from db.physical_activity import physical_activity_evaluation_crud
+from models import FACTFEvaluation, FACTFPatient, PhysicalActivityEvaluation, PhysicalActivityPatient
+from services.physical_activity.physical_activity_evaluation_service import PhysicalActivityEvaluationService
+
+
+@pytest.fixture
+def history(db, seed_health_units, patients, factf_evaluation, physical_activity_evaluation):
+    """Many evaluations per patient, often two on the same day; patient 20 has none"""
+    rng = random.Random(5)
+    today = date.today()
+    seed_health_units()
+    for patient_model, evaluation_model, build in (
+        (FACTFPatient, FACTFEvaluation, factf_evaluation),
+        (PhysicalActivityPatient, PhysicalActivityEvaluation, partial(physical_activity_evaluation, hours=(3.0, 7.0, 11.0))),
+    ):
+        patients(patient_model, range(1, 21), idade=60)
+        db.execute(insert(evaluation_model), [
+            build(rng, rng.randint(1, 19), today - timedelta(days=rng.randint(0, 10)))
+            for _ in range(150)
+        ])
+    rebuild_latest_evaluations(db)
+    db.commit()
+    return db
+
+
+def _expected_pointers(db, evaluation_model):
+    latest = {}
+    for evaluation in db.query(evaluation_model):
+        current = latest.get(evaluation.patient_id)
+        if current is None or (evaluation.data_avaliacao, evaluation.id) > (current.data_avaliacao, current.id):
+            latest[evaluation.patient_id] = evaluation
+    return {patient_id: evaluation.id for patient_id, evaluation in latest.items()}
+
+
+def _pointers(db, patient_model):
+    db.expire_all()
+    return {patient.id: patient.latest_evaluation_id for patient in db.query(patient_model) if patient.latest_evaluation_id}
+
+
+@pytest.mark.parametrize("patient_model, evaluation_model", [
+    (FACTFPatient, FACTFEvaluation),
+    (PhysicalActivityPatient, PhysicalActivityEvaluation),
+])
+def test_rebuild_points_at_latest_date_then_highest_id(history, patient_model, evaluation_model):
+    assert _pointers(history, patient_model) == _expected_pointers(history, evaluation_model)
+    assert history.get(patient_model, 20).latest_evaluation is None
+
+
+def test_factf_writes_keep_pointer_in_sync(history, factf_evaluation):
+    rng = random.Random(8)
+    today = date.today()
+
+    created = factf_evaluation_crud.create_factf_evaluation(history, factf_evaluation(rng, 20, today - timedelta(days=3)))
+    factf_evaluation_crud.create_factf_evaluation(history, factf_evaluation(rng, 20, today - timedelta(days=3)))
+    moved = history.get(FACTFPatient, 1).latest_evaluation_id
+    factf_evaluation_crud.update_factf_evaluation(history, moved, {"patient_id": 2, "data_avaliacao": today + timedelta(days=1)})
+    factf_evaluation_crud.delete_factf_evaluation(history, history.get(FACTFPatient, 3).latest_evaluation_id)
+
+    assert _pointers(history, FACTFPatient) == _expected_pointers(history, FACTFEvaluation)
+    assert history.get(FACTFPatient, 2).latest_evaluation_id == moved
+    assert history.get(FACTFPatient, 20).latest_evaluation_id > created.id
+
+
+def test_physical_activity_writes_keep_pointer_in_sync(history, physical_activity_evaluation):
+    rng = random.Random(9)
+    today = date.today()
+
+    physical_activity_evaluation_crud.create_physical_activity_evaluation(
+        history, physical_activity_evaluation(rng, 4, today + timedelta(days=2))
+    )
+    latest = history.get(PhysicalActivityPatient, 5).latest_evaluation_id
+    physical_activity_evaluation_crud.update_physical_activity_evaluation(
+        history, latest, {"data_avaliacao": today - timedelta(days=30)}
+    )
+    physical_activity_evaluation_crud.delete_physical_activity_evaluation(
+        history, history.get(PhysicalActivityPatient, 6).latest_evaluation_id
+    )
+
+    assert _pointers(history, PhysicalActivityPatient) == _expected_pointers(history, PhysicalActivityEvaluation)
+    assert history.get(PhysicalActivityPatient, 5).latest_evaluation_id != latest
+
+
+def test_physical_activity_service_writes_go_through_the_crud(history):
+    evaluation = PhysicalActivityEvaluationService.create_evaluation(history, {
+        "patient_id": 5, "data_avaliacao": date.today() + timedelta(days=1), "moderate_activity_minutes_per_day": 30,
+        "moderate_activity_days_per_week": 5, "sedentary_hours_per_day": 5.0
+    })
+    PhysicalActivityEvaluationService.update_evaluation(history, evaluation.id, {"sedentary_hours_per_day": 11.0})
+    PhysicalActivityEvaluationService.delete_evaluation(history, history.get(PhysicalActivityPatient, 6).latest_evaluation_id)
+
+    assert evaluation.sedentary_hours_per_day == 11.0
+    assert _pointers(history, PhysicalActivityPatient) == _expected_pointers(history, PhysicalActivityEvaluation)
+    assert history.get(PhysicalActivityPatient, 5).latest_evaluation_id == evaluation.id
+
+
+def test_latest_evaluation_lookups_use_pointer(history):
+    expected = _expected_pointers(history, FACTFEvaluation)
+
+    for patient_id in range(1, 21):
+        latest = factf_evaluation_crud.get_latest_evaluation_by_patient(history, patient_id)
+        assert (latest.id if latest else None) == expected.get(patient_id)
+        latest = physical_activity_evaluation_crud.get_latest_evaluation_by_patient(history, patient_id)
+        assert (latest.id if latest else None) == _expected_pointers(history, PhysicalActivityEvaluation).get(patient_id)
+
+
+def test_current_status_queries_return_one_row_per_patient(history):
+    expected = _expected_pointers(history, FACTFEvaluation)
+    latest = {evaluation.id: evaluation for evaluation in history.query(FACTFEvaluation).filter(FACTFEvaluation.id.in_(expected.values()))}
+
+    critical = factf_evaluation_crud.get_critical_patients(history, min_fatigue_score=30.0)
+    assert sorted(row.id for row in critical) == sorted(
+        patient_id for patient_id, evaluation_id in expected.items() if latest[evaluation_id].subescala_fadiga <= 30.0
+    )
+
+    rows = factf_patient_crud.get_patients_with_latest_evaluation(history)
+    assert len(rows) == 20
+    assert {row.FACTFPatient.id: row.data_avaliacao for row in rows} == {
+        patient_id: latest[expected[patient_id]].data_avaliacao if patient_id in expected else None
+        for patient_id in range(1, 21)
+    }
+
+
+def test_classification_filter_uses_latest_evaluation(history, factf_evaluation):
+    """Patient 20 was Fadiga Grave before its latest (Sem Fadiga) evaluation"""
+    today = date.today()
+    factf_evaluation_crud.create_factf_evaluation(history, {
+        **factf_evaluation(random.Random(10), 20, today - timedelta(days=60)),
+        "subescala_fadiga": 10.0, "classificacao_fadiga": "Fadiga Grave"
+    })
+    factf_evaluation_crud.create_factf_evaluation(history, {
+        **factf_evaluation(random.Random(11), 20, today),
+        "subescala_fadiga": 50.0, "classificacao_fadiga": "Sem Fadiga"
+    })
+    latest = {
+        evaluation.patient_id: evaluation.classificacao_fadiga
+        for evaluation in history.query(FACTFEvaluation).filter(
+            FACTFEvaluation.id.in_(_expected_pointers(history, FACTFEvaluation).values())
+        )
+    }
+
+    for classification in ("Fadiga Grave", "Fadiga Leve", "Sem Fadiga"):
+        patients = factf_patient_crud.get_factf_patients(history, classificacao_fadiga=classification)
+        assert sorted(patient.id for patient in patients) == sorted(
+            patient_id for patient_id, value in latest.items() if value == classification
+        )
+    assert 20 not in {patient.id for patient in factf_patient_crud.get_factf_patients(history, classificacao_fadiga="Fadiga Grave")}
@@ -0,0 +1,50 @@
+import pytest
+
+from core.metrics import registry
+
+
+@pytest.fixture
+def metrics_client(client):
+    registry.reset()
+
+    @client.app.get("/test/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return client
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_metrics_per_route_template(metrics_client):
+    metrics_client.get("/api/v1/ivcf-patients/41")
+    metrics_client.get("/api/v1/ivcf-patients/42")
+    metrics_client.get("/api/v1/health-units/")
+
+    response = metrics_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+    route = 'method="GET",route="/api/v1/ivcf-patients/{patient_id}"'
+    assert samples['http_requests_total{' + route + ',status="404"}'] == "2"
+    assert samples['http_request_duration_seconds_count{' + route + '}'] == "2"
+    assert samples['http_request_duration_seconds_bucket{' + route + ',le="+Inf"}'] == "2"
+    assert samples['http_request_db_queries_total{' + route + '}'] == "2"
+    # The scrape itself is in flight
+    assert samples["http_requests_in_flight"] == "1"
+    assert "threadpool_queue_depth" in samples
+    assert 'db_pool_checked_out{engine="primary"}' in samples
+
+
+def test_metrics_count_errors(metrics_client):
+    metrics_client.get("/api/v1/health-units/")
+    with pytest.raises(RuntimeError):
+        metrics_client.get("/test/boom")
+
+    samples = _samples(metrics_client.get("/metrics").text)
+
+    assert samples['http_request_errors_total{method="GET",route="/test/boom"}'] == "1"
+    assert 'http_request_errors_total{method="GET",route="/api/v1/health-units/"}' not in samples
@@ -0,0 +1,233 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, insert, inspect, select, text
+
+from db.base import Base, MIGRATIONS_DIR, engine, ensure_schema, SessionLocal
+from db.comorbidities import COMORBIDITY_LINKS, rebuild_patient_comorbidities
+from db.factf import factf_evaluation_crud
+from db.ivcf import ivcf_dashboard_crud
+from db.latest_evaluations import LATEST_EVALUATIONS, rebuild_latest_evaluations
+from db.monthly_rollups import ROLLUPS, rebuild_monthly_rollups
+from db.physical_activity import physical_activity_evaluation_crud
+from models import (
+    Comorbidity, FACTFEvaluation, FACTFPatient, HealthUnit, IVCFEvaluation, IVCFPatient,
+    PhysicalActivityEvaluation, PhysicalActivityPatient
+)
+
+COMORBIDITY_TEXTS = [None, "Hipertensão arterial, DIABETES tipo 2", "artrose; DPOC", "pressão alta", "Nenhuma", "HAS, obesa"]
+
+
+def migrate(direction, revision: str):
+    """alembic upgrade/downgrade (command.upgrade or command.downgrade) to `revision` on the test database"""
+    config = Config(str(MIGRATIONS_DIR.parent.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        direction(config, revision)
+
+
+@pytest.fixture
+def migrated_db():
+    """Schema built by the migrations (not create_all) with a small dataset"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    ensure_schema()
+
+    session = SessionLocal()
+    today = date.today()
+    session.execute(insert(HealthUnit), [
+        {"id": i, "nome": f"Unidade {i}", "bairro": "Centro", "regiao": "Centro", "ativo": True}
+        for i in range(1, 5)
+    ])
+    for model in (IVCFPatient, FACTFPatient, PhysicalActivityPatient):
+        session.execute(insert(model), [
+            {"id": i, "nome_completo": f"Paciente {i}", "cpf": f"{i:011d}", "idade": 60 + i % 35,
+             "bairro": "Centro", "unidade_saude_id": i % 4 + 1, "data_cadastro": today, "ativo": i % 10 != 0}
+            for i in range(1, 201)
+        ])
+    session.execute(insert(IVCFEvaluation), [
+        {"patient_id": i % 200 + 1, "data_avaliacao": today - timedelta(days=i), "pontuacao_total": 10,
+         "classificacao": "Robusto", "dominio_idade": 1, "dominio_comorbidades": 1, "dominio_comunicacao": 1,
+         "dominio_mobilidade": 1, "dominio_humor": 1, "dominio_cognicao": 1, "dominio_avd": 1,
+         "dominio_autopercepcao": 3}
+        for i in range(1000)
+    ])
+    session.execute(insert(FACTFEvaluation), [
+        {"patient_id": i % 200 + 1, "data_avaliacao": today - timedelta(days=i), "pontuacao_total": 100,
+         "pontuacao_fadiga": 40, "classificacao_fadiga": "Sem Fadiga", "bem_estar_fisico": 20,
+         "bem_estar_social": 20, "bem_estar_emocional": 20, "bem_estar_funcional": 20, "subescala_fadiga": 40}
+        for i in range(1000)
+    ])
+    session.execute(insert(PhysicalActivityEvaluation), [
+        {"patient_id": i % 200 + 1, "data_avaliacao": today - timedelta(days=i),
+         "light_activity_minutes_per_day": 0, "light_activity_days_per_week": 0,
+         "moderate_activity_minutes_per_day": 30, "moderate_activity_days_per_week": 5,
+         "vigorous_activity_minutes_per_day": 0, "vigorous_activity_days_per_week": 0,
+         "sedentary_hours_per_day": 6, "screen_time_hours_per_day": 2,
+         "total_weekly_moderate_minutes": 150, "total_weekly_vigorous_minutes": 0,
+         "who_compliance": True, "sedentary_risk_level": "Baixo"}
+        for i in range(1000)
+    ])
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def capture_statements():
+    """Collect the SELECT statements (with parameters) executed on the engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(statements) -> str:
+    """EXPLAIN QUERY PLAN output for the captured statements"""
+    lines = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            lines.extend(row[-1] for row in rows)
+    return "\n".join(lines)
+
+
+def test_migrations_create_dashboard_indexes(migrated_db):
+    inspector = inspect(engine)
+    indexes = {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in inspector.get_table_names()
+    }
+
+    for table in ("ivcf_evaluations", "factf_evaluations", "physical_activity_evaluations"):
+        assert f"ix_{table}_patient_date" in indexes[table]
+    for table in ("ivcf_patients", "factf_patients", "physical_activity_patients"):
+        assert f"ix_{table}_active_unit" in indexes[table]
+    assert "ix_ivcf_evaluations_classificacao" in indexes["ivcf_evaluations"]
+    assert "ix_factf_evaluations_data_avaliacao" in indexes["factf_evaluations"]
+    assert "ix_factf_evaluations_classificacao_fadiga" in indexes["factf_evaluations"]
+
+
+def test_migrations_are_idempotent(migrated_db):
+    ensure_schema()
+
+
+@pytest.mark.parametrize("call, expected_index", [
+    (lambda db: factf_evaluation_crud.get_evaluations_by_patient(db, 7),
+     "ix_factf_evaluations_patient_date"),
+    (lambda db: physical_activity_evaluation_crud.get_physical_activity_evaluations_by_patient(db, 7),
+     "ix_physical_activity_evaluations_patient_date"),
+    (lambda db: factf_evaluation_crud.get_evaluations_by_date_range(
+        db, date.today() - timedelta(days=30), date.today()),
+     "ix_factf_evaluations_data_avaliacao"),
+    (lambda db: factf_evaluation_crud.get_evaluations_by_classification(db, "Fadiga Grave"),
+     "ix_factf_evaluations_classificacao_fadiga"),
+    (lambda db: ivcf_dashboard_crud.get_total_patients_with_filters(db, health_unit_id=2),
+     "ix_ivcf_patients_active_unit"),
+    (lambda db: ivcf_dashboard_crud.get_total_patients_with_filters(db, classification="Frágil"),
+     "ix_ivcf_evaluations_classificacao"),
+])
+def test_dashboard_queries_use_indexes(migrated_db, call, expected_index):
+    with capture_statements() as statements:
+        call(migrated_db)
+
+    assert statements
+    assert expected_index in query_plan(statements)
+
+
+@pytest.mark.parametrize("table, before_drop, patient_model, evaluation_model", [
+    ("factf_monthly_rollups", "0005", FACTFPatient, FACTFEvaluation),
+    ("physical_activity_monthly_rollups", "0006", PhysicalActivityPatient, PhysicalActivityEvaluation),
+])
+def test_unused_monthly_rollups_are_dropped_after_0003(migrated_db, table, before_drop, patient_model, evaluation_model):
+    assert table not in inspect(engine).get_table_names()
+
+    migrate(command.downgrade, before_drop)
+    try:
+        with engine.connect() as conn:
+            counted = conn.execute(text(f"SELECT SUM(evaluation_count) FROM {table}")).scalar()
+        active = migrated_db.query(evaluation_model).join(
+            patient_model, evaluation_model.patient_id == patient_model.id
+        ).filter(patient_model.ativo == True).count()
+        assert counted == active
+    finally:
+        migrate(command.upgrade, "head")
+
+
+def _derived_rows(session):
+    """Contents of the rollups, latest evaluation pointers and comorbidity links"""
+    rows = {}
+    for instrument, spec in ROLLUPS.items():
+        table = spec.rollup.__table__
+        rows[table.name] = {
+            tuple(round(value, 6) if isinstance(value, float) else value for value in row)
+            for row in session.execute(select(table))
+        }
+    for instrument, (patient, _) in LATEST_EVALUATIONS.items():
+        rows[f"{instrument} pointers"] = set(session.execute(select(patient.id, patient.latest_evaluation_id)))
+    for instrument, spec in COMORBIDITY_LINKS.items():
+        rows[f"{instrument} links"] = set(session.execute(
+            select(spec.link.patient_id, Comorbidity.chave).join(Comorbidity, spec.link.comorbidity_id == Comorbidity.id)
+        ))
+    return rows
+
+
+def test_upgrade_backfills_existing_data_like_the_rebuilds(ivcf_evaluation, factf_evaluation, physical_activity_evaluation):
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    migrate(command.upgrade, "0002")
+
+    rng = random.Random(4)
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(HealthUnit), [
+            {"id": i, "nome": f"Unidade {i}", "bairro": "Centro", "regiao": f"Região {i % 2}", "ativo": True}
+            for i in range(1, 5)
+        ])
+        for patient_model, evaluation_model, build in (
+            (IVCFPatient, IVCFEvaluation, ivcf_evaluation),
+            (FACTFPatient, FACTFEvaluation, factf_evaluation),
+            (PhysicalActivityPatient, PhysicalActivityEvaluation, physical_activity_evaluation),
+        ):
+            conn.execute(insert(patient_model), [
+                {"id": i, "nome_completo": f"Paciente {i}", "cpf": f"{i:011d}", "idade": rng.randint(50, 95),
+                 "bairro": "Centro", "unidade_saude_id": i % 4 + 1, "data_cadastro": today, "ativo": i % 7 != 0,
+                 **({} if patient_model is IVCFPatient else {
+                     "comorbidades": rng.choice(COMORBIDITY_TEXTS), "diagnostico_principal": rng.choice(COMORBIDITY_TEXTS)
+                 })}
+                for i in range(1, 61)
+            ])
+            conn.execute(insert(evaluation_model), [
+                build(
+                    rng, rng.randint(1, 55), today - timedelta(days=rng.randint(0, 400)),
+                    **({"comorbidades": rng.choice(COMORBIDITY_TEXTS)} if evaluation_model is IVCFEvaluation else {})
+                )
+                for _ in range(300)
+            ])
+
+    migrate(command.upgrade, "head")
+
+    with SessionLocal() as session:
+        backfilled = _derived_rows(session)
+        assert all(backfilled.values())
+        rebuild_monthly_rollups(session)
+        rebuild_latest_evaluations(session)
+        rebuild_patient_comorbidities(session)
+        session.flush()
+        assert _derived_rows(session) == backfilled
@@ -0,0 +1,128 @@
+import random
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db import health_unit_crud
+from db.ivcf import ivcf_dashboard_crud, ivcf_evaluation_crud, ivcf_patient_crud
+from db.monthly_rollups import ROLLUPS, rebuild_monthly_rollups
+from models import IVCFEvaluation, IVCFPatient
+
+REGIONS = ["Centro", "Norte", "Sul"]
+
+
+@pytest.fixture
+def rollup_data(db, seed_health_units, patients, ivcf_evaluation):
+    """IVCF evaluations written straight to the table, then recounted by the backfill"""
+    rng = random.Random(11)
+    today = date.today()
+    seed_health_units({i: (REGIONS[i % len(REGIONS)], f"Bairro {i}") for i in range(1, 7)})
+    patients(
+        IVCFPatient, range(1, 61), idade=lambda i: rng.randint(45, 95),
+        unidade_saude_id=lambda i: i % 6 + 1, ativo=lambda i: i % 9 != 0
+    )
+    db.execute(insert(IVCFEvaluation), [
+        ivcf_evaluation(rng, rng.randint(1, 60), today - timedelta(days=rng.randint(0, 500)))
+        for _ in range(300)
+    ])
+    rebuild_monthly_rollups(db)
+    db.commit()
+    return db
+
+
+def _rollup_rows(db, instrument):
+    """Non-empty rollup rows as {key: (count, sums...)}"""
+    rollup = ROLLUPS[instrument].rollup
+    columns = ["evaluation_count"] + [f"{column}_sum" for column in ROLLUPS[instrument].sums]
+    return {
+        (row.month, row.unidade_saude_id, row.regiao, row.age_bucket, row.classificacao):
+            tuple(round(getattr(row, column), 6) for column in columns)
+        for row in db.query(rollup).all()
+        if row.evaluation_count
+    }
+
+
+def _assert_rollups_match_backfill(db):
+    """The incrementally maintained rollups equal a recount from the evaluation tables"""
+    maintained = {instrument: _rollup_rows(db, instrument) for instrument in ROLLUPS}
+    rebuild_monthly_rollups(db)
+    db.flush()
+    for instrument in ROLLUPS:
+        assert maintained[instrument] == _rollup_rows(db, instrument), instrument
+    db.rollback()
+
+
+def test_backfill_counts_active_evaluations(rollup_data):
+    rows = _rollup_rows(rollup_data, "ivcf")
+
+    active = [
+        evaluation for evaluation, patient in rollup_data.query(IVCFEvaluation, IVCFPatient)
+        .join(IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id)
+        if patient.ativo
+    ]
+    assert sum(count for count, _ in rows.values()) == len(active)
+    assert sum(total for _, total in rows.values()) == sum(evaluation.pontuacao_total for evaluation in active)
+    assert all(month.day == 1 for month, *_ in rows)
+
+
+def test_evaluation_writes_keep_rollups_in_sync(rollup_data, ivcf_evaluation):
+    rng = random.Random(3)
+    today = date.today()
+
+    ivcf = ivcf_evaluation_crud.create_ivcf_evaluation(rollup_data, ivcf_evaluation(rng, 1, today))
+    ivcf_evaluation_crud.update_ivcf_evaluation(
+        rollup_data, ivcf.id, {"data_avaliacao": today - timedelta(days=70), "pontuacao_total": 25, "classificacao": "Frágil"}
+    )
+    ivcf_evaluation_crud.delete_ivcf_evaluation(rollup_data, 5)
+
+    _assert_rollups_match_backfill(rollup_data)
+
+
+def test_patient_and_health_unit_changes_move_rollup_rows(rollup_data):
+    ivcf_patient_crud.update_ivcf_patient(rollup_data, 1, {"idade": 85, "unidade_saude_id": 4})
+    ivcf_patient_crud.delete_ivcf_patient(rollup_data, 2)
+    ivcf_patient_crud.update_ivcf_patient(rollup_data, 9, {"ativo": True})
+    health_unit_crud.update_health_unit(rollup_data, 2, {"regiao": "Boqueirão"})
+
+    _assert_rollups_match_backfill(rollup_data)
+    assert "Boqueirão" in {key[2] for key in _rollup_rows(rollup_data, "ivcf")}
+
+
+def _ivcf_evolution_reference(db, start):
+    counts = defaultdict(Counter)
+    for evaluation, patient in db.query(IVCFEvaluation, IVCFPatient).join(
+        IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id
+    ):
+        if patient.ativo and evaluation.data_avaliacao >= start:
+            counts[(evaluation.data_avaliacao.year, evaluation.data_avaliacao.month)][evaluation.classificacao] += 1
+    return [
+        {
+            "month": ivcf_dashboard_crud.MONTH_NAMES[f"{month:02d}"], "year": year,
+            "robust": counter["Robusto"], "risk": counter["Em Risco"], "fragile": counter["Frágil"],
+            "total": sum(counter.values())
+        }
+        for (year, month), counter in sorted(counts.items())
+    ]
+
+
+def test_ivcf_evolution_endpoint_reads_rollup(rollup_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/ivcf-dashboard/ivcf-evolution", params={"months_back": 6})
+
+    assert response.status_code == 200
+    start = ivcf_dashboard_crud.shift_months(date.today(), 6)
+    assert response.json()["evolution"] == _ivcf_evolution_reference(rollup_data, start)
+
+
+def test_ivcf_evolution_from_last_evaluation(rollup_data):
+    latest = max(
+        evaluation.data_avaliacao for evaluation, patient in rollup_data.query(IVCFEvaluation, IVCFPatient)
+        .join(IVCFPatient, IVCFEvaluation.patient_id == IVCFPatient.id) if patient.ativo
+    )
+
+    result = ivcf_evaluation_crud.get_monthly_evolution(rollup_data, months_back=3, from_last_evaluation=True)
+
+    assert result == _ivcf_evolution_reference(rollup_data, ivcf_dashboard_crud.shift_months(latest, 2))
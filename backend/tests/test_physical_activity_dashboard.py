@@ -0,0 +1,270 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from db.comorbidities import match_comorbidities, rebuild_patient_comorbidities
+from db.ivcf.ivcf_dashboard_crud import shift_months
+from db.latest_evaluations import rebuild_latest_evaluations
+from db.physical_activity import physical_activity_evaluation_crud
+from models import PhysicalActivityEvaluation, PhysicalActivityPatient
+
+COMORBIDITY_TEXTS = [None, "Hipertensão arterial", "diabético, pressão alta", "Artrose", "HAS; obesidade", "Nenhuma"]
+
+
+@pytest.fixture
+def dashboard_data(db, seed_health_units, patients, physical_activity_evaluation):
+    """Patients aged 55-95 with several evaluations each; some inactive, some never evaluated"""
+    rng = random.Random(22)
+    today = date.today()
+    seed_health_units({1: ("Matriz", "Centro"), 2: ("Matriz", "Centro")})
+    patients(
+        PhysicalActivityPatient, range(1, 201), idade=lambda i: rng.randint(55, 95),
+        unidade_saude_id=lambda i: rng.choice([1, 2]), ativo=lambda i: i % 10 != 0,
+        comorbidades=lambda i: rng.choice(COMORBIDITY_TEXTS),
+        diagnostico_principal=lambda i: rng.choice([None, "Diabetes tipo 2", "DPOC"])
+    )
+    db.execute(insert(PhysicalActivityEvaluation), [
+        physical_activity_evaluation(
+            rng, rng.randint(1, 180), today - timedelta(days=rng.randint(0, 400)),
+            hours=(2.5, 4.0, 6.5, 9.0, 10.5, 11.5, 13.0)
+        )
+        for _ in range(700)
+    ])
+    rebuild_latest_evaluations(db)
+    rebuild_patient_comorbidities(db)
+    db.commit()
+    return db
+
+
+def _latest_by_patient(db):
+    """(active patient, latest evaluation or None), computed in Python"""
+    latest = {}
+    for evaluation in db.query(PhysicalActivityEvaluation):
+        current = latest.get(evaluation.patient_id)
+        if current is None or (evaluation.data_avaliacao, evaluation.id) > (current.data_avaliacao, current.id):
+            latest[evaluation.patient_id] = evaluation
+    return [
+        (patient, latest.get(patient.id))
+        for patient in db.query(PhysicalActivityPatient).filter(PhysicalActivityPatient.ativo == True)
+    ]
+
+
+def _sedentary_by_age_reference(db, bands):
+    rows = _latest_by_patient(db)
+    result = []
+    for label, min_age, max_age in bands:
+        in_band = [(p, e) for p, e in rows if min_age <= p.idade <= (max_age if max_age is not None else 200)]
+        hours = [e.sedentary_hours_per_day for _, e in in_band if e]
+        result.append({
+            "age_range": label,
+            "average_sedentary_hours": round(sum(hours) / len(hours), 1) if hours else 0,
+            "patient_count": len(in_band),
+            "evaluated_count": len(hours)
+        })
+    return result
+
+
+def test_sedentary_by_age_default_bands_in_one_query(dashboard_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/physical-activity-dashboard/sedentary-by-age")
+
+    assert response.status_code == 200
+    assert response.json() == _sedentary_by_age_reference(
+        dashboard_data, [("60-70", 60, 70), ("71-80", 71, 80), ("81+", 81, None)]
+    )
+
+
+def test_sedentary_by_age_custom_bands(dashboard_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get(
+        "/api/v1/physical-activity-dashboard/sedentary-by-age", params={"age_bands": "75+, 55-64,65-74,50-54"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == _sedentary_by_age_reference(
+        dashboard_data, [("75+", 75, None), ("55-64", 55, 64), ("65-74", 65, 74), ("50-54", 50, 54)]
+    )
+    assert response.json()[-1]["patient_count"] == 0
+
+
+@pytest.mark.parametrize("age_bands", ["60-70,70-80", "60-70,65+", "70-60", "sessenta", "60-70,"])
+def test_sedentary_by_age_rejects_invalid_bands(client, age_bands):
+    response = client.get("/api/v1/physical-activity-dashboard/sedentary-by-age", params={"age_bands": age_bands})
+
+    assert response.status_code == 422
+
+
+def test_critical_patients_latest_evaluation_only_paginated(dashboard_data, client, query_budget):
+    patients, cursor = [], None
+    while True:
+        query_budget(1)
+        response = client.get(
+            "/api/v1/physical-activity-dashboard/critical-patients", params={"limit": 9, "cursor": cursor}
+        )
+        assert response.status_code == 200
+        patients += response.json()["patients"]
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = sorted(
+        (
+            {
+                "patient_id": patient.id, "patient_name": patient.nome_completo, "cpf": patient.cpf,
+                "age": patient.idade, "bairro": patient.bairro,
+                "sedentary_hours_per_day": evaluation.sedentary_hours_per_day,
+                "evaluation_date": evaluation.data_avaliacao.isoformat(),
+                "who_compliance": evaluation.who_compliance,
+                "health_unit": f"Unidade {patient.unidade_saude_id}"
+            }
+            for patient, evaluation in _latest_by_patient(dashboard_data)
+            if evaluation and evaluation.sedentary_risk_level == "Crítico"
+        ),
+        key=lambda row: (-row["sedentary_hours_per_day"], row["patient_id"])
+    )
+    assert len(expected) > 9
+    assert patients == expected
+
+
+def test_critical_patients_default_page_points_at_the_rest(db, seed_health_units, patients, client):
+    seed_health_units()
+    patients(PhysicalActivityPatient, range(1, 131))
+    db.execute(insert(PhysicalActivityEvaluation), [
+        {"patient_id": i, "data_avaliacao": date.today(), "sedentary_hours_per_day": 10.5 + i % 3, "sedentary_risk_level": "Crítico"}
+        for i in range(1, 131)
+    ])
+    rebuild_latest_evaluations(db)
+    db.commit()
+
+    first = client.get("/api/v1/physical-activity-dashboard/critical-patients").json()
+    last = client.get("/api/v1/physical-activity-dashboard/critical-patients", params={"cursor": first["next_cursor"]}).json()
+
+    assert len(first["patients"]) == 100
+    assert last["next_cursor"] is None
+    assert sorted(patient["patient_id"] for patient in first["patients"] + last["patients"]) == list(range(1, 131))
+
+
+def test_critical_patients_rejects_invalid_cursor(client):
+    response = client.get("/api/v1/physical-activity-dashboard/critical-patients", params={"cursor": "WyJ4Il0"})
+
+    assert response.status_code == 422
+
+
+def _summary_reference(db, sort_by, order):
+    rows = []
+    for patient, evaluation in _latest_by_patient(db):
+        rows.append({
+            "id": patient.id, "nome_completo": patient.nome_completo, "cpf": patient.cpf, "idade": patient.idade,
+            "bairro": patient.bairro, "health_unit": f"Unidade {patient.unidade_saude_id}",
+            "data_cadastro": patient.data_cadastro.isoformat(), "has_evaluation": evaluation is not None,
+            "last_evaluation_date": evaluation.data_avaliacao.isoformat() if evaluation else None,
+            "sedentary_hours_per_day": evaluation.sedentary_hours_per_day if evaluation else None,
+            "sedentary_risk_level": evaluation.sedentary_risk_level if evaluation else None,
+            "who_compliance": evaluation.who_compliance if evaluation else None,
+            "total_weekly_moderate_minutes": evaluation.total_weekly_moderate_minutes if evaluation else None,
+            "total_weekly_vigorous_minutes": evaluation.total_weekly_vigorous_minutes if evaluation else None,
+        })
+    field = {"last_evaluation_date": "last_evaluation_date", "name": "nome_completo"}[sort_by]
+    present = [row for row in rows if row[field] is not None]
+    missing = [row for row in rows if row[field] is None]
+    reverse = order == "desc"
+    return (
+        sorted(present, key=lambda row: (row[field], row["data_cadastro"], row["id"]), reverse=reverse)
+        + sorted(missing, key=lambda row: (row["data_cadastro"], row["id"]), reverse=reverse)
+    )
+
+
+@pytest.mark.parametrize("params, sort_by, order", [
+    ({}, "last_evaluation_date", "desc"),
+    ({"sort_by": "name", "order": "asc"}, "name", "asc"),
+])
+def test_all_patients_pages_are_sorted_in_sql(dashboard_data, client, query_budget, params, sort_by, order):
+    patients, cursor = [], None
+    while True:
+        query_budget(1)
+        response = client.get(
+            "/api/v1/physical-activity-dashboard/all-patients", params={**params, "limit": 40, "cursor": cursor}
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["patients"]) <= 40
+        patients += page["patients"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert patients == _summary_reference(dashboard_data, sort_by, order)
+
+
+@pytest.mark.parametrize("params", [{"sort_by": "cpf"}, {"order": "up"}, {"cursor": "WyJ4Il0"}])
+def test_all_patients_rejects_invalid_parameters(client, params):
+    response = client.get("/api/v1/physical-activity-dashboard/all-patients", params=params)
+
+    assert response.status_code == 422
+
+
+def test_monthly_evaluation_counts_cover_calendar_months(dashboard_data):
+    start = shift_months(date.today(), 12)
+    expected = {}
+    for evaluation in dashboard_data.query(PhysicalActivityEvaluation):
+        if evaluation.data_avaliacao >= start:
+            month = evaluation.data_avaliacao.replace(day=1)
+            expected[month] = expected.get(month, 0) + 1
+
+    counts = physical_activity_evaluation_crud.get_monthly_evaluation_counts(dashboard_data, months=12)
+
+    assert [(row["month"], row["count"]) for row in counts] == sorted(expected.items())
+    assert len(counts) == 13
+
+
+def _trend_reference(db, cohorts, months):
+    start = shift_months(date.today(), months)
+    patients = {
+        patient.id: match_comorbidities(patient.comorbidades, patient.diagnostico_principal)
+        for patient in db.query(PhysicalActivityPatient).filter(PhysicalActivityPatient.ativo == True)
+    }
+    trend = {}
+    for condition, name in cohorts.items():
+        by_month = {}
+        for evaluation in db.query(PhysicalActivityEvaluation):
+            if condition in patients.get(evaluation.patient_id, ()) and evaluation.data_avaliacao >= start:
+                by_month.setdefault(evaluation.data_avaliacao.strftime("%Y-%m"), []).append(evaluation.sedentary_hours_per_day)
+        trend[name] = [
+            {"month": month, "average_sedentary_hours": round(sum(hours) / len(hours), 1)}
+            for month, hours in sorted(by_month.items())
+        ]
+    return trend
+
+
+def test_sedentary_trend_default_cohorts_in_one_query(dashboard_data, client, query_budget):
+    query_budget(1)
+
+    response = client.get("/api/v1/physical-activity-dashboard/sedentary-trend", params={"months": 12})
+
+    assert response.status_code == 200
+    expected = _trend_reference(dashboard_data, {"diabetes": "diabetics", "hipertensao": "hypertensives"}, 12)
+    assert response.json() == expected
+    assert expected["diabetics"] and expected["hypertensives"]
+
+
+def test_sedentary_trend_arbitrary_cohorts(dashboard_data, client, query_budget):
+    query_budget(1)
+    conditions = ["dpoc", "obesidade", "artrose", "glaucoma"]
+
+    response = client.get(
+        "/api/v1/physical-activity-dashboard/sedentary-trend", params={"months": 6, "conditions": conditions}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == _trend_reference(dashboard_data, {condition: condition for condition in conditions}, 6)
+    assert response.json()["glaucoma"] == []
+
+
+def test_sedentary_trend_rejects_unknown_conditions(client):
+    response = client.get("/api/v1/physical-activity-dashboard/sedentary-trend", params={"conditions": ["gripe"]})
+
+    assert response.status_code == 422
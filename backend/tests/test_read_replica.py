@@ -0,0 +1,63 @@
+import pytest
+
+from api.dependencies import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER
+from db.base import ReadSessionLocal
+from models.health_unit import HealthUnit
+
+
+def _add_health_unit(db, nome="Unidade Centro"):
+    db.add(HealthUnit(nome=nome, bairro="Centro", regiao="Centro"))
+    db.commit()
+
+
+def test_reads_go_to_replica(db):
+    _add_health_unit(db)
+
+    read_db = ReadSessionLocal()
+    try:
+        # The replica file never received the write
+        assert read_db.query(HealthUnit).count() == 0
+    finally:
+        read_db.close()
+
+
+def test_use_primary_escape_hatch_reads_own_writes(db):
+    _add_health_unit(db)
+
+    read_db = ReadSessionLocal()
+    read_db.info["use_primary"] = True
+    try:
+        assert read_db.query(HealthUnit).count() == 1
+    finally:
+        read_db.close()
+
+
+def test_writes_stick_session_to_primary(db):
+    read_db = ReadSessionLocal()
+    try:
+        read_db.add(HealthUnit(nome="Unidade Norte", bairro="Boa Vista", regiao="Norte"))
+        read_db.commit()
+        assert read_db.query(HealthUnit).count() == 1
+    finally:
+        read_db.close()
+
+    assert db.query(HealthUnit).count() == 1
+
+
+@pytest.mark.parametrize("headers, cookies, expected", [
+    ({READ_PRIMARY_HEADER: "1"}, {}, 1),
+    ({READ_PRIMARY_HEADER: "true"}, {}, 1),
+    ({READ_PRIMARY_HEADER: "0"}, {}, 0),
+    ({READ_PRIMARY_HEADER: "false"}, {READ_PRIMARY_COOKIE: "1"}, 0),
+    ({READ_PRIMARY_HEADER: ""}, {}, 0),
+    ({}, {READ_PRIMARY_COOKIE: "1"}, 1),
+])
+def test_read_primary_flag_is_parsed_as_a_boolean(db, client, headers, cookies, expected):
+    _add_health_unit(db)
+    client.headers.pop(READ_PRIMARY_HEADER)
+    client.cookies.update(cookies)
+
+    response = client.get("/api/v1/health-units/", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == expected
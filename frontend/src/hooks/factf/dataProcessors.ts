@@ -45,8 +45,9 @@ export const createDataProcessors = (state: FACTFDataState): FACTFDataProcessors
   getProcessedMonthlyEvolution: () => {
     if (!state.monthlyEvolution) return [];
 
+    // Months without evaluations keep null averages, so the chart shows a gap instead of a zero
     return state.monthlyEvolution.evolution.map(item => ({
-      month: item.month,
+      month: `${item.month}/${item.year}`,
       'Escore Total': item.average_total_score,
       'Subescala Fadiga': item.average_fatigue_score,
       evaluationsCount: item.evaluations_count,
@@ -79,7 +80,7 @@ export const createDataProcessors = (state: FACTFDataState): FACTFDataProcessors
     if (!state.monthlyEvolution) return [];
 
     return state.monthlyEvolution.evolution.map(item => ({
-      month: item.month,
+      month: `${item.month}/${item.year}`,
       escoreTotal: item.average_total_score,
       subscalaFadiga: item.average_fatigue_score,
     }));
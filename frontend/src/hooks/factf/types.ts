@@ -119,8 +119,8 @@ export interface ProcessedFACTFFatigueDistribution {
 
 export interface ProcessedFACTFMonthlyEvolution {
   month: string;
-  'Escore Total': number;
-  'Subescala Fadiga': number;
+  'Escore Total': number | null;
+  'Subescala Fadiga': number | null;
   evaluationsCount: number;
 }
 
@@ -93,10 +93,22 @@ class FACTFApiService {
   }
 
   async getAllPatients(): Promise<FACTFAllPatientsResponse> {
-    const response = await fetch(`${API_BASE_URL}/factf-dashboard/all-patients`, {
-      headers: this.getAuthHeaders(),
-    });
-    return this.handleResponse<FACTFAllPatientsResponse>(response);
+    // The endpoint is paginated by cursor: follow next_cursor until the last page
+    const patients: FACTFAllPatientsResponse['patients'] = [];
+    let page: FACTFAllPatientsResponse;
+    let cursor: string | undefined;
+
+    do {
+      const queryParams = this.buildQueryParams({ limit: 500, cursor });
+      const response = await fetch(`${API_BASE_URL}/factf-dashboard/all-patients?${queryParams}`, {
+        headers: this.getAuthHeaders(),
+      });
+      page = await this.handleResponse<FACTFAllPatientsResponse>(response);
+      patients.push(...page.patients);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+
+    return { ...page, patients, next_cursor: null };
   }
 
   // Patient CRUD Endpoints
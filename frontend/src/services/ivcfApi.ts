@@ -6,6 +6,8 @@ import {
   type CriticalPatientsResponse,
   type FragileElderlyPercentageResponse,
   type IVCFFilters,
+  type IVCFDashboardSnapshot,
+  type IVCFDashboardSnapshotParams,
 } from '../types/ivcf';
 import { API_CONFIG } from '../config/api';
 
@@ -40,8 +42,11 @@ class IVCFApiService {
     return response.json();
   }
 
-  async getSummary(): Promise<IVCFSummary> {
-    const response = await fetch(`${API_BASE_URL}/ivcf-dashboard/ivcf-summary`, {
+  async getSummary(filters: Omit<IVCFFilters, 'classification'> = {}): Promise<IVCFSummary> {
+    const queryParams = this.buildQueryParams(filters);
+    const url = `${API_BASE_URL}/ivcf-dashboard/ivcf-summary${queryParams ? `?${queryParams}` : ''}`;
+
+    const response = await fetch(url, {
       headers: this.getAuthHeaders(),
     });
     return this.handleResponse<IVCFSummary>(response);
@@ -104,6 +109,17 @@ class IVCFApiService {
     return this.handleResponse<FragileElderlyPercentageResponse>(response);
   }
 
+  // Todos os widgets do dashboard em uma única requisição
+  async getSnapshot(params: IVCFDashboardSnapshotParams = {}): Promise<IVCFDashboardSnapshot> {
+    const queryParams = this.buildQueryParams(params);
+    const url = `${API_BASE_URL}/ivcf-dashboard/snapshot${queryParams ? `?${queryParams}` : ''}`;
+
+    const response = await fetch(url, {
+      headers: this.getAuthHeaders(),
+    });
+    return this.handleResponse<IVCFDashboardSnapshot>(response);
+  }
+
   async getCuritibaRegions(): Promise<{ regions: string[] }> {
     const response = await fetch(`${API_BASE_URL}/ivcf-dashboard/curitiba-regions`, {
       headers: this.getAuthHeaders(),
@@ -1,11 +1,13 @@
 import {
   type PhysicalActivitySummary,
   type PhysicalActivityCriticalPatient,
+  type PhysicalActivityCriticalPatientsResponse,
   type PhysicalActivityDistribution,
   type SedentaryByAge,
   type SedentaryTrend,
   type WHOCompliance,
   type PhysicalActivityPatientSummary,
+  type PhysicalActivityAllPatientsResponse,
   type PhysicalActivityPatient,
   type PhysicalActivityPatientCreate,
   type PhysicalActivityPatientUpdate,
@@ -57,10 +59,21 @@ class PhysicalActivityApiService {
   }
 
   async getCriticalPatients(): Promise<PhysicalActivityCriticalPatient[]> {
-    const response = await fetch(`${API_BASE_URL}/physical-activity-dashboard/critical-patients`, {
-      headers: this.getAuthHeaders(),
-    });
-    return this.handleResponse<PhysicalActivityCriticalPatient[]>(response);
+    // The endpoint is paginated by cursor: follow next_cursor until the last page
+    const patients: PhysicalActivityCriticalPatient[] = [];
+    let cursor: string | undefined;
+
+    do {
+      const queryParams = this.buildQueryParams({ limit: 500, cursor });
+      const response = await fetch(`${API_BASE_URL}/physical-activity-dashboard/critical-patients?${queryParams}`, {
+        headers: this.getAuthHeaders(),
+      });
+      const page = await this.handleResponse<PhysicalActivityCriticalPatientsResponse>(response);
+      patients.push(...page.patients);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+
+    return patients;
   }
 
   async getActivityDistribution(): Promise<PhysicalActivityDistribution> {
@@ -93,10 +106,21 @@ class PhysicalActivityApiService {
   }
 
   async getAllPatients(): Promise<PhysicalActivityPatientSummary[]> {
-    const response = await fetch(`${API_BASE_URL}/physical-activity-dashboard/all-patients`, {
-      headers: this.getAuthHeaders(),
-    });
-    return this.handleResponse<PhysicalActivityPatientSummary[]>(response);
+    // The endpoint is paginated by cursor: follow next_cursor until the last page
+    const patients: PhysicalActivityPatientSummary[] = [];
+    let cursor: string | undefined;
+
+    do {
+      const queryParams = this.buildQueryParams({ limit: 500, cursor });
+      const response = await fetch(`${API_BASE_URL}/physical-activity-dashboard/all-patients?${queryParams}`, {
+        headers: this.getAuthHeaders(),
+      });
+      const page = await this.handleResponse<PhysicalActivityAllPatientsResponse>(response);
+      patients.push(...page.patients);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+
+    return patients;
   }
 
   // Patient CRUD Endpoints
@@ -159,11 +159,20 @@ export interface FACTFFatigueDistributionResponse {
     distribution: FACTFFatigueDistribution[];
 }
 
+export interface FACTFScorePercentiles {
+    p25: number | null;
+    p50: number | null;
+    p75: number | null;
+}
+
 export interface FACTFMonthlyEvolution {
     month: string;
-    average_total_score: number;
-    average_fatigue_score: number;
+    year: number;
+    average_total_score: number | null;
+    average_fatigue_score: number | null;
     evaluations_count: number;
+    total_score_percentiles: FACTFScorePercentiles;
+    fatigue_score_percentiles: FACTFScorePercentiles;
 }
 
 export interface FACTFMonthlyEvolutionResponse {
@@ -194,6 +203,7 @@ export interface FACTFPatientSummary {
 export interface FACTFAllPatientsResponse {
     patients: FACTFPatientSummary[];
     total_count: number;
+    next_cursor: string | null;
 }
 
 // Filter Types
@@ -217,9 +227,9 @@ export interface FACTFRadarChartData {
 
 export interface FACTFLineChartData {
     month: string;
-    escoreTotal: number;
-    subscalaFadiga: number;
-    [key: string]: string | number;
+    escoreTotal: number | null;
+    subscalaFadiga: number | null;
+    [key: string]: string | number | null;
 }
 
 export interface FACTFBarChartData {
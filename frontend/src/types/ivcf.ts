@@ -44,15 +44,26 @@ export interface IVCFSummary {
   critical_patients_count: number;
 }
 
+export interface FragileBreakdown {
+  robust: number;
+  risk: number;
+  fragile: number;
+}
+
+export interface FragileRegionSubtotal {
+  region: string;
+  total_patients: number;
+  fragile_patients: number;
+  fragile_percentage: number;
+  breakdown: FragileBreakdown;
+}
+
 export interface FragilePercentage {
   total_patients: number;
   fragile_patients: number;
   fragile_percentage: number;
-  breakdown: {
-    robust: number;
-    risk: number;
-    fragile: number;
-  };
+  breakdown: FragileBreakdown;
+  regions: FragileRegionSubtotal[];
 }
 
 export interface IVCFFilters {
@@ -93,6 +104,24 @@ export interface FragileElderlyPercentageResponse {
   filters_applied: IVCFFilters;
 }
 
+export interface IVCFDashboardSnapshotParams extends Omit<IVCFFilters, 'classification'> {
+  months_back?: number;
+  from_last_evaluation?: boolean;
+  pontuacao_minima?: number;
+}
+
+export interface IVCFDashboardSnapshot {
+  summary: IVCFSummary;
+  domains: DomainScore[];
+  chart_config: Record<string, unknown>;
+  regions: RegionAverage[];
+  evolution: MonthlyEvolution[];
+  critical_patients: IVCFPatient[];
+  total_critical: number;
+  fragile_percentage: FragilePercentage;
+  filters_applied: IVCFFilters;
+}
+
 export interface RadarChartData {
   domain: string;
   score: number;
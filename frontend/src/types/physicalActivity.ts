@@ -132,6 +132,11 @@ export interface PhysicalActivityCriticalPatient {
     health_unit?: string;
 }
 
+export interface PhysicalActivityCriticalPatientsResponse {
+    patients: PhysicalActivityCriticalPatient[];
+    next_cursor: string | null;
+}
+
 export interface PhysicalActivityDistribution {
     light_activity: {
         label: string;
@@ -199,6 +204,11 @@ export interface PhysicalActivityPatientSummary {
     total_weekly_vigorous_minutes?: number;
 }
 
+export interface PhysicalActivityAllPatientsResponse {
+    patients: PhysicalActivityPatientSummary[];
+    next_cursor: string | null;
+}
+
 // Filter Types
 export interface PhysicalActivityFilters {
     page?: number;